@@ -18,13 +18,33 @@ __version__ = "0.2.6"
 
 # modules
 from . import atmosphere
+from . import cache
+from . import chain
+from . import channels
+from . import config
+from . import derivatives
+from . import filterbank
 from . import galaxy
 from . import instruments
+from . import inverse
+from . import optics
+from . import optimize
 from . import physics
 from . import plotting
 from . import simulator
+from . import sweep
+from . import uncertainty
 
 
 # aliases
+from .cache import *
+from .channels import *
+from .config import *
+from .derivatives import *
+from .filterbank import *
+from .inverse import *
+from .optimize import *
 from .plotting import *
 from .simulator import *
+from .sweep import *
+from .uncertainty import *
@@ -1,32 +1,61 @@
 # standard library
+import os
+from functools import lru_cache
+from hashlib import sha1
 from pathlib import Path
-from typing import Callable, List, Union
+from tempfile import mkstemp
+from typing import Callable, List, Optional, Tuple, Union
 
 
 # dependent packages
 import numpy as np
 import pandas as pd
-from scipy.interpolate import interp2d
+from scipy.interpolate import RectBivariateSpline, RegularGridInterpolator, interp2d
+from scipy.sparse import csr_matrix
+from . import __version__
+from .channels import DefaultR, resolve_channels
 
 
 # type aliases
 ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+Profile = Union[str, Callable[[np.ndarray], np.ndarray]]
+
+
+# constants
+ATM_CSV = Path(__file__).parent / "data" / "atm.csv"
+CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser()
+    / "deshima-sensitivity"
+)  # user cache directory of the binary sidecars of atmosphere tables
+PROFILE_CUTOFF = 10.0  # half-width of the response of a channel in units of F/R
+CHUNK_SIZE = 1000  # number of samples out of a lookup grid calculated at once
 
 
 # main functions
 def eta_atm_func(
-    F: ArrayLike, pwv: float, EL: float = 60.0, R: float = 0.0
+    F: ArrayLike,
+    pwv: ArrayLike,
+    EL: ArrayLike = 60.0,
+    R: ArrayLike = DefaultR(0.0),
+    method: str = "interp",
+    profile: Profile = "boxcar",
 ) -> ArrayLike:
     """Calculate eta_atm as a function of F by interpolation.
 
     If R~=0 then the function will average the atmospheric transmission
     within each spectrometer channel.
 
+    pwv and EL can be arrays: the transmission is then calculated
+    for all combinations of them by a single interpolation of the table.
+    The shape of the output is pwv.shape + EL.shape + (len(F),),
+    e.g., (n_pwv, n_EL, n_F) for 1D arrays of pwv and EL.
+
     Parameters
     ----------
     F
         Frequency of the astronomical signal.
         Units: Hz (works also for GHz, will detect).
+        It can be a ChannelGrid, whose R (if specified) is used as R.
     pwv
         Precipitable water vapour. Units: mm.
     EL
@@ -35,8 +64,27 @@ def eta_atm_func(
         Spectral resolving power in F/W_F where W_F is the 'equivalent bandwidth'.
         R is used to average the atmospheric transmission within one spectrometer
         channel. If R = 0, then the function will return the transmission
-        at that exact frequency. Units: None.
+        at that exact frequency. It can be a vector of the same length as F
+        (i.e., R of each channel). Units: None.
         See also: http://www.astrosurf.com/buil/us/spe2/hresol7.htm
+    method
+        Default: 'interp'. Option: 'opacity'.
+        If 'interp', the transmission at zenith is interpolated by a cubic
+        spline in the (F, pwv) grid of the table, and then scaled by airmass.
+        If 'opacity', the transmission is calculated from the dry and wet
+        opacities fitted to the table (see AtmosphereTable.tau_dry),
+        exp(-(tau_dry + pwv * tau_wet) * airmass), which can extrapolate pwv.
+        For pwv of 0.1-2.0 mm and EL of 20-90 deg, the absolute difference
+        from 'interp' is less than 0.06 (maximum around the 380 GHz water line)
+        and less than 0.01 for 99% of the frequencies between 10-1000 GHz.
+        For R = 500 channels between 220-440 GHz, they are 0.021 and 0.001.
+    profile
+        Default: 'boxcar'. Options: 'lorentzian' or a function of detuning.
+        Response of a channel by which the transmission is averaged.
+        If 'boxcar', the transmission is averaged with the same weight
+        within the width of F/R. Otherwise, it is averaged with the weights
+        of the response (normalized) up to PROFILE_CUTOFF * F/R from F
+        by a sparse matrix cached per channels (see ChannelResponse).
 
     Returns
     -------
@@ -44,50 +92,1133 @@ def eta_atm_func(
         Atmospheric tranmsmission. Units: None.
 
     """
+    F, R = resolve_channels(F, R)
+
     if np.average(F) > 10.0 ** 9:
         F = F / 10.0 ** 9
 
     # give F a length if it is an integer.
-    if not hasattr(F, "__len__"):
-        F = np.asarray([F])
-
-    eta_atm_df = pd.read_csv(
-        Path(__file__).parent / "data" / "atm.csv",
-        skiprows=4,
-        delim_whitespace=True,
-        header=0,
+    F = np.atleast_1d(np.asarray(F, dtype=float))
+    R = np.broadcast_to(np.asarray(R, dtype=float), F.shape)
+    pwv = np.asarray(pwv, dtype=float)
+    EL = np.asarray(EL, dtype=float)
+
+    # all combinations of pwv and EL as pairs broadcasted against each other
+    pwv = pwv.reshape(pwv.shape + (1,) * EL.ndim)
+    return eta_atm_pairs(F, pwv, EL, R, method, profile)
+
+
+def eta_atm_broadcast(
+    F: ArrayLike,
+    pwv: ArrayLike,
+    EL: ArrayLike = 60.0,
+    R: ArrayLike = 0.0,
+    method: str = "interp",
+    profile: Profile = "boxcar",
+) -> np.ndarray:
+    """Calculate eta_atm with F, pwv, EL and R broadcasted against each other.
+
+    Unlike eta_atm_func(), which returns the transmission for all combinations
+    of pwv and EL, the output has the shape of the arrays broadcasted
+    by the NumPy rules, e.g., (n_pwv, 1, 1) * (1, n_EL, 1) * (n_F,).
+    The transmission is calculated only for the unique pairs of (pwv, EL)
+    and of (F, R) by a single call of eta_atm_pairs(), so that paired samples
+    (e.g., time series of pwv and EL) cost linearly in the number of samples.
+
+    Parameters
+    ----------
+    F
+        Frequency of the astronomical signal.
+        Units: Hz (works also for GHz, will detect).
+    pwv
+        Precipitable water vapour. Units: mm.
+    EL
+        Telescope elevation angle. Units: degrees.
+    R
+        Spectral resolving power in F/W_F. Units: None.
+    method
+        Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+    profile
+        Default: 'boxcar'. Response of the channels. See eta_atm_func().
+
+    Returns
+    -------
+    eta_atm
+        Atmospheric tranmsmission with the broadcasted shape. Units: None.
+
+    """
+    shape = np.broadcast(F, pwv, EL, R).shape
+    F, R = np.broadcast_arrays(np.asarray(F, dtype=float), np.asarray(R, dtype=float))
+    pwv, EL = np.broadcast_arrays(
+        np.asarray(pwv, dtype=float), np.asarray(EL, dtype=float)
     )
+    channels = np.stack([F.ravel(), R.ravel()], axis=1)
+    conditions = np.stack([pwv.ravel(), EL.ravel()], axis=1)
+
+    ch_u, i_ch = np.unique(channels, axis=0, return_inverse=True)
+    cond_u, i_cond = np.unique(conditions, axis=0, return_inverse=True)
+    F_u, R_u = ch_u[:, 0], ch_u[:, 1]
+
+    if np.average(F_u) > 10.0 ** 9:
+        F_u = F_u / 10.0 ** 9
+
+    eta_atm = eta_atm_pairs(F_u, cond_u[:, 0], cond_u[:, 1], R_u, method, profile)
 
-    eta_atm_func_zenith = eta_atm_interp(eta_atm_df)
+    i_cond = np.broadcast_to(i_cond.reshape(pwv.shape), shape)
+    i_ch = np.broadcast_to(i_ch.reshape(F.shape), shape)
+    return eta_atm[i_cond, i_ch]
+
+
+def eta_atm_cached(
+    F: ArrayLike,
+    pwv: ArrayLike,
+    EL: ArrayLike = 60.0,
+    R: ArrayLike = 0.0,
+    method: str = "interp",
+    cache_dir: Optional[Union[Path, str]] = None,
+    profile: Profile = "boxcar",
+) -> np.ndarray:
+    """Calculate eta_atm as a function of F by a cached lookup table.
+
+    Same as eta_atm_func(), but the channel-averaged transmission of the
+    given channels (F, R) is tabulated on a fine (pwv, EL) grid only once
+    (see EtaAtmLookup and eta_atm_lookup()) and then interpolated.
+    Queries out of the grid are calculated at once by eta_atm_broadcast().
+
+    Parameters
+    ----------
+    F
+        Frequency of the astronomical signal.
+        Units: Hz (works also for GHz, will detect).
+    pwv
+        Precipitable water vapour. Units: mm.
+    EL
+        Telescope elevation angle. Units: degrees.
+    R
+        Spectral resolving power in F/W_F. Units: None.
+    method
+        Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+    cache_dir
+        If specified, lookup tables are also stored in (and loaded from)
+        the directory so that they persist across processes.
+    profile
+        Default: 'boxcar'. Response of the channels. See eta_atm_func().
 
-    if R == 0:
-        eta_atm = np.abs(eta_atm_func_zenith(pwv, F)) ** (
-            1.0 / np.sin(EL * np.pi / 180.0)
+    Returns
+    -------
+    eta_atm
+        Atmospheric tranmsmission with shape of pwv.shape + EL.shape + (len(F),).
+        Units: None.
+
+    """
+    return eta_atm_lookup(F, R, method, cache_dir, profile)(pwv, EL)
+
+
+# helper classes
+class EtaAtmLookup:
+    """Channel-averaged atmospheric transmission tabulated on a (pwv, EL) grid.
+
+    The logarithm of the transmission is linearly interpolated
+    in the (pwv, airmass) plane, where it is almost linear in airmass.
+    With the default grid (0.01 mm step in pwv and 12 airmasses for EL >= 20 deg),
+    the absolute difference from eta_atm_func() is about 2e-4 for R = 500.
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels. Units: Hz (works also for GHz, will detect).
+    R
+        Spectral resolving power of the channels. Units: None.
+    pwv
+        Grid of precipitable water vapour. Units: mm.
+    EL
+        Grid of telescope elevation angle. Units: degrees.
+    method
+        Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+    eta_atm
+        Precomputed transmission on the grid with shape of (pwv, EL, F).
+        If not specified, it is calculated by eta_atm_func().
+    profile
+        Default: 'boxcar'. Response of the channels. See eta_atm_func().
+
+    """
+
+    def __init__(
+        self,
+        F: ArrayLike,
+        R: ArrayLike = DefaultR(0.0),
+        pwv: Optional[ArrayLike] = None,
+        EL: Optional[ArrayLike] = None,
+        method: str = "interp",
+        eta_atm: Optional[np.ndarray] = None,
+        profile: Profile = "boxcar",
+    ) -> None:
+        F, R = resolve_channels(F, R)
+
+        if pwv is None:
+            pwv = np.linspace(0.1, 2.0, 191)
+
+        if EL is None:
+            EL = np.arcsin(1.0 / np.linspace(1.0, 2.9, 12)) * 180.0 / np.pi
+
+        self.F = np.atleast_1d(np.asarray(F, dtype=float))
+        self.R = np.broadcast_to(np.asarray(R, dtype=float), self.F.shape)
+        self.pwv = np.sort(np.asarray(pwv, dtype=float))
+        self.EL = np.sort(np.asarray(EL, dtype=float))[::-1]
+        self.method = method
+        self.profile = profile
+
+        if eta_atm is None:
+            eta_atm = eta_atm_func(self.F, self.pwv, self.EL, self.R, method, profile)
+
+        self.eta_atm = np.asarray(eta_atm, dtype=float)
+
+        # floor of opaque channels so that the interpolation never meets -inf
+        self._log_eta_atm = np.log(np.clip(self.eta_atm, np.finfo(float).tiny, None))
+
+        self._interp = RegularGridInterpolator(
+            (self.pwv, 1.0 / np.sin(self.EL * np.pi / 180.0)), self._log_eta_atm
         )
-    else:
-        # smooth with spectrometer resolution
-        # 100.0, 100.1., ....., 1000 GHz as in the original data.
-        F_highres = eta_atm_df["F"]
-        eta_atm_zenith_highres = np.abs(eta_atm_func_zenith(pwv, F_highres)) ** (
-            1.0 / np.sin(EL * np.pi / 180.0)
+
+    def __call__(
+        self, pwv: ArrayLike, EL: ArrayLike = 60.0, outer: bool = True
+    ) -> np.ndarray:
+        """Interpolate the transmission.
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour. Units: mm.
+        EL
+            Telescope elevation angle. Units: degrees.
+        outer
+            Whether to calculate all combinations of pwv and EL (True)
+            or pairs of them broadcasted against each other (False),
+            e.g., time series of (pwv, EL) samples.
+
+        Returns
+        -------
+        eta_atm
+            Atmospheric tranmsmission with shape of pwv.shape + EL.shape + (len(F),)
+            if outer is True, or the broadcasted shape + (len(F),) otherwise.
+            Samples out of the grid are calculated by eta_atm_broadcast()
+            in chunks of CHUNK_SIZE samples.
+            Units: None.
+
+        """
+        pwv = np.asarray(pwv, dtype=float)
+        EL = np.asarray(EL, dtype=float)
+
+        if outer:
+            shape = pwv.shape + EL.shape
+            pwv, EL = np.meshgrid(pwv.ravel(), EL.ravel(), indexing="ij")
+        else:
+            shape = np.broadcast(pwv, EL).shape
+            pwv, EL = np.broadcast_arrays(pwv, EL)
+
+        pwv, EL = pwv.ravel(), EL.ravel()
+        points = np.stack([pwv, 1.0 / np.sin(EL * np.pi / 180.0)])
+
+        pwv_min, pwv_max = self.pwv[[0, -1]]
+        EL_min, EL_max = self.EL[[-1, 0]]
+        in_grid = (pwv >= pwv_min) & (pwv <= pwv_max) & (EL >= EL_min) & (EL <= EL_max)
+
+        eta_atm = np.empty((len(in_grid), len(self.F)))
+        eta_atm[in_grid] = np.exp(self._interp(points[:, in_grid].T))
+
+        out_of_grid = np.flatnonzero(~in_grid)
+
+        for start in range(0, len(out_of_grid), CHUNK_SIZE):
+            index = out_of_grid[start : start + CHUNK_SIZE]
+            eta_atm[index] = eta_atm_broadcast(
+                self.F,
+                pwv[index, np.newaxis],
+                EL[index, np.newaxis],
+                self.R,
+                self.method,
+                self.profile,
+            )
+
+        return eta_atm.reshape(shape + self.F.shape)
+
+    def channelwise(self, pwv: ArrayLike, EL: ArrayLike = 60.0) -> np.ndarray:
+        """Interpolate the transmission of each channel at its own (pwv, EL).
+
+        Unlike EtaAtmLookup.__call__(), pwv and EL are broadcasted
+        against F (the last axis), so that each channel can be evaluated
+        at a different condition (e.g., in root finding per channel).
+        Conditions out of the grid are calculated at once by eta_atm_broadcast().
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour. Units: mm.
+        EL
+            Telescope elevation angle. Units: degrees.
+
+        Returns
+        -------
+        eta_atm
+            Atmospheric tranmsmission with the broadcasted shape
+            of pwv, EL and F. Units: None.
+
+        """
+        shape = np.broadcast(pwv, EL, self.F).shape
+        pwv = np.broadcast_to(np.asarray(pwv, dtype=float), shape)
+        EL = np.broadcast_to(np.asarray(EL, dtype=float), shape)
+        channel = np.broadcast_to(np.arange(len(self.F)), shape)
+
+        airmass_grid = 1.0 / np.sin(np.deg2rad(self.EL))
+        pwv_in = np.clip(pwv, self.pwv[0], self.pwv[-1])
+        airmass_in = np.clip(1.0 / np.sin(np.deg2rad(EL)), *airmass_grid[[0, -1]])
+        out_of_grid = (pwv != pwv_in) | (EL < self.EL[-1]) | (EL > self.EL[0])
+
+        (i, x), (j, y) = [
+            grid_weights(grid, value)
+            for grid, value in [(self.pwv, pwv_in), (airmass_grid, airmass_in)]
+        ]
+        table = self._log_eta_atm
+
+        log_eta_atm = (
+            (1.0 - x) * (1.0 - y) * table[i, j, channel]
+            + x * (1.0 - y) * table[i + 1, j, channel]
+            + (1.0 - x) * y * table[i, j + 1, channel]
+            + x * y * table[i + 1, j + 1, channel]
         )
-        eta_atm = np.zeros(len(F))
-        for i_ch in range(len(F)):
-            eta_atm[i_ch] = np.mean(
-                eta_atm_zenith_highres[
-                    (F_highres > F[i_ch] * (1 - 0.5 / R))
-                    & (F_highres < F[i_ch] * (1 + 0.5 / R))
-                ]
+        eta_atm = np.exp(log_eta_atm)
+
+        if np.any(out_of_grid):
+            eta_atm[out_of_grid] = eta_atm_broadcast(
+                self.F[channel[out_of_grid]],
+                pwv[out_of_grid],
+                EL[out_of_grid],
+                self.R[channel[out_of_grid]],
+                self.method,
+                self.profile,
             )
-        eta_atm = [eta_atm]
 
-    if len(eta_atm) == 1:
-        return eta_atm[0]
-    else:
-        return eta_atm[:, 0]
+        return eta_atm
+
+    def save(self, path: Union[Path, str]) -> None:
+        """Save the lookup table to a NumPy file (.npz).
+
+        Parameters
+        ----------
+        path
+            Path of the file. The file is replaced atomically.
+
+        """
+
+        def save(f):
+            np.savez(
+                f,
+                F=self.F,
+                R=self.R,
+                pwv=self.pwv,
+                EL=self.EL,
+                method=self.method,
+                eta_atm=self.eta_atm,
+            )
+
+        replace_atomic(path, save)
+
+    @classmethod
+    def load(
+        cls, path: Union[Path, str], profile: Profile = "boxcar"
+    ) -> "EtaAtmLookup":
+        """Load a lookup table from a NumPy file (.npz).
+
+        Parameters
+        ----------
+        path
+            Path of the file created by EtaAtmLookup.save().
+        profile
+            Response of the channels with which the table was calculated
+            (not stored in the file). See eta_atm_func().
+
+        Returns
+        -------
+        lookup
+            Loaded lookup table.
+
+        """
+        with np.load(path) as npz:
+            return cls(
+                F=npz["F"],
+                R=npz["R"],
+                pwv=npz["pwv"],
+                EL=npz["EL"],
+                method=str(npz["method"]),
+                eta_atm=npz["eta_atm"],
+                profile=profile,
+            )
+
+
+class AtmosphereTable:
+    """Lazily loaded table of atmospheric transmission at zenith.
+
+    The CSV file is parsed only once and then cached as a binary sidecar
+    (``<name>-<digest of the path>.npy`` in the user cache directory),
+    which is memory-mapped on later use. Processes that load the same sidecar
+    therefore share the same pages. Nothing is written next to the CSV file,
+    so that the table works also in read-only (e.g., system) installs.
+    The cubic interpolant of the table is also built once and kept in memory.
+
+    Parameters
+    ----------
+    path
+        Path of the atmospheric transmission data (CSV) downloaded from ALMA.
+    cache
+        Whether to write and read the binary sidecar (True) or not (False).
+        If the cache directory is not writable, the table is kept in memory only.
+    cache_dir
+        Directory of the binary sidecar. Defaults to CACHE_DIR
+        ($XDG_CACHE_HOME/deshima-sensitivity or ~/.cache/deshima-sensitivity).
+
+    Example
+    --------
+        Get the shared table and evaluate the transmission at zenith::
+
+            table = desim.atmosphere.atm_table()
+            eta = table.interp(pwv=0.5, F=[350.0, 400.0])
+
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str] = ATM_CSV,
+        cache: bool = True,
+        cache_dir: Optional[Union[Path, str]] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.cache = cache
+        self.cache_dir = CACHE_DIR if cache_dir is None else Path(cache_dir)
+        self._data: Optional[np.ndarray] = None
+        self._spline: Optional[RectBivariateSpline] = None
+        self._tau: Optional[np.ndarray] = None
+
+    @property
+    def sidecar(self) -> Path:
+        """Path of the binary sidecar of the table."""
+        key = sha1(str(self.path.resolve()).encode()).hexdigest()[:16]
+        return self.cache_dir / f"{self.path.stem}-{key}.npy"
+
+    @property
+    def data(self) -> np.ndarray:
+        """Raw table: first row is PWVs (mm), first column is frequencies (GHz)."""
+        if self._data is None:
+            self._data = self._load()
+
+        return self._data
+
+    @property
+    def F(self) -> np.ndarray:
+        """Frequencies of the table. Units: GHz."""
+        return self.data[1:, 0]
+
+    @property
+    def pwv(self) -> np.ndarray:
+        """Precipitable water vapours of the table. Units: mm."""
+        return self.data[0, 1:]
+
+    @property
+    def eta(self) -> np.ndarray:
+        """Atmospheric transmission at zenith with shape of (F, pwv). Units: None."""
+        return self.data[1:, 1:]
+
+    @property
+    def spline(self) -> RectBivariateSpline:
+        """Cubic spline of the transmission at zenith as a function of (F, pwv)."""
+        if self._spline is None:
+            self._spline = RectBivariateSpline(self.F, self.pwv, self.eta)
+
+        return self._spline
+
+    @property
+    def tau_dry(self) -> np.ndarray:
+        """Dry (pwv-independent) opacity at zenith. Units: None.
+
+        The dry and wet opacities are fitted to the table at each frequency
+        by weighted least squares (see fit_opacity()).
+
+        """
+        if self._tau is None:
+            self._tau = fit_opacity(self.pwv, self.eta)
+
+        return self._tau[0]
+
+    @property
+    def tau_wet(self) -> np.ndarray:
+        """Wet opacity per unit pwv at zenith. Units: mm^-1."""
+        if self._tau is None:
+            self._tau = fit_opacity(self.pwv, self.eta)
+
+        return self._tau[1]
+
+    def opacity(self, F: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """Linearly interpolate the dry and wet opacities at zenith.
+
+        Parameters
+        ----------
+        F
+            Frequency. Units: GHz.
+
+        Returns
+        -------
+        tau_dry
+            Dry opacity at zenith. Units: None.
+        tau_wet
+            Wet opacity per unit pwv at zenith. Units: mm^-1.
+
+        """
+        tau_dry = np.interp(F, self.F, self.tau_dry)
+        tau_wet = np.interp(F, self.F, self.tau_wet)
+        return tau_dry, tau_wet
+
+    def interp(self, pwv: ArrayLike, F: ArrayLike) -> np.ndarray:
+        """Interpolate the transmission at zenith.
+
+        The call signature and the output shape, (len(F), len(pwv)),
+        are compatible with the function returned by eta_atm_interp().
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour. Units: mm.
+        F
+            Frequency. Units: GHz.
+
+        Returns
+        -------
+        eta_atm
+            Atmospheric transmission at zenith. Units: None.
+
+        """
+        pwv = np.atleast_1d(np.asarray(pwv, dtype=float))
+        F = np.atleast_1d(np.asarray(F, dtype=float))
+
+        # grid evaluation (much faster than pointwise one) needs sorted inputs
+        i_F, i_pwv = np.argsort(F), np.argsort(pwv)
+        eta = np.empty((len(F), len(pwv)))
+        eta[np.ix_(i_F, i_pwv)] = self.spline(F[i_F], pwv[i_pwv])
+        return eta
+
+    def _load(self) -> np.ndarray:
+        sidecar = self.sidecar
+
+        if self.cache and sidecar.exists():
+            if sidecar.stat().st_mtime >= self.path.stat().st_mtime:
+                return np.load(sidecar, mmap_mode="r")
+
+        data = read_atm_csv(self.path)
+
+        if not self.cache:
+            return data
+
+        try:
+            sidecar.parent.mkdir(parents=True, exist_ok=True)
+            replace_atomic(sidecar, lambda f: np.save(f, data))
+        except OSError:
+            return data
+
+        return np.load(sidecar, mmap_mode="r")
+
+
+class ChannelResponse:
+    """Sparse response of channels on the frequencies of the atmosphere table.
+
+    The response of each channel is given by a profile as a function of
+    the detuning from its center frequency in units of its width,
+    x = (f - F) / (F / R), and is truncated at |x| = PROFILE_CUTOFF
+    (0.5 for the boxcar). The weights of all channels are stored in one
+    sparse matrix with the shape of (channels, high-resolution frequencies),
+    whose rows are normalized to unity, so that channel-averaged values
+    (e.g., the transmission or loading) for many conditions are calculated
+    by a single sparse-dense matrix product (see ChannelResponse.average()).
+    Responses are cached per channels, R and profile (see channel_response()).
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels. Units: Hz (works also for GHz, will detect).
+    R
+        Spectral resolving power of the channels (FWHM = F/R). Units: None.
+    profile
+        Default: 'lorentzian'. Options: 'boxcar', a TabulatedProfile
+        or any (vectorized) function of the detuning x.
+    cutoff
+        Half-width of the response in units of F/R (except for the boxcar).
+
+    Example
+    --------
+        Transmission of Lorentzian channels for samples of pwv and EL::
+
+            response = channel_response(F, R=500, profile="lorentzian")
+            eta_atm = response.eta_atm(pwv=[0.5, 1.0, 1.5], EL=[30.0, 60.0])
+
+    """
+
+    def __init__(
+        self,
+        F: ArrayLike,
+        R: ArrayLike,
+        profile: Profile = "lorentzian",
+        cutoff: float = PROFILE_CUTOFF,
+    ) -> None:
+        F = np.atleast_1d(np.asarray(F, dtype=float))
+
+        if np.average(F) > 10.0 ** 9:
+            F = F / 10.0 ** 9
+
+        self.F = F
+        self.R = np.broadcast_to(np.asarray(R, dtype=float), F.shape)
+        self.profile = profile
+
+        if np.any(self.R <= 0):
+            raise ValueError("R must be positive for a channel response.")
+
+        func, half_width = resolve_profile(profile, cutoff)
+        F_highres = atm_table().F
+
+        # support of each channel (open interval as in channel_average())
+        width = self.F / self.R
+        i_min = np.searchsorted(F_highres, self.F - half_width * width, side="right")
+        i_max = np.searchsorted(F_highres, self.F + half_width * width, side="left")
+        n_samples = np.maximum(i_max - i_min, 0)
+
+        # only the frequency range covered by the channels is kept
+        offset = int(np.min(i_min))
+        self.table_index = slice(offset, max(int(np.max(i_max)), offset))
+        self.F_highres = F_highres[self.table_index]
+
+        rows = np.repeat(np.arange(len(self.F)), n_samples)
+        starts = np.cumsum(n_samples) - n_samples
+        cols = np.arange(len(rows)) - np.repeat(starts - i_min + offset, n_samples)
+
+        x = (self.F_highres[cols] - self.F[rows]) / width[rows]
+        weights = np.asarray(func(x), dtype=float)
+        total = np.bincount(rows, weights, minlength=len(self.F))
+        self.valid = total > 0
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weights = weights / total[rows]
+
+        self.matrix = csr_matrix(
+            (weights, (rows, cols)), shape=(len(self.F), len(self.F_highres))
+        )
+
+    def average(self, values: ArrayLike) -> np.ndarray:
+        """Average values on the high-resolution frequencies by the response.
+
+        Parameters
+        ----------
+        values
+            Values to be averaged. The last axis must correspond to
+            ChannelResponse.F_highres.
+
+        Returns
+        -------
+        averaged
+            Averaged values with shape of values.shape[:-1] + F.shape.
+            Channels without any weight will be NaN.
+
+        """
+        values = np.asarray(values, dtype=float)
+        shape = values.shape[:-1] + self.F.shape
+
+        averaged = self.matrix.dot(values.reshape(-1, values.shape[-1]).T).T
+        averaged = averaged.reshape(shape)
+        averaged[..., ~self.valid] = np.nan
+        return averaged
+
+    def eta_atm(
+        self, pwv: ArrayLike, EL: ArrayLike = 60.0, method: str = "interp"
+    ) -> np.ndarray:
+        """Calculate the transmission averaged by the response.
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour. Units: mm.
+        EL
+            Telescope elevation angle. Units: degrees.
+        method
+            Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+
+        Returns
+        -------
+        eta_atm
+            Atmospheric tranmsmission with shape of pwv.shape + EL.shape + (len(F),).
+            Units: None.
+
+        """
+        return self.average(eta_atm_func(self.F_highres, pwv, EL, 0.0, method))
+
+
+class TabulatedProfile:
+    """Response profile of a channel tabulated as a function of detuning.
+
+    It is linearly interpolated and zero outside of the table.
+    It is hashed and compared by value, so that responses of the same
+    table are cached only once (see channel_response()).
+
+    Parameters
+    ----------
+    x
+        Detuning from the center frequency in units of F/R (increasing).
+    y
+        Response at x (e.g., measured transmission of a filter). Units: None.
+
+    """
+
+    def __init__(self, x: ArrayLike, y: ArrayLike) -> None:
+        self.x = np.array(x, dtype=float)
+        self.y = np.array(y, dtype=float)
+
+        if self.x.ndim != 1 or self.x.shape != self.y.shape:
+            raise ValueError("x and y must be 1D arrays of the same length.")
+
+        self.x.setflags(write=False)
+        self.y.setflags(write=False)
+        self.key = sha1(self.x.tobytes() + self.y.tobytes()).hexdigest()
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return np.interp(x, self.x, self.y, left=0.0, right=0.0)
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TabulatedProfile) and self.key == other.key
+
+    def __repr__(self) -> str:
+        return f"TabulatedProfile(sha1={self.key})"
+
+    def value_key(self) -> str:
+        """Return a digest of the table (see cache.digest())."""
+        return self.key
 
 
 # helper functions
+@lru_cache(maxsize=None)
+def atm_table(path: Union[Path, str] = ATM_CSV) -> AtmosphereTable:
+    """Return the process-wide AtmosphereTable of given data.
+
+    Parameters
+    ----------
+    path
+        Path of the atmospheric transmission data (CSV) downloaded from ALMA.
+
+    Returns
+    -------
+    table
+        AtmosphereTable which is shared within the process.
+
+    """
+    return AtmosphereTable(path)
+
+
+def eta_atm_lookup(
+    F: ArrayLike,
+    R: ArrayLike = DefaultR(0.0),
+    method: str = "interp",
+    cache_dir: Optional[Union[Path, str]] = None,
+    profile: Profile = "boxcar",
+) -> EtaAtmLookup:
+    """Return the cached EtaAtmLookup of given channels.
+
+    Lookup tables are kept in a least-recently-used cache of the process
+    keyed by the contents of F and R, the method and the profile.
+    If cache_dir is specified, they are also stored in the directory
+    and loaded on the first use.
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels. Units: Hz (works also for GHz, will detect).
+    R
+        Spectral resolving power of the channels. Units: None.
+    method
+        Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+    cache_dir
+        Directory where lookup tables are stored.
+    profile
+        Default: 'boxcar'. Response of the channels. See eta_atm_func().
+        Tables of functions other than TabulatedProfile are not stored.
+
+    Returns
+    -------
+    lookup
+        EtaAtmLookup of the channels.
+
+    """
+    F, R = resolve_channels(F, R)
+    F = np.atleast_1d(np.asarray(F, dtype=float))
+    R = np.broadcast_to(np.asarray(R, dtype=float), F.shape)
+
+    if cache_dir is not None:
+        cache_dir = str(cache_dir)
+
+    return _eta_atm_lookup(
+        F.tobytes(), np.ascontiguousarray(R).tobytes(), method, cache_dir, profile
+    )
+
+
+@lru_cache(maxsize=16)
+def _eta_atm_lookup(
+    F: bytes, R: bytes, method: str, cache_dir: Optional[str], profile: Profile
+) -> EtaAtmLookup:
+    F, R = np.frombuffer(F), np.frombuffer(R)
+
+    if cache_dir is None or not isinstance(profile, (str, TabulatedProfile)):
+        return EtaAtmLookup(F, R, method=method, profile=profile)
+
+    data = F.tobytes() + R.tobytes() + method.encode() + __version__.encode()
+
+    if not is_boxcar(profile):
+        data += repr(profile).encode()
+
+    key = sha1(data).hexdigest()
+    path = Path(cache_dir) / f"eta_atm_{key}.npz"
+
+    if path.exists():
+        return EtaAtmLookup.load(path, profile)
+
+    lookup = EtaAtmLookup(F, R, method=method, profile=profile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lookup.save(path)
+    return lookup
+
+
+def eta_atm_pairs(
+    F: np.ndarray,
+    pwv: np.ndarray,
+    EL: np.ndarray,
+    R: np.ndarray,
+    method: str = "interp",
+    profile: Profile = "boxcar",
+) -> np.ndarray:
+    """Calculate eta_atm for pairs of pwv and EL broadcasted against each other.
+
+    Used in the functions eta_atm_func() and eta_atm_broadcast().
+    The transmission is calculated only for the broadcasted pairs
+    (e.g., paired samples of the same shape), not for all combinations.
+
+    Parameters
+    ----------
+    F
+        1D array of frequency of the astronomical signal. Units: GHz.
+    pwv
+        Precipitable water vapour. Units: mm.
+    EL
+        Telescope elevation angle. Units: degrees.
+    R
+        Spectral resolving power with the same shape as F. Units: None.
+    method
+        Default: 'interp'. Option: 'opacity'. See eta_atm_func().
+    profile
+        Default: 'boxcar'. Response of the channels. See eta_atm_func().
+
+    Returns
+    -------
+    eta_atm
+        Atmospheric tranmsmission with shape of the broadcasted shape
+        of pwv and EL + (len(F),). Units: None.
+
+    """
+    if method not in ("interp", "opacity"):
+        raise ValueError("Method should be interp or opacity.")
+
+    table = atm_table()
+    airmass = 1.0 / np.sin(EL * np.pi / 180.0)
+
+    def eta_atm_func_slant(F: np.ndarray) -> np.ndarray:
+        # (F, pwv) -> np.broadcast(pwv, EL).shape + F.shape
+        if method == "opacity":
+            tau_dry, tau_wet = table.opacity(F)
+            tau = tau_dry + pwv[..., np.newaxis] * tau_wet
+            return np.exp(-tau * airmass[..., np.newaxis])
+
+        eta_zenith = np.abs(table.interp(pwv.ravel(), F)).T
+        eta_zenith = eta_zenith.reshape(pwv.shape + F.shape)
+        return eta_zenith ** airmass[..., np.newaxis]
+
+    is_smoothed = R != 0
+
+    if not np.any(is_smoothed):
+        return eta_atm_func_slant(F)
+
+    # smooth with spectrometer resolution
+    # 100.0, 100.1., ....., 1000 GHz as in the original data.
+    # only the frequency range covered by the channels is interpolated.
+    F_ch, R_ch = F[is_smoothed], R[is_smoothed]
+
+    if is_boxcar(profile):
+        F_highres = table.F
+        i_min = np.searchsorted(F_highres, np.min(F_ch * (1 - 0.5 / R_ch)))
+        i_max = np.searchsorted(F_highres, np.max(F_ch * (1 + 0.5 / R_ch)))
+        F_highres = F_highres[max(i_min - 1, 0) : i_max + 1]
+
+        eta_atm_highres = eta_atm_func_slant(F_highres)
+        eta_atm_ch = channel_average(F_highres, eta_atm_highres, F_ch, R_ch)
+    else:
+        response = channel_response(F_ch, R_ch, profile)
+        eta_atm_ch = response.average(eta_atm_func_slant(response.F_highres))
+
+    if np.all(is_smoothed):
+        return eta_atm_ch
+
+    eta_atm = eta_atm_func_slant(F)
+    eta_atm[..., is_smoothed] = eta_atm_ch
+    return eta_atm
+
+
+def channel_average(
+    F_highres: ArrayLike,
+    values: ArrayLike,
+    F: ArrayLike,
+    R: ArrayLike,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Average values within spectrometer channels by a boxcar of width F/R.
+
+    All channels are averaged at once by sums over the windows of the last axis
+    (by np.add.reduceat), which gives the same result as the mean of values
+    whose frequencies are in the open interval of (F * (1 - 0.5/R), F * (1 + 0.5/R)).
+    Unlike differences of cumulative sums, tiny values of near-opaque channels
+    are not lost by the cancellation of large partial sums.
+    Channels without any frequency in the interval will be NaN.
+
+    Parameters
+    ----------
+    F_highres
+        Monotonically increasing frequencies of the values.
+    values
+        Values to be averaged. The last axis must correspond to F_highres.
+    F
+        Center frequencies of the channels. Units: same as F_highres.
+    R
+        Spectral resolving power of the channels. Units: None.
+    out
+        Array of the shape of values.shape[:-1] + F.shape
+        where the result is stored (e.g., a buffer of a workspace).
+
+    Returns
+    -------
+    averaged
+        Channel-averaged values with shape of values.shape[:-1] + F.shape.
+
+    """
+    F_highres = np.asarray(F_highres, dtype=float)
+    values = np.asarray(values, dtype=float)
+    F, R = np.broadcast_arrays(np.asarray(F, dtype=float), np.asarray(R, dtype=float))
+
+    i_min = np.searchsorted(F_highres, F * (1 - 0.5 / R), side="right")
+    i_max = np.searchsorted(F_highres, F * (1 + 0.5 / R), side="left")
+    n_samples = np.maximum(i_max - i_min, 0)
+
+    # windows of [i_min, i_max) interleaved; a trailing zero makes i_max valid
+    padded = np.zeros(values.shape[:-1] + (values.shape[-1] + 1,))
+    padded[..., :-1] = values
+    bounds = np.stack([i_min, np.maximum(i_max, i_min)], axis=-1).ravel()
+    summed = np.add.reduceat(padded, bounds, axis=-1)[..., ::2]
+    summed = summed.reshape(values.shape[:-1] + F.shape)
+
+    if out is None:
+        out = np.empty(summed.shape)
+
+    out[...] = np.nan
+    return np.divide(summed, n_samples, out=out, where=n_samples > 0)
+
+
+def channel_response(
+    F: ArrayLike,
+    R: ArrayLike = DefaultR(0.0),
+    profile: Profile = "lorentzian",
+    cutoff: float = PROFILE_CUTOFF,
+) -> ChannelResponse:
+    """Return the cached ChannelResponse of given channels.
+
+    Responses are kept in a least-recently-used cache of the process
+    keyed by the contents of F and R, the profile and the cutoff.
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels. Units: Hz (works also for GHz, will detect).
+        It can be a ChannelGrid, whose R (if specified) is used as R.
+    R
+        Spectral resolving power of the channels. Units: None.
+    profile
+        Default: 'lorentzian'. Response profile (see ChannelResponse).
+    cutoff
+        Half-width of the response in units of F/R.
+
+    Returns
+    -------
+    response
+        ChannelResponse of the channels.
+
+    """
+    F, R = resolve_channels(F, R)
+    F = np.atleast_1d(np.asarray(F, dtype=float))
+    R = np.broadcast_to(np.asarray(R, dtype=float), F.shape)
+
+    return _channel_response(
+        F.tobytes(), np.ascontiguousarray(R).tobytes(), profile, cutoff
+    )
+
+
+@lru_cache(maxsize=16)
+def _channel_response(
+    F: bytes, R: bytes, profile: Profile, cutoff: float
+) -> ChannelResponse:
+    return ChannelResponse(np.frombuffer(F), np.frombuffer(R), profile, cutoff)
+
+
+def is_boxcar(profile: Profile) -> bool:
+    """Return whether a profile is the boxcar (averaged by channel_average())."""
+    return isinstance(profile, str) and profile == "boxcar"
+
+
+def resolve_profile(
+    profile: Profile, cutoff: float
+) -> Tuple[Callable[[np.ndarray], np.ndarray], float]:
+    """Return the function and the half-width (in units of F/R) of a profile."""
+    if not isinstance(profile, str):
+        return profile, cutoff
+
+    if profile == "boxcar":
+        return np.ones_like, 0.5
+
+    if profile == "lorentzian":
+        return lambda x: 1.0 / (1.0 + 4.0 * x ** 2), cutoff
+
+    raise ValueError("Profile should be boxcar, lorentzian or a function.")
+
+
+def grid_weights(grid: np.ndarray, value: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return indices and weights of linear interpolation on a sorted grid.
+
+    Parameters
+    ----------
+    grid
+        Sorted (increasing) 1D grid.
+    value
+        Values within the grid.
+
+    Returns
+    -------
+    index
+        Index of the grid point just below (or at) each value.
+    weight
+        Weight of the next grid point (between 0 and 1).
+
+    """
+    if np.any(value < grid[0]) or np.any(value > grid[-1]):
+        raise ValueError("Values must be within the grid of the lookup table.")
+
+    index = np.clip(np.searchsorted(grid, value, "right") - 1, 0, len(grid) - 2)
+    weight = (value - grid[index]) / (grid[index + 1] - grid[index])
+    return index, weight
+
+
+def fit_opacity(pwv: np.ndarray, eta: np.ndarray, eta_min: float = 1e-5) -> np.ndarray:
+    """Fit dry and wet opacities to atmospheric transmission at zenith.
+
+    The opacity at each frequency, -log(eta), is fitted by
+    tau_dry + pwv * tau_wet with the weights of eta, which approximately
+    minimizes the squared errors in transmission rather than in opacity.
+    Negative opacities from the fit are clipped to zero.
+
+    Parameters
+    ----------
+    pwv
+        Precipitable water vapours of the table. Units: mm.
+    eta
+        Atmospheric transmission at zenith with shape of (F, pwv). Units: None.
+    eta_min
+        Lower limit of transmission to avoid the opacity of infinity
+        (the table has five decimal places). Units: None.
+
+    Returns
+    -------
+    tau
+        Array of (tau_dry, tau_wet) with shape of (2, F).
+
+    """
+    eta = np.clip(eta, eta_min, None)
+    tau = -np.log(eta)
+
+    weight = eta / np.sum(eta, axis=1, keepdims=True)
+    pwv_mean = np.sum(weight * pwv, axis=1, keepdims=True)
+    tau_mean = np.sum(weight * tau, axis=1, keepdims=True)
+
+    cov = np.sum(weight * (pwv - pwv_mean) * (tau - tau_mean), axis=1)
+    var = np.sum(weight * (pwv - pwv_mean) ** 2, axis=1)
+
+    tau_wet = cov / var
+    tau_dry = tau_mean[:, 0] - tau_wet * pwv_mean[:, 0]
+    return np.clip([tau_dry, tau_wet], 0.0, None)
+
+
+def replace_atomic(path: Union[Path, str], save: Callable) -> None:
+    """Write a file atomically by writing a temporary file and renaming it.
+
+    Concurrent processes therefore never see a partially written file.
+    The temporary file is created exclusively with a unique name
+    (by tempfile.mkstemp()), so that processes on different hosts
+    sharing a filesystem (which may have the same PID) never write into
+    the same temporary file.
+
+    Parameters
+    ----------
+    path
+        Path of the file to be written.
+    save
+        Function which writes data to a given binary file object.
+
+    """
+    path = Path(path)
+    fd, tmp = mkstemp(suffix=".tmp", prefix=f"{path.name}.", dir=path.parent)
+    tmp = Path(tmp)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            save(f)
+
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def read_atm_csv(path: Union[Path, str] = ATM_CSV) -> np.ndarray:
+    """Parse atmospheric transmission data (CSV) downloaded from ALMA.
+
+    Parameters
+    ----------
+    path
+        Path of the atmospheric transmission data (CSV).
+
+    Returns
+    -------
+    data
+        2D array whose first row is PWVs (mm) and first column is
+        frequencies (GHz). The first element is NaN.
+
+    """
+    with open(path) as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+
+        pwv = np.array(line.split(), dtype=float)
+        values = np.loadtxt(f, ndmin=2)
+
+    return np.vstack([np.append(np.nan, pwv), values])
+
+
 def eta_atm_interp(eta_atm_dataframe: pd.DataFrame) -> Callable:
     """Used in the function eta_atm_func().
 
@@ -0,0 +1,371 @@
+__all__ = ["ResultCache", "enable_cache", "disable_cache"]
+
+
+# standard library
+import os
+import warnings
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+# dependent packages
+import numpy as np
+from . import __version__
+from .atmosphere import ATM_CSV, replace_atomic
+
+try:
+    import fcntl
+except ImportError:  # e.g., Windows
+    fcntl = None
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+Entry = Tuple[Dict[str, Any], Optional[Tuple[str, ...]], Optional[Dict[str, Any]]]
+
+
+# constants
+CACHE: Optional["ResultCache"] = None  # cache used by spectrometer_sensitivity()
+
+
+# main functions
+def enable_cache(
+    path: Optional[Union[Path, str]] = None,
+    max_memory: int = 2 ** 28,
+    max_disk: int = 2 ** 30,
+) -> "ResultCache":
+    """Enable the result cache of spectrometer_sensitivity() (opt-in).
+
+    Parameters
+    ----------
+    path
+        Directory of the on-disk layer. If not specified, only the in-memory
+        layer is used.
+    max_memory
+        Size limit of the in-memory layer. Units: bytes.
+    max_disk
+        Size limit of the on-disk layer. Units: bytes.
+
+    Returns
+    -------
+    cache
+        Enabled cache.
+
+    Example
+    --------
+        Reuse results across notebook sessions and processes::
+
+            enable_cache("~/.cache/deshima-sensitivity")
+            df = spectrometer_sensitivity(F=F)  # calculated
+            df = spectrometer_sensitivity(F=F)  # loaded from the cache
+
+    """
+    global CACHE
+    CACHE = ResultCache(path, max_memory, max_disk)
+    return CACHE
+
+
+def disable_cache() -> None:
+    """Disable the result cache of spectrometer_sensitivity()."""
+    global CACHE
+    CACHE = None
+
+
+def active_cache() -> Optional["ResultCache"]:
+    """Return the enabled result cache (or None if disabled)."""
+    return CACHE
+
+
+# helper classes
+class ResultCache:
+    """Two-layer content-addressed cache of the results of a calculation.
+
+    A result is a tuple of (columns, dims, coords) of a SensitivityResult
+    and is addressed by a digest of all inputs including array contents,
+    the package version and the atmosphere data (see ResultCache.key()).
+    The in-memory layer is a least-recently-used (LRU) cache with
+    a size limit. The on-disk layer stores one NumPy file (.npz) per result,
+    written atomically, and evicts least-recently-used files
+    (by modification time, updated on hits) beyond its size limit.
+    Writing and eviction are serialized by a lock file, so that
+    the same directory can be shared by concurrent processes.
+
+    Parameters
+    ----------
+    path
+        Directory of the on-disk layer. If None, it is not used.
+    max_memory
+        Size limit of the in-memory layer. Units: bytes.
+    max_disk
+        Size limit of the on-disk layer. Units: bytes.
+
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[Path, str]] = None,
+        max_memory: int = 2 ** 28,
+        max_disk: int = 2 ** 30,
+    ) -> None:
+        self.path = None if path is None else Path(path).expanduser()
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.memory: "OrderedDict[str, Entry]" = OrderedDict()
+        self.memory_size = 0
+        self.hits = 0
+        self.misses = 0
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def key(self, **values: Any) -> str:
+        """Return a digest of named values with the package and data versions.
+
+        It raises TypeError if any value cannot be digested by value
+        (e.g., a function, see digest()), whose results are not cached.
+
+        """
+        return digest(dict(values, __version__=__version__, __data__=data_digest()))
+
+    def get(self, key: str) -> Optional[Entry]:
+        """Return a copy of a cached result (or None if not cached)."""
+        entry = self.memory.get(key)
+
+        if entry is not None:
+            self.memory.move_to_end(key)
+        elif self.path is not None:
+            entry = self._load(key)
+
+            if entry is not None:
+                self._put_memory(key, entry)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return copy_entry(entry)
+
+    def put(self, key: str, entry: Entry) -> None:
+        """Store a copy of a result in both layers."""
+        entry = copy_entry(entry)
+        self._put_memory(key, entry)
+
+        if self.path is not None:
+            self._save(key, entry)
+
+    def clear(self) -> None:
+        """Remove all results from both layers."""
+        self.memory.clear()
+        self.memory_size = 0
+
+        if self.path is None:
+            return
+
+        with self.lock():
+            for file in self.path.glob("*.npz"):
+                file.unlink()
+
+    def _put_memory(self, key: str, entry: Entry) -> None:
+        """Store a result in the in-memory layer and evict old ones."""
+        if key in self.memory:
+            self.memory_size -= nbytes(self.memory.pop(key))
+
+        self.memory[key] = entry
+        self.memory_size += nbytes(entry)
+
+        while len(self.memory) > 1 and self.memory_size > self.max_memory:
+            self.memory_size -= nbytes(self.memory.popitem(last=False)[1])
+
+    def _load(self, key: str) -> Optional[Entry]:
+        """Load a result from the on-disk layer."""
+        file = self.path / f"{key}.npz"
+
+        try:
+            with np.load(file, allow_pickle=False) as npz:
+                entry = unpack(dict(npz))
+
+            os.utime(file)  # mark as recently used
+        except (OSError, ValueError, KeyError):
+            return None
+
+        return entry
+
+    def _save(self, key: str, entry: Entry) -> None:
+        """Save a result to the on-disk layer and evict old ones."""
+
+        def save(f):
+            np.savez(f, **pack(entry))
+
+        with self.lock():
+            replace_atomic(self.path / f"{key}.npz", save)
+            files = []
+
+            for file in self.path.glob("*.npz"):
+                try:
+                    stat = file.stat()
+                except OSError:
+                    continue
+
+                files.append((stat.st_mtime, stat.st_size, file))
+
+            total = sum(size for _, size, _ in files)
+
+            for _, size, file in sorted(files)[:-1]:
+                if total <= self.max_disk:
+                    break
+
+                file.unlink()
+                total -= size
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Lock the on-disk layer against other processes (where supported)."""
+        with open(self.path / ".lock", "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+# helper functions
+def digest(values: Dict[str, Any], identity: bool = False) -> str:
+    """Return a stable digest (SHA-1) of named values including array contents.
+
+    Parameters
+    ----------
+    values
+        Dictionary of names and values (scalars, strings or arrays).
+        Dictionaries, tuples and lists in values (e.g., a chain of Stage)
+        are digested by their items, and objects which define value_key()
+        (e.g., TabulatedProfile) by its return value.
+    identity
+        Whether to digest the other objects (e.g., functions) by their identity.
+        Such a digest is valid only while the objects are alive
+        and must not be shared with other processes.
+
+    Returns
+    -------
+    digest
+        Hexadecimal digest of the values.
+
+    Raises
+    ------
+    TypeError
+        If a value cannot be digested by value and identity is False.
+
+    """
+    hash_ = sha1()
+
+    for name in sorted(values):
+        hash_.update(name.encode())
+        update_digest(hash_, values[name], identity)
+
+    return hash_.hexdigest()
+
+
+def update_digest(hash_: Any, value: Any, identity: bool) -> None:
+    """Update a hash object by a value (see digest())."""
+    if isinstance(value, dict):
+        hash_.update(digest(value, identity).encode())
+        return
+
+    if hasattr(value, "value_key"):
+        hash_.update(f"{type(value).__name__}:{value.value_key()}".encode())
+        return
+
+    if value is None:
+        hash_.update(b"None")
+        return
+
+    if callable(value):
+        array = np.array(None)
+    elif isinstance(value, (tuple, list)):
+        array = sequence_array(value)
+    else:
+        array = np.asarray(value)
+
+    hash_.update(str((array.dtype.str, array.shape)).encode())
+
+    if array.dtype != object:
+        hash_.update(array.tobytes())
+    elif isinstance(value, (tuple, list, np.ndarray)):
+        # sequences of objects are digested item by item
+        for item in value:
+            update_digest(hash_, item, identity)
+    elif identity:
+        hash_.update(f"{type(value).__name__}:{id(value)}".encode())
+    else:
+        raise TypeError(f"{value!r} cannot be digested by value.")
+
+
+def sequence_array(value: Union[tuple, list]) -> np.ndarray:
+    """Return an array of a sequence (object array if it is ragged)."""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", np.VisibleDeprecationWarning)
+            return np.asarray(value)
+    except (ValueError, np.VisibleDeprecationWarning):
+        return np.empty(len(value), dtype=object)  # items are digested one by one
+
+
+@lru_cache(maxsize=None)
+def data_digest(path: Union[Path, str] = ATM_CSV) -> str:
+    """Return a digest (SHA-1) of the contents of a data file."""
+    with open(path, "rb") as f:
+        return sha1(f.read()).hexdigest()
+
+
+def pack(entry: Entry) -> Dict[str, np.ndarray]:
+    """Pack a result into a flat dictionary of arrays (for a .npz file)."""
+    columns, dims, coords = entry
+    arrays = {f"columns/{name}": np.asarray(v) for name, v in columns.items()}
+
+    if dims is not None:
+        arrays["dims"] = np.array(dims)
+        arrays.update({f"coords/{dim}": np.asarray(coords[dim]) for dim in dims})
+
+    return arrays
+
+
+def unpack(arrays: Dict[str, np.ndarray]) -> Entry:
+    """Unpack a result from a flat dictionary of arrays."""
+    columns, coords = {}, {}
+
+    for name, value in arrays.items():
+        group, _, name = name.partition("/")
+
+        if group == "columns":
+            columns[name] = value[()] if value.ndim == 0 else value
+        elif group == "coords":
+            coords[name] = value
+
+    if "dims" not in arrays:
+        return columns, None, None
+
+    dims = tuple(str(dim) for dim in arrays["dims"])
+    return columns, dims, {dim: coords[dim] for dim in dims}
+
+
+def copy_entry(entry: Entry) -> Entry:
+    """Return a copy of a result whose arrays are not shared."""
+    columns, dims, coords = entry
+    columns = {name: np.copy(v) if np.ndim(v) else v for name, v in columns.items()}
+
+    if coords is not None:
+        coords = {dim: np.copy(value) for dim, value in coords.items()}
+
+    return columns, dims, coords
+
+
+def nbytes(entry: Entry) -> int:
+    """Return the total size of the arrays of a result."""
+    return sum(np.asarray(value).nbytes for value in entry[0].values())
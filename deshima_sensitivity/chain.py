@@ -0,0 +1,293 @@
+__all__ = ["Stage", "OpticalChain", "DESHIMA_CHAIN", "DESHIMA_BREAKDOWN"]
+
+
+# standard library
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+
+# dependent packages
+import numpy as np
+from .physics import johnson_nyquist_psd, rad_trans
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+Value = Union[str, ArrayLike, Callable[[np.ndarray], ArrayLike]]
+
+
+# main classes
+class Stage(NamedTuple):
+    """Stage of an optical chain (a semi-transparent medium).
+
+    The PSD after the stage is calculated by radiation transfer:
+    psd_out = eta * psd_in + (1 - eta) * psd_medium.
+
+    Parameters
+    ----------
+    name
+        Name of the stage. The PSD after the stage is
+        available as a quantity named psd_<name>.
+    eta
+        Efficiency (transmission) of the stage. Either the name of
+        an input or a quantity of spectrometer_sensitivity() (e.g., eta_M1),
+        a value, or a function of frequency (Hz). Units: None.
+    medium
+        Emission of the stage. Either the name of a PSD input or quantity
+        (e.g., psd_jn_amb for Tp_amb, or psd_sky for spillover to the sky),
+        or the physical temperature as a value or a function of frequency (Hz),
+        from which the Johnson-Nyquist PSD is calculated. Units: W / Hz (or K).
+    loading
+        Category of the emission of the stage in the breakdown
+        of the loading of the last stage (e.g., sky, warm, cold).
+
+    """
+
+    name: str
+    eta: Value
+    medium: Value
+    loading: str = "warm"
+
+
+class OpticalChain:
+    """Optical chain compiled into quantities of spectrometer_sensitivity().
+
+    Each stage is compiled into a quantity psd_<name> which depends on
+    the PSD after the previous stage (or the source), its efficiency
+    and its medium. Therefore each stage is evaluated only once,
+    lazily and for any shapes of the inputs (e.g., grids).
+
+    The breakdown of the loading of the last stage (psd_<last>_<loading>)
+    is compiled into a single pass over the stages, where the coefficients
+    of the source and the emission of all stages are propagated at once.
+    The stages can be passed in a different order from the chain (order),
+    e.g., DESHIMA_BREAKDOWN, which reproduces the original breakdown
+    of DESHIMA on ASTE, where the sky spillover at M2 is mixed
+    before the ohmic loss of M2 (so that the breakdown does not sum
+    exactly to the PSD after the last stage).
+
+    Parameters
+    ----------
+    stages
+        Sequence of stages from the sky side to the detector side.
+    source
+        Name of the PSD input or quantity of the source (sky side).
+    loading
+        Category of the source in the breakdown of the loading.
+    order
+        Names of the stages in the order of the breakdown of the loading
+        (the last one must be the last stage). If not specified, the order
+        of the stages, or DESHIMA_BREAKDOWN if the stages have the same names
+        as DESHIMA_CHAIN.
+
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        source: str = "psd_jn_cmb",
+        loading: str = "sky",
+        order: Optional[Sequence[str]] = None,
+    ) -> None:
+        stages = [Stage(*stage) for stage in stages]
+
+        if not stages:
+            raise ValueError("An optical chain must have at least one stage.")
+
+        names = [stage.name for stage in stages]
+
+        if len(set(names)) != len(names):
+            raise ValueError("Names of stages must be unique.")
+
+        for i, stage in enumerate(stages):
+            if stage.medium in [f"psd_{name}" for name in names[i:]]:
+                raise ValueError(f"Medium of {stage.name} must be a previous stage.")
+
+        if order is None and names == [stage.name for stage in DESHIMA_CHAIN]:
+            order = DESHIMA_BREAKDOWN
+        elif order is None:
+            order = names
+
+        if sorted(order) != sorted(names) or order[-1] != names[-1]:
+            raise ValueError("Order must be of all stages and end with the last.")
+
+        for i, name in enumerate(order):
+            medium = stages[names.index(name)].medium
+
+            if medium in [f"psd_{name}" for name in order[i:]]:
+                raise ValueError(f"Medium of {name} must be a previous stage in order.")
+
+        self.stages = stages
+        self.source = source
+        self.loading = loading
+        self.order = [names.index(name) for name in order]
+
+    @property
+    def outputs(self) -> Tuple[str, ...]:
+        """Names of the PSDs after the stages."""
+        return tuple(f"psd_{stage.name}" for stage in self.stages)
+
+    @property
+    def loadings(self) -> Tuple[str, ...]:
+        """Names of the loading breakdown of the last stage."""
+        labels = [self.loading] + [stage.loading for stage in self.stages]
+        return tuple(f"{self.outputs[-1]}_{label}" for label in unique(labels))
+
+    @property
+    def quantities(self) -> Dict[str, Tuple[Callable, Tuple[str, ...]]]:
+        """Compiled quantities (functions and names of their arguments)."""
+        quantities = {}
+        psd_in = self.source
+
+        for stage, psd_out in zip(self.stages, self.outputs):
+            quantities[psd_out] = stage_quantity(stage, psd_in)
+            psd_in = psd_out
+
+        # breakdown of the loading (shared by the categories)
+        args = ("F", self.source) + self._args()
+        quantities[self.outputs[-1] + "_loadings"] = self._loadings, args
+
+        for name in self.loadings:
+            label = name[len(self.outputs[-1]) + 1 :]
+            quantities[name] = pick(label), (self.outputs[-1] + "_loadings",)
+
+        return quantities
+
+    def _args(self) -> Tuple[str, ...]:
+        """Names of the efficiencies and media given by name (except stages)."""
+        args = []
+
+        for stage in self.stages:
+            if isinstance(stage.eta, str):
+                args.append(stage.eta)
+
+            if isinstance(stage.medium, str) and stage.medium not in self.outputs:
+                args.append(stage.medium)
+
+        return tuple(args)
+
+    def _loadings(self, F: ArrayLike, psd_source: ArrayLike, *args: Any):
+        """Calculate the breakdown of the loading of the last stage."""
+        args = iter(args)
+        etas, psds = [], [psd_source]
+
+        for stage in self.stages:
+            etas.append(resolve_eta(stage.eta, F, args))
+
+            if stage.medium in self.outputs:
+                psds.append(0.0)  # emission of a previous stage
+            else:
+                psds.append(resolve_medium(stage.medium, F, args))
+
+        # coefficients of the source and the media along the first axis
+        ndim = max(np.ndim(value) for value in etas + psds)
+        basis = np.eye(len(psds)).reshape((len(psds),) * 2 + (1,) * ndim)
+        coeffs = {self.source: basis[0]}
+        coeff = basis[0]
+
+        for i in self.order:
+            stage = self.stages[i]
+            medium = coeffs.get(stage.medium, basis[i + 1])
+            coeff = rad_trans(coeff, medium, etas[i])
+            coeffs[f"psd_{stage.name}"] = coeff
+
+        labels = [self.loading] + [stage.loading for stage in self.stages]
+        loadings = {}
+
+        for label, c, psd in zip(labels, coeff, psds):
+            loadings[label] = loadings.get(label, 0.0) + c * psd
+
+        return loadings
+
+
+# helper functions
+def stage_quantity(stage: Stage, psd_in: str) -> Tuple[Callable, Tuple[str, ...]]:
+    """Compile a stage into a quantity (function and names of its arguments)."""
+    args = ("F", psd_in) + tuple(
+        value for value in (stage.eta, stage.medium) if isinstance(value, str)
+    )
+
+    def psd_out(F, psd_in, *args, out=None):
+        args = iter(args)
+        eta = resolve_eta(stage.eta, F, args)
+        medium = resolve_medium(stage.medium, F, args)
+
+        # a buffer of a workspace only for the shape of the named arguments
+        if out is not None and np.broadcast(psd_in, medium, eta).shape != out.shape:
+            out = None
+
+        return rad_trans(rad_in=psd_in, medium=medium, eta=eta, out=out)
+
+    return psd_out, args
+
+
+def resolve_eta(eta: Value, F: ArrayLike, args: Any) -> ArrayLike:
+    """Return the efficiency of a stage from the next argument if named."""
+    if isinstance(eta, str):
+        return next(args)
+
+    if callable(eta):
+        return eta(F)
+
+    return eta
+
+
+def resolve_medium(medium: Value, F: ArrayLike, args: Any) -> ArrayLike:
+    """Return the PSD of a medium from the next argument if named."""
+    if isinstance(medium, str):
+        return next(args)
+
+    if callable(medium):
+        return johnson_nyquist_psd(F=F, T=medium(F))
+
+    return johnson_nyquist_psd(F=F, T=medium)
+
+
+def pick(label: str) -> Callable:
+    """Return a function which picks a category of the loading breakdown."""
+
+    def loading(loadings):
+        return loadings.get(label, 0.0)
+
+    return loading
+
+
+def unique(values: Sequence[str]) -> List[str]:
+    """Return unique values in order of appearance."""
+    return list(dict.fromkeys(values))
+
+
+# constants
+DESHIMA_CHAIN = (
+    Stage("sky", "eta_atm", "psd_jn_atm", "sky"),
+    Stage("M1", "eta_M1", "psd_jn_amb", "warm"),
+    Stage("M2", "eta_Al_ohmic", "psd_jn_amb", "warm"),
+    Stage("M2_spill", "eta_M2_spill", "psd_sky", "sky"),
+    Stage("wo", "eta_wo", "psd_jn_cabin", "warm"),
+    Stage("window_refl_in", "eta_window_refl", "psd_jn_co", "cold"),
+    Stage("window_bulk", "eta_HDPE", "psd_jn_cabin", "warm"),
+    Stage("window", "eta_window_refl", "psd_jn_co", "cold"),
+    Stage("co", "eta_co", "psd_jn_co", "cold"),
+    Stage("KID", "eta_chip", "psd_jn_chip", "cold"),
+)  # optical chain of DESHIMA on ASTE (see spectrometer_sensitivity())
+DESHIMA_BREAKDOWN = (
+    "sky",
+    "M1",
+    "M2_spill",
+    "M2",
+    "wo",
+    "window_refl_in",
+    "window_bulk",
+    "window",
+    "co",
+    "KID",
+)  # order of the stages in the original breakdown of the loading of DESHIMA
@@ -0,0 +1,236 @@
+__all__ = ["ChannelGrid"]
+
+
+# standard library
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+
+# dependent packages
+import numpy as np
+from .instruments import D2HPBW, eta_mb_ruze
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+MAX_MEMO = 256  # maximum number of memoized arrays per grid
+
+
+# main classes
+class DefaultR(float):
+    """Default value of R which is not given explicitly as an argument.
+
+    It works as a float of the same value, but it tells resolve_channels()
+    that R of a ChannelGrid should be used instead of it.
+    Any R given explicitly (even of the same value) is checked against R of the grid.
+
+    """
+
+
+class ChannelGrid:
+    """Grid of spectrometer channels with memoized per-channel quantities.
+
+    Per-channel arrays which depend only on the frequencies of the channels
+    (and fixed parameters), e.g., D2HPBW(F), eta_mb_ruze(F, ...) or the
+    quantities eta_Al_ohmic, eta_HDPE and W_F_cont of spectrometer_sensitivity(),
+    are calculated at the first use and then reused (read-only) by the other
+    calls with the same grid (see ChannelGrid.memoize()).
+
+    A grid can be given as F of spectrometer_sensitivity(), the other functions
+    which take its parameters (e.g., linear_response(), InstrumentModel, run_sweep())
+    and the functions of the atmospheric transmission (e.g., eta_atm_lookup()).
+    Then R of the grid (if specified) is used as R of the calculation,
+    and R given explicitly must not differ from it (see resolve_channels()).
+    It also works as the array of the frequencies (e.g., np.asarray(grid)).
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels (1D array). Units: Hz.
+    R
+        Spectral resolving power of the channels (a scalar or a value per channel).
+        If not specified, R is given separately to each calculation.
+
+    Example
+    --------
+        Evaluate DESHIMA 2.0 channels at different weather::
+
+            channels = ChannelGrid.logspace(220e9, 440e9, R=500)
+            params = dict(theta_maj=channels.D2HPBW(), theta_min=channels.D2HPBW())
+
+            for pwv in [0.5, 1.0, 1.5]:
+                df = spectrometer_sensitivity(F=channels, pwv=pwv, **params)
+
+    """
+
+    def __init__(self, F: ArrayLike, R: Optional[ArrayLike] = None) -> None:
+        self.F = np.atleast_1d(np.array(F, dtype=float))
+
+        if self.F.ndim != 1:
+            raise ValueError("F must be a 1D array.")
+
+        if R is not None and np.ndim(R) == 0:
+            R = float(R)
+        elif R is not None:
+            R = np.array(np.broadcast_to(R, self.F.shape), dtype=float)
+            R.setflags(write=False)
+
+        self.R = R
+        self.F.setflags(write=False)
+        self.memo: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    @classmethod
+    def logspace(
+        cls, f_min: float, f_max: float, R: float, oversampling: float = 1.0,
+    ) -> "ChannelGrid":
+        """Create log-spaced channels between two frequencies.
+
+        Parameters
+        ----------
+        f_min
+            Frequency of the first channel. Units: Hz.
+        f_max
+            Frequency of the last channel. Units: Hz.
+        R
+            Spectral resolving power of the channels. Units: None.
+        oversampling
+            Ratio of the channel width (F/R) to the channel spacing.
+
+        Returns
+        -------
+        channels
+            ChannelGrid of ceil(R * oversampling * ln(f_max / f_min)) + 1 channels.
+
+        """
+        n_channels = int(np.ceil(R * oversampling * np.log(f_max / f_min))) + 1
+        return cls(np.geomspace(f_min, f_max, n_channels), R)
+
+    def __len__(self) -> int:
+        return len(self.F)
+
+    def __array__(self, dtype: Optional[np.dtype] = None) -> np.ndarray:
+        return self.F if dtype is None else self.F.astype(dtype)
+
+    def __repr__(self) -> str:
+        return (
+            f"ChannelGrid({len(self)} channels, "
+            f"{self.F[0] / 1e9:.1f}-{self.F[-1] / 1e9:.1f} GHz, R={self.R})"
+        )
+
+    def memoize(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Return a memoized value of a key (calculated by func at the first use).
+
+        The value is made read-only if it is an array, and the least-recently-used
+        values are discarded beyond MAX_MEMO values.
+
+        Parameters
+        ----------
+        key
+            Hashable key of the value (e.g., its name and parameters).
+        func
+            Function (with no arguments) to calculate the value.
+
+        Returns
+        -------
+        value
+            Memoized value.
+
+        """
+        if key in self.memo:
+            self.memo.move_to_end(key)
+            return self.memo[key]
+
+        value = func()
+
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+        self.memo[key] = value
+
+        while len(self.memo) > MAX_MEMO:
+            self.memo.popitem(last=False)
+
+        return value
+
+    def D2HPBW(self) -> np.ndarray:
+        """Half-power beam width of DESHIMA 2.0 on ASTE (see instruments.D2HPBW())."""
+        return self.memoize(("D2HPBW",), lambda: D2HPBW(self.F))
+
+    def eta_mb_ruze(self, LFlimit: float, sigma: float) -> np.ndarray:
+        """Main beam efficiency by Ruze's equation (see instruments.eta_mb_ruze())."""
+        key = "eta_mb_ruze", LFlimit, sigma
+        return self.memoize(key, lambda: eta_mb_ruze(self.F, LFlimit, sigma))
+
+
+# helper functions
+def resolve_channels(
+    F: Union[ChannelGrid, ArrayLike], R: ArrayLike
+) -> Tuple[ArrayLike, ArrayLike]:
+    """Return frequencies and R of channels which may be given as a ChannelGrid.
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels or a ChannelGrid.
+    R
+        Spectral resolving power given as an argument
+        (DefaultR if it is not given explicitly).
+
+    Returns
+    -------
+    F
+        Frequency of the channels (as it is if F is not a ChannelGrid).
+    R
+        R of the grid if specified, otherwise R of the argument.
+
+    Raises
+    ------
+    ValueError
+        If R of the argument is given explicitly and differs from R of the grid.
+
+    """
+    if not isinstance(F, ChannelGrid):
+        return F, R
+
+    if F.R is None or isinstance(R, DefaultR):
+        return F.F, R if F.R is None else F.R
+
+    shape = F.F.shape
+
+    if not np.array_equal(np.broadcast_to(R, shape), np.broadcast_to(F.R, shape)):
+        raise ValueError("R must not differ from R of the channel grid.")
+
+    return F.F, F.R
+
+
+def resolve_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return parameters where F given as a ChannelGrid is resolved to F and R.
+
+    Parameters
+    ----------
+    params
+        Parameters of spectrometer_sensitivity().
+
+    Returns
+    -------
+    params
+        Copy of the parameters with F of the frequencies and R of the grid
+        (see resolve_channels()), or the parameters as they are
+        if F is not a ChannelGrid.
+
+    """
+    F = params.get("F")
+
+    if not isinstance(F, ChannelGrid):
+        return params
+
+    resolved = dict(params)
+    resolved["F"], R = resolve_channels(F, params.get("R", DefaultR(np.nan)))
+
+    if F.R is not None:
+        resolved["R"] = R
+
+    return resolved
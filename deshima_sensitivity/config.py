@@ -0,0 +1,292 @@
+__all__ = [
+    "Telescope",
+    "Optics",
+    "Detector",
+    "Observation",
+    "to_params",
+    "to_inputs",
+]
+
+
+# standard library
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Sequence, Union
+
+
+# dependent packages
+import numpy as np
+from .atmosphere import Profile
+from .cache import digest
+from .chain import Stage
+from .simulator import depends_on, evaluate, get_inputs, graph
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+INPUTS = get_inputs()  # inputs of spectrometer_sensitivity() and their defaults
+
+
+# main classes
+class Telescope(NamedTuple):
+    """Configuration of a telescope (parameters of spectrometer_sensitivity()).
+
+    Like the other configurations (Optics, Detector and Observation),
+    it is an immutable tuple without instance dictionary, which is pickled
+    as cheaply as a plain tuple (e.g., to worker processes). It is hashed
+    and compared by value (including array contents, see value_key()),
+    so that it can be used as a key of caches. Frequency-independent
+    quantities derived from the fields (e.g., Ag and omega_mb) are
+    calculated only once per value (see Telescope.derived) and
+    given to the evaluation as precomputed inputs by to_inputs()
+    and sweep.evaluate_configs() (or sweep.run_sweep(configs=...)).
+    spectrometer_sensitivity(**to_params(...)) calculates them again.
+
+    Example
+    --------
+        Evaluate a telescope and a detector against a channel grid::
+
+            aste = Telescope(telescope_diameter=10.0)
+            result = spectrometer_sensitivity(**to_params(aste, Detector(), F=F))
+
+        The same outputs with the derived quantities precomputed::
+
+            values = evaluate(to_inputs(aste, Detector(), F=F), ["MDLF"])
+
+    """
+
+    telescope_diameter: float = INPUTS["telescope_diameter"]
+    eta_M1_spill: ArrayLike = INPUTS["eta_M1_spill"]
+    eta_M2_spill: ArrayLike = INPUTS["eta_M2_spill"]
+    eta_mb: ArrayLike = INPUTS["eta_mb"]
+    theta_maj: ArrayLike = INPUTS["theta_maj"]
+    theta_min: ArrayLike = INPUTS["theta_min"]
+    Tp_amb: ArrayLike = INPUTS["Tp_amb"]
+
+    def __hash__(self) -> int:
+        return hash(value_key(self))
+
+    def __eq__(self, other: object) -> bool:
+        return same_value(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not same_value(self, other)
+
+    @property
+    def derived(self) -> Dict[str, Any]:
+        """Frequency-independent quantities derived from the fields."""
+        return dict(derive(self))
+
+
+class Optics(NamedTuple):
+    """Configuration of the warm and cold optics (see Telescope)."""
+
+    eta_wo_spill: ArrayLike = INPUTS["eta_wo_spill"]
+    n_wo_mirrors: int = INPUTS["n_wo_mirrors"]
+    window_AR: bool = INPUTS["window_AR"]
+    eta_co: ArrayLike = INPUTS["eta_co"]
+    Tp_cabin: ArrayLike = INPUTS["Tp_cabin"]
+    Tp_co: ArrayLike = INPUTS["Tp_co"]
+    chain: Sequence[Stage] = INPUTS["chain"]
+
+    def __hash__(self) -> int:
+        return hash(value_key(self))
+
+    def __eq__(self, other: object) -> bool:
+        return same_value(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not same_value(self, other)
+
+    @property
+    def derived(self) -> Dict[str, Any]:
+        """Frequency-independent quantities derived from the fields."""
+        return dict(derive(self))
+
+
+class Detector(NamedTuple):
+    """Configuration of the filterbank and the KIDs (see Telescope)."""
+
+    R: float = INPUTS["R"]
+    eta_lens_antenna_rad: ArrayLike = INPUTS["eta_lens_antenna_rad"]
+    eta_circuit: ArrayLike = INPUTS["eta_circuit"]
+    eta_IBF: ArrayLike = INPUTS["eta_IBF"]
+    KID_excess_noise_factor: float = INPUTS["KID_excess_noise_factor"]
+    Tp_chip: ArrayLike = INPUTS["Tp_chip"]
+    profile: Profile = INPUTS["profile"]
+    eta_pol: ArrayLike = INPUTS["eta_pol"]
+
+    def __hash__(self) -> int:
+        return hash(value_key(self))
+
+    def __eq__(self, other: object) -> bool:
+        return same_value(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not same_value(self, other)
+
+    @property
+    def derived(self) -> Dict[str, Any]:
+        """Frequency-independent quantities derived from the fields."""
+        return dict(derive(self))
+
+
+class Observation(NamedTuple):
+    """Configuration of an observation and its conditions (see Telescope)."""
+
+    pwv: float = INPUTS["pwv"]
+    EL: float = INPUTS["EL"]
+    snr: float = INPUTS["snr"]
+    obs_hours: float = INPUTS["obs_hours"]
+    on_source_fraction: float = INPUTS["on_source_fraction"]
+    on_off: bool = INPUTS["on_off"]
+    Tb_cmb: ArrayLike = INPUTS["Tb_cmb"]
+
+    def __hash__(self) -> int:
+        return hash(value_key(self))
+
+    def __eq__(self, other: object) -> bool:
+        return same_value(self, other)
+
+    def __ne__(self, other: object) -> bool:
+        return not same_value(self, other)
+
+    @property
+    def derived(self) -> Dict[str, Any]:
+        """Frequency-independent quantities derived from the fields."""
+        return dict(derive(self))
+
+
+# type aliases (after the definition of the classes)
+Config = Union[Telescope, Optics, Detector, Observation]
+
+
+# main functions
+def to_params(*configs: Config, **params: Any) -> Dict[str, Any]:
+    """Merge configurations into parameters of spectrometer_sensitivity().
+
+    Parameters
+    ----------
+    configs
+        Configurations (Telescope, Optics, Detector and/or Observation).
+    params
+        Other parameters (e.g., F). They override the fields of configs.
+
+    Returns
+    -------
+    params
+        Dictionary of parameter names and values.
+
+    """
+    merged = {}
+
+    for config in configs:
+        merged.update(config._asdict())
+
+    merged.update(params)
+    get_inputs(**merged)  # check the names of parameters
+    return merged
+
+
+def to_inputs(*configs: Config, **params: Any) -> Dict[str, Any]:
+    """Merge configurations into inputs of evaluate() with derived quantities.
+
+    Unlike to_params(), the quantities derived from each configuration
+    (see derive()) are included as precomputed inputs, which evaluate()
+    then uses instead of calculating them again. Derived quantities which
+    depend on fields overridden by params (or by the later configurations)
+    are not included.
+
+    Parameters
+    ----------
+    configs
+        Configurations (Telescope, Optics, Detector and/or Observation).
+    params
+        Other parameters (e.g., F). They override the fields of configs.
+
+    Returns
+    -------
+    inputs
+        Dictionary of input names and values (see simulator.get_inputs())
+        updated by the derived quantities.
+
+    """
+    inputs = get_inputs(**to_params(*configs, **params))
+    quantities = graph(inputs)
+
+    for index, config in enumerate(configs):
+        overridden = set(params).union(*(c._fields for c in configs[index + 1 :]))
+        own = graph(config._asdict())
+
+        for name, value in derive(config).items():
+            if quantities.get(name) != own[name]:
+                continue  # defined differently (e.g., by the optical chain)
+
+            if not depends_on(name, overridden, own):
+                inputs[name] = value
+
+    return inputs
+
+
+# helper functions
+def value_key(config: Config) -> str:
+    """Return a digest of a configuration by value (including array contents).
+
+    Functions in the fields are digested by identity, which is valid
+    while the configuration (which refers to them) is alive.
+
+    """
+    fields = dict(config._asdict(), __class__=type(config).__name__)
+    return digest(fields, identity=True)
+
+
+def same_value(config: Config, other: object) -> bool:
+    """Return whether two configurations are of the same type and value."""
+    if type(config) is not type(other):
+        return False
+
+    return value_key(config) == value_key(other)
+
+
+@lru_cache(maxsize=1024)
+def derive(config: Config) -> Dict[str, Any]:
+    """Calculate all quantities which depend only on the fields of a configuration.
+
+    Parameters
+    ----------
+    config
+        Configuration (hashed by value, so that it is calculated once per value).
+
+    Returns
+    -------
+    derived
+        Dictionary of the names and values of the quantities (read-only).
+
+    """
+    inputs = config._asdict()
+    quantities = graph(inputs)
+    names, known = [], set(inputs)
+
+    # quantities are added until none of the others is computable
+    while True:
+        new = [
+            name
+            for name, (_, args) in quantities.items()
+            if name not in known and set(args) <= known
+        ]
+
+        if not new:
+            break
+
+        names += new
+        known.update(new)
+
+    values = evaluate(inputs, names)
+
+    for value in values.values():
+        if isinstance(value, np.ndarray):
+            value.setflags(write=False)
+
+    return values
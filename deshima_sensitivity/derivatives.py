@@ -0,0 +1,210 @@
+__all__ = ["log_derivatives"]
+
+
+# standard library
+import warnings
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+# dependent packages
+import numpy as np
+from .simulator import SensitivityResult, depends_on, get_inputs, graph
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+STEP = 1e-20  # relative step of the complex-step derivative
+STEP_REAL = 1e-6  # relative step of the central difference (fallback)
+
+
+# main functions
+def log_derivatives(
+    output: str = "MDLF",
+    wrt: Optional[Sequence[str]] = None,
+    as_dataframe: bool = False,
+    **params: Any,
+) -> SensitivityResult:
+    """Calculate logarithmic derivatives of an output with respect to inputs.
+
+    The derivatives d(log output) / d(log param) of every channel are calculated
+    by the chain rule in a single reverse (adjoint) pass over the graph
+    of quantities of spectrometer_sensitivity(), after one forward evaluation.
+    Because every quantity is elementwise in frequency, adjoints are kept
+    per channel and all parameters are obtained in the same pass.
+
+    The partial derivative of each quantity with respect to its arguments
+    is calculated by the complex-step method, which is exact to rounding
+    for analytic expressions (e.g., rad_trans(), window transmission,
+    photon_NEP_kid(), NEF and MDLF) without any truncation error.
+    Quantities which do not support complex numbers (e.g., the interpolation
+    of the atmospheric transmission) fall back to central differences.
+
+    Parameters
+    ----------
+    output
+        Name of the output to be differentiated. See spectrometer_sensitivity().
+    wrt
+        Names of inputs with respect to which the output is differentiated.
+        If not specified, all numerical (non-boolean) inputs except F
+        (the derivative with respect to the frequency of the channels is
+        dominated by the fine structure of the atmospheric transmission).
+    as_dataframe
+        Whether to return the results as a pandas DataFrame (True)
+        or a SensitivityResult of NumPy arrays (False).
+    params
+        Parameters of spectrometer_sensitivity() (e.g., F, pwv, EL).
+
+    Returns
+    -------
+    result
+        SensitivityResult (or DataFrame) of the input names and
+        their logarithmic derivatives (per channel). Units: None.
+
+    Example
+    --------
+        Which efficiency has the largest impact on MDLF::
+
+            result = log_derivatives("MDLF", F=F, pwv=0.5)
+            dlogMDLF_dlog_eta_circuit = result["eta_circuit"]
+
+    """
+    inputs = get_inputs(**params)
+
+    if wrt is None:
+        wrt = [
+            name
+            for name, value in inputs.items()
+            if name != "F" and is_differentiable(value)
+        ]
+
+    for name in wrt:
+        if name not in inputs or not is_differentiable(inputs[name]):
+            raise ValueError(f"{name} is not a differentiable parameter.")
+
+    quantities = graph(inputs)
+    values, order = trace(inputs, output, quantities)
+
+    # adjoints: d(output) / d(quantity) per channel
+    adjoints = {output: np.ones_like(np.asarray(values[output], dtype=float))}
+
+    for name in reversed(order):
+        if name not in adjoints:
+            continue
+
+        func, args = quantities[name]
+        targets = [i for i, arg in enumerate(args) if depends_on(arg, wrt, quantities)]
+
+        for i in targets:
+            partial = partial_derivative(func, [values[arg] for arg in args], i)
+            adjoint = adjoints[name] * partial
+            adjoints[args[i]] = adjoints.get(args[i], 0.0) + adjoint
+
+    columns = {}
+
+    for name in wrt:
+        adjoint = adjoints.get(name, 0.0)
+        columns[name] = adjoint * np.asarray(inputs[name]) / values[output]
+
+    result = SensitivityResult(columns)
+
+    if as_dataframe:
+        return result.to_dataframe()
+
+    return result
+
+
+# helper functions
+def trace(
+    inputs: Dict[str, Any],
+    output: str,
+    quantities: Dict[str, Tuple[Callable, Tuple[str, ...]]],
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Evaluate an output and record the order of evaluation of quantities.
+
+    Parameters
+    ----------
+    inputs
+        Dictionary of input names and values.
+    output
+        Name of the output.
+    quantities
+        Graph of quantities. See simulator.graph().
+
+    Returns
+    -------
+    values
+        Dictionary of the names and values of the inputs and quantities.
+    order
+        Names of the evaluated quantities in order of evaluation
+        (each of them after its arguments).
+
+    """
+    values = dict(inputs)
+    order = []
+
+    def get(name: str) -> Any:
+        if name not in values:
+            if name not in quantities:
+                raise ValueError(f"{name} is not a valid output.")
+
+            func, args = quantities[name]
+            values[name] = func(*map(get, args))
+            order.append(name)
+
+        return values[name]
+
+    get(output)
+    return values, order
+
+
+def partial_derivative(func: Callable, args: List[Any], index: int) -> np.ndarray:
+    """Calculate the elementwise partial derivative of a quantity.
+
+    Parameters
+    ----------
+    func
+        Function of a quantity.
+    args
+        Values of the arguments of the function.
+    index
+        Index of the argument with respect to which it is differentiated.
+
+    Returns
+    -------
+    partial
+        Partial derivative (elementwise).
+
+    """
+    x = np.asarray(args[index], dtype=float)
+    scale = np.where(x == 0.0, 1.0, np.abs(x))
+
+    def call(x):
+        return func(*args[:index], x, *args[index + 1 :])
+
+    # complex-step derivative: Im(f(x + ih)) / h
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", np.ComplexWarning)
+            value = np.asarray(call(x + 1j * STEP * scale))
+
+        if np.iscomplexobj(value):
+            return value.imag / (STEP * scale)
+    except (TypeError, ValueError, np.ComplexWarning):
+        pass
+
+    # central difference for functions of real numbers only
+    h = STEP_REAL * scale
+    return (np.asarray(call(x + h)) - np.asarray(call(x - h))) / (2.0 * h)
+
+
+def is_differentiable(value: Any) -> bool:
+    """Return whether an input value is numerical and non-boolean."""
+    try:
+        dtype = np.asarray(value).dtype
+    except ValueError:
+        return False
+
+    return dtype.kind in "iuf"
@@ -0,0 +1,194 @@
+__all__ = ["FilterBank", "read_filterbank"]
+
+
+# standard library
+from pathlib import Path
+from typing import Any, NamedTuple, Sequence, Union
+
+
+# dependent packages
+import numpy as np
+from .channels import ChannelGrid
+from .simulator import SensitivityResult, evaluate, get_inputs
+
+
+# constants
+COLUMNS = {
+    "KIDID": "kid_id",
+    "MasterID": "master_id",
+    "F": "F",
+    "Ferr": "F_err",
+    "Q": "Q",
+    "Qerr": "Q_err",
+    "eta": "eta",
+    "etaerr": "eta_err",
+    "NEP": "NEP",
+    "NEPerr": "NEP_err",
+}  # columns of a measurement file and fields of FilterBank
+
+
+# main classes
+class FilterBank(NamedTuple):
+    """Measured properties of the channels of a filterbank (struct of arrays).
+
+    Each field is a 1D array with one element per KID (channel).
+    R of each channel is given by the loaded Q of its filter (R = F / FWHM),
+    which is used both for the bandwidth of the channel and
+    the channel-averaged atmospheric transmission.
+
+    Parameters
+    ----------
+    kid_id
+        ID of the KIDs.
+    master_id
+        Master ID of the KIDs.
+    F
+        Center frequency of the filters. Units: Hz.
+    F_err
+        Error of F. Units: Hz.
+    Q
+        Loaded quality factor of the filters. Units: None.
+    Q_err
+        Error of Q. Units: None.
+    eta
+        Coupling efficiency from the filterbank circuit to the KIDs
+        (used as eta_circuit of spectrometer_sensitivity()). Units: None.
+    eta_err
+        Error of eta. Units: None.
+    NEP
+        Measured NEP of the KIDs (with respect to the absorbed power). Units: W/Hz^0.5.
+    NEP_err
+        Error of NEP. Units: W/Hz^0.5.
+
+    Example
+    --------
+        MDLF of the measured channels::
+
+            filterbank = read_filterbank("data/plot_data_recal.csv")
+            result = filterbank.evaluate(["MDLF"], pwv=0.7, EL=60.0)
+            mdlf = result["MDLF"]  # one per KID
+
+    """
+
+    kid_id: np.ndarray
+    master_id: np.ndarray
+    F: np.ndarray
+    F_err: np.ndarray
+    Q: np.ndarray
+    Q_err: np.ndarray
+    eta: np.ndarray
+    eta_err: np.ndarray
+    NEP: np.ndarray
+    NEP_err: np.ndarray
+
+    @property
+    def R(self) -> np.ndarray:
+        """Spectral resolving power of the channels (loaded Q). Units: None."""
+        return self.Q
+
+    @property
+    def channels(self) -> ChannelGrid:
+        """ChannelGrid of the frequencies and R of the channels."""
+        return ChannelGrid(self.F, self.R)
+
+    def params(self, **params: Any) -> dict:
+        """Return parameters of spectrometer_sensitivity() of the channels.
+
+        Parameters
+        ----------
+        params
+            Other parameters of spectrometer_sensitivity().
+
+        Returns
+        -------
+        params
+            Dictionary of F (ChannelGrid with R) and eta_circuit
+            of the channels, updated by params.
+
+        """
+        return {"F": self.channels, "eta_circuit": self.eta, **params}
+
+    def evaluate(
+        self,
+        outputs: Sequence[str] = ("MDLF",),
+        measured_nep: bool = False,
+        **params: Any,
+    ) -> SensitivityResult:
+        """Evaluate outputs of all channels in one vectorized call.
+
+        Parameters
+        ----------
+        outputs
+            Names of outputs to be calculated. See spectrometer_sensitivity().
+        measured_nep
+            Whether to use the measured NEP of the KIDs as NEPkid (True)
+            instead of the photon and recombination NEP at the loading
+            of the sky and the instrument (False). Note that the measured NEP
+            is valid only at the loading of the measurement.
+        params
+            Other parameters of spectrometer_sensitivity() (except F and R).
+            Per-channel values must be arrays of the same length as the channels.
+
+        Returns
+        -------
+        result
+            SensitivityResult of the outputs along the axis of KIDs (KIDID).
+
+        """
+        for name in ("F", "R"):
+            if name in params:
+                raise ValueError(f"{name} is given by the filterbank.")
+
+        inputs = get_inputs(**dict(self.params(), **params))
+
+        if measured_nep:
+            inputs["NEPkid"] = self.NEP
+
+        values = evaluate(inputs, outputs)
+        shape = self.F.shape
+        columns = {name: np.broadcast_to(values[name], shape) for name in outputs}
+        return SensitivityResult(columns, ("KIDID",), {"KIDID": self.kid_id})
+
+
+# main functions
+def read_filterbank(path: Union[Path, str]) -> FilterBank:
+    """Read measured properties of a filterbank from a CSV file.
+
+    The file has a header line (commented by #) of the names of the columns,
+    KIDID, MasterID, F (GHz), Ferr (GHz), Q, Qerr, eta, etaerr,
+    NEP (W/Hz^0.5) and NEPerr (W/Hz^0.5), and one line per KID.
+    Other columns in the file are ignored. It is read at once into arrays,
+    which scales to thousands of KIDs.
+
+    Parameters
+    ----------
+    path
+        Path of the file (e.g., data/plot_data_recal.csv of the repository).
+
+    Returns
+    -------
+    filterbank
+        FilterBank of the KIDs. Frequencies are converted to Hz.
+
+    """
+    with open(path) as f:
+        header = f.readline().lstrip("#").split(",")
+
+    names = [name.strip() for name in header]
+
+    missing = [name for name in COLUMNS if name not in names]
+
+    if missing:
+        raise ValueError(f"{', '.join(missing)} not in the columns of {path}.")
+
+    usecols = [names.index(name) for name in COLUMNS]
+    data = np.loadtxt(path, delimiter=",", comments="#", ndmin=2, usecols=usecols)
+    fields = {field: data[:, i] for i, field in enumerate(COLUMNS.values())}
+
+    for name in ("kid_id", "master_id"):
+        fields[name] = fields[name].astype(int)
+
+    for name in ("F", "F_err"):
+        fields[name] = fields[name] * 1e9
+
+    return FilterBank(**fields)
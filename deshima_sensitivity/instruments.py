@@ -1,5 +1,5 @@
 # standard library
-from typing import List, Union, Tuple
+from typing import List, Optional, Union, Tuple
 
 
 # dependent packages
@@ -57,7 +57,9 @@ def eta_mb_ruze(F: ArrayLike, LFlimit: float, sigma: float) -> ArrayLike:
     return LFlimit * np.exp(-((4.0 * np.pi * sigma * F / c) ** 2.0))
 
 
-def photon_NEP_kid(F: ArrayLike, Pkid: ArrayLike, W_F: ArrayLike) -> ArrayLike:
+def photon_NEP_kid(
+    F: ArrayLike, Pkid: ArrayLike, W_F: ArrayLike, out: Optional[np.ndarray] = None,
+) -> ArrayLike:
     """NEP of the KID, with respect to the absorbed power.
 
     Parameters
@@ -68,6 +70,9 @@ def photon_NEP_kid(F: ArrayLike, Pkid: ArrayLike, W_F: ArrayLike) -> ArrayLike:
         Power absorbed by the KID. Units: W.
     W_F
         Detection bandwidth, with respect to the power that sets the loading. Units: Hz.
+    out
+        Array of the broadcasted shape where the result is stored
+        without allocating temporary arrays. It must not share memory with Pkid.
 
     Returns
     -------
@@ -79,11 +84,22 @@ def photon_NEP_kid(F: ArrayLike, Pkid: ArrayLike, W_F: ArrayLike) -> ArrayLike:
     Pkid/(W_F * h * F) gives the occupation number.
 
     """
-    # photon_term = 2 * Pkid * (h*F + Pkid/W_F)
-    poisson_term = 2 * Pkid * h * F
-    bunching_term = 2 * Pkid * Pkid / W_F
-    r_term = 4 * Delta_Al * Pkid / eta_pb
-    return np.sqrt(poisson_term + bunching_term + r_term)
+    if out is None:
+        # photon_term = 2 * Pkid * (h*F + Pkid/W_F)
+        poisson_term = 2 * Pkid * h * F
+        bunching_term = 2 * Pkid * Pkid / W_F
+        r_term = 4 * Delta_Al * Pkid / eta_pb
+        return np.sqrt(poisson_term + bunching_term + r_term)
+
+    # 2 * Pkid * ((h*F + 2*Delta_Al/eta_pb) * W_F + Pkid) / W_F, evaluated in place
+    np.multiply(F, h, out=out)
+    np.add(out, 2 * Delta_Al / eta_pb, out=out)
+    np.multiply(out, W_F, out=out)
+    np.add(out, Pkid, out=out)
+    np.divide(out, W_F, out=out)
+    np.multiply(out, Pkid, out=out)
+    np.multiply(out, 2.0, out=out)
+    return np.sqrt(out, out=out)
 
 
 def window_trans(
@@ -95,7 +111,7 @@ def window_trans(
     tandelta: float = 4.805e-4,
     tan2delta: float = 1.0e-8,
     neffHDPE: float = 1.52,
-    window_AR: bool = True,
+    window_AR: Union[bool, ArrayLike] = True,
 ) -> Tuple[ArrayLike, ArrayLike]:
     """Calculates the window transmission.
 
@@ -131,21 +147,8 @@ def window_trans(
         Transmission of the window. Units: None.
 
     """
-    # Parameters to calcualte the window (HDPE), data from Stephen
-    # reflection. ((1-neffHDPE)/(1+neffHDPE))^2. Set to 0 for Ar coated.
-
-    if window_AR:
-        HDPErefl = 0.0
-    else:
-        HDPErefl = ((1 - neffHDPE) / (1 + neffHDPE)) ** 2
-
-    eta_HDPE = np.exp(
-        -thickness
-        * 2
-        * np.pi
-        * neffHDPE
-        * (tandelta * F / c + tan2delta * (F / c) ** 2)
-    )
+    HDPErefl = window_refl(window_AR, neffHDPE)
+    eta_HDPE = window_eta_HDPE(F, thickness, tandelta, tan2delta, neffHDPE)
 
     # most of the reflected power sees the cold.
     psd_after_1st_refl = rad_trans(psd_in, psd_co, 1.0 - HDPErefl)
@@ -156,3 +159,67 @@ def window_trans(
     eta_window = (1.0 - HDPErefl) ** 2 * eta_HDPE
 
     return psd_after_2nd_refl, eta_window
+
+
+def window_refl(window_AR: Union[bool, ArrayLike], neffHDPE: float = 1.52) -> ArrayLike:
+    """Calculates the reflection at each surface of the window.
+
+    Parameters
+    ----------
+    window_AR
+        Whether the window is supposed to be coated by Ar (True) or not (False).
+    neffHDPE
+        Refractive index of HDPE. Set to 1 to remove reflections. Units : None.
+
+    Returns
+    -------
+    HDPErefl
+        Reflection at each surface of the window. Units: None.
+
+    """
+    # Parameters to calcualte the window (HDPE), data from Stephen
+    # reflection. ((1-neffHDPE)/(1+neffHDPE))^2. Set to 0 for Ar coated.
+    if np.ndim(window_AR) == 0:
+        if window_AR:
+            return 0.0
+        else:
+            return ((1 - neffHDPE) / (1 + neffHDPE)) ** 2
+    else:
+        return np.where(window_AR, 0.0, ((1 - neffHDPE) / (1 + neffHDPE)) ** 2)
+
+
+def window_eta_HDPE(
+    F: ArrayLike,
+    thickness: ArrayLike = 8.0e-3,
+    tandelta: float = 4.805e-4,
+    tan2delta: float = 1.0e-8,
+    neffHDPE: float = 1.52,
+) -> ArrayLike:
+    """Calculates the transmission of the bulk of the window (dielectric loss).
+
+    Parameters
+    ----------
+    F
+        Frequency. Units: Hz.
+    thickness
+        Thickness of the HDPE window. Units: m.
+    tandelta
+        See window_trans().
+    tan2delta
+        See window_trans().
+    neffHDPE
+        Refractive index of HDPE. Units : None.
+
+    Returns
+    -------
+    eta_HDPE
+        Transmission of the bulk of the window. Units: None.
+
+    """
+    return np.exp(
+        -thickness
+        * 2
+        * np.pi
+        * neffHDPE
+        * (tandelta * F / c + tan2delta * (F / c) ** 2)
+    )
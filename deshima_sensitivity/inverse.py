@@ -0,0 +1,275 @@
+__all__ = ["required_obs_hours", "max_pwv", "min_EL"]
+
+
+# standard library
+from typing import Any, Callable, List, Optional, Union
+
+
+# dependent packages
+import numpy as np
+from .simulator import InstrumentModel
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+PWV_MAX = 10.0  # upper limit of PWV searched by max_pwv() (mm)
+EL_MIN = 1.0  # lower limit of EL searched by min_EL() (degrees)
+
+
+# main functions
+def required_obs_hours(
+    MDLF: ArrayLike,
+    pwv: ArrayLike = 0.5,
+    EL: ArrayLike = 60.0,
+    model: Optional[InstrumentModel] = None,
+    **params: Any,
+) -> np.ndarray:
+    """Calculate the observing hours required to reach target line fluxes.
+
+    Because MDLF scales as obs_hours ** -0.5, it is calculated in closed form
+    from MDLF at the observing hours of the model: obs_hours * (MDLF / target)**2.
+    The atmospheric transmission is interpolated by the lookup table of
+    the model (InstrumentModel.lookup), or calculated by the full model
+    (eta_atm_broadcast()) for pwv and EL out of its grid (e.g., pwv > 2 mm).
+
+    Parameters
+    ----------
+    MDLF
+        Target minimum detectable line flux (at the snr of the model),
+        broadcasted against F (e.g., an array of the shape (n, 1)
+        for n targets). Units: W / m^2.
+    pwv
+        Precipitable water vapour (broadcasted against F). Units: mm.
+    EL
+        Telescope elevation angle (broadcasted against F). Units: degrees.
+    model
+        Precomputed InstrumentModel. If not specified, it is created from params.
+    params
+        Parameters of spectrometer_sensitivity() except pwv and EL.
+
+    Returns
+    -------
+    obs_hours
+        Required observing hours (including the off-source time and overheads)
+        per target and channel. Units: hours.
+
+    Example
+    --------
+        Hours to reach 2e-19 W/m^2 at 5 sigma::
+
+            obs_hours = required_obs_hours(2e-19, pwv=0.7, EL=60.0, F=F, snr=5.0)
+
+    """
+    if model is None:
+        model = InstrumentModel(**params)
+
+    MDLF_model = model.channelwise(pwv, EL, ["MDLF"])["MDLF"]
+    return model.values["obs_hours"] * (MDLF_model / np.asarray(MDLF)) ** 2
+
+
+def max_pwv(
+    MDLF: ArrayLike,
+    EL: ArrayLike = 60.0,
+    model: Optional[InstrumentModel] = None,
+    xtol: float = 1e-4,
+    **params: Any,
+) -> np.ndarray:
+    """Calculate the maximum PWV at which target line fluxes are detectable.
+
+    It is solved by bisection of log(MDLF) (which increases with PWV)
+    for all targets and channels at once, first within the PWV grid of
+    the lookup table of the atmospheric transmission (InstrumentModel.lookup,
+    0.1-2.0 mm by default), and then up to PWV_MAX for the targets
+    detectable at the upper end of the grid, where the transmission
+    is calculated by the full model (as for EL out of the grid).
+    Note that the ALMA table is not extrapolated beyond its PWV range
+    (2.0 mm), so that MDLF of the default model does not increase above it.
+
+    Parameters
+    ----------
+    MDLF
+        Target minimum detectable line flux, broadcasted against F. Units: W / m^2.
+    EL
+        Telescope elevation angle (broadcasted against F). Units: degrees.
+    model
+        Precomputed InstrumentModel. If not specified, it is created from params.
+    xtol
+        Absolute tolerance of PWV. Units: mm.
+    params
+        Parameters of spectrometer_sensitivity() except pwv and EL.
+
+    Returns
+    -------
+    pwv
+        Maximum PWV per target and channel. Units: mm.
+        It is infinity if the target is detectable even at PWV_MAX,
+        or NaN if it is not detectable even at the lower end of the grid.
+
+    """
+    if model is None:
+        model = InstrumentModel(**params)
+
+    def func(pwv):
+        return model.channelwise(pwv, EL, ["MDLF"])["MDLF"]
+
+    lower, upper = model.lookup.pwv[[0, -1]]
+    return solve_beyond(func, MDLF, lower, upper, PWV_MAX, xtol, np.inf)
+
+
+def min_EL(
+    MDLF: ArrayLike,
+    pwv: ArrayLike = 0.5,
+    model: Optional[InstrumentModel] = None,
+    xtol: float = 1e-3,
+    **params: Any,
+) -> np.ndarray:
+    """Calculate the minimum elevation at which target line fluxes are detectable.
+
+    It is solved by bisection of log(MDLF) (which decreases with EL)
+    for all targets and channels at once, first within the EL grid of
+    the lookup table of the atmospheric transmission (InstrumentModel.lookup,
+    about 20-90 deg by default), and then down to EL_MIN for the targets
+    detectable at the lower end of the grid. pwv can be out of the grid
+    of the table (e.g., pwv > 2 mm). Out of the grid, the transmission
+    is calculated by the full model.
+
+    Parameters
+    ----------
+    MDLF
+        Target minimum detectable line flux, broadcasted against F. Units: W / m^2.
+    pwv
+        Precipitable water vapour (broadcasted against F). Units: mm.
+    model
+        Precomputed InstrumentModel. If not specified, it is created from params.
+    xtol
+        Absolute tolerance of EL. Units: degrees.
+    params
+        Parameters of spectrometer_sensitivity() except pwv and EL.
+
+    Returns
+    -------
+    EL
+        Minimum elevation angle per target and channel. Units: degrees.
+        It is minus infinity if the target is detectable even at EL_MIN,
+        or NaN if it is not detectable even at the zenith.
+
+    """
+    if model is None:
+        model = InstrumentModel(**params)
+
+    def func(EL):
+        return model.channelwise(pwv, EL, ["MDLF"])["MDLF"]
+
+    # MDLF is minimum at the zenith (the first element of the grid)
+    lower, upper = model.lookup.EL[[0, -1]]
+    return solve_beyond(func, MDLF, lower, upper, EL_MIN, xtol, -np.inf)
+
+
+# helper functions
+def solve_beyond(
+    func: Callable[[np.ndarray], np.ndarray],
+    target: ArrayLike,
+    lower: float,
+    upper: float,
+    limit: float,
+    xtol: float,
+    unbounded: float,
+) -> np.ndarray:
+    """Find where a function crosses targets within an interval and beyond it.
+
+    Targets which are not crossed within (lower, upper) are solved again
+    within (upper, limit), e.g., out of the grid of a lookup table.
+
+    Parameters
+    ----------
+    func
+        Positive, monotonic function (increasing from lower to limit).
+    target
+        Targets of the function.
+    lower
+        End of the interval where the function is minimum.
+    upper
+        Other end of the first interval (between lower and limit).
+    limit
+        End of the extended interval where the function is maximum.
+    xtol
+        Absolute tolerance of x.
+    unbounded
+        Value of the solutions where func(limit) <= target.
+
+    Returns
+    -------
+    x
+        Solutions: unbounded where func(limit) <= target,
+        NaN where func(lower) > target.
+
+    """
+    x = solve(func, target, lower, upper, xtol)
+    beyond = x == upper
+
+    if not np.any(beyond):
+        return x
+
+    x_beyond = solve(func, target, upper, limit, xtol)
+    x_beyond = np.where(x_beyond == limit, unbounded, x_beyond)
+    return np.where(beyond, x_beyond, x)
+
+
+def solve(
+    func: Callable[[np.ndarray], np.ndarray],
+    target: ArrayLike,
+    lower: float,
+    upper: float,
+    xtol: float,
+) -> np.ndarray:
+    """Find where a positive, monotonic function crosses targets.
+
+    The logarithm of the function is bisected for all elements at once
+    in each iteration, where x and the function are broadcasted
+    against the targets.
+
+    Parameters
+    ----------
+    func
+        Positive, monotonic function (increasing from lower to upper).
+    target
+        Targets of the function.
+    lower
+        End of the interval where the function is minimum
+        (it can be larger than upper for a decreasing function).
+    upper
+        End of the interval where the function is maximum.
+    xtol
+        Absolute tolerance of x.
+
+    Returns
+    -------
+    x
+        Solutions: upper where func(upper) <= target,
+        NaN where func(lower) > target.
+
+    """
+    log_target = np.log(target)
+
+    def f(x):
+        with np.errstate(divide="ignore"):
+            return np.log(func(x)) - log_target
+
+    f_lower, f_upper = f(lower), f(upper)
+    shape = np.broadcast(f_lower, f_upper).shape
+    x_lower = np.full(shape, float(lower))
+    x_upper = np.full(shape, float(upper))
+    n_iter = int(np.ceil(np.log2(abs(upper - lower) / xtol)))
+
+    for _ in range(max(n_iter, 0)):
+        x = 0.5 * (x_lower + x_upper)
+        below = f(x) <= 0.0
+        x_lower = np.where(below, x, x_lower)
+        x_upper = np.where(below, x_upper, x)
+
+    x = 0.5 * (x_lower + x_upper)
+    x = np.where(f_upper <= 0.0, float(upper), x)
+    return np.where(f_lower > 0.0, np.nan, x)
@@ -0,0 +1,204 @@
+__all__ = ["LinearResponse", "linear_response"]
+
+
+# standard library
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+
+# dependent packages
+import numpy as np
+from .chain import OpticalChain
+from .physics import johnson_nyquist_psd
+from .simulator import evaluate, get_inputs
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+SOURCES = ("cmb", "atm", "amb", "cabin", "co", "chip")  # thermal sources
+
+TEMPERATURES = {
+    "cmb": "Tb_cmb",
+    "atm": "Tp_amb",
+    "amb": "Tp_amb",
+    "cabin": "Tp_cabin",
+    "co": "Tp_co",
+    "chip": "Tp_chip",
+}  # temperature (input of spectrometer_sensitivity()) of each source
+
+LOADINGS = {
+    "sky": ("cmb", "atm"),
+    "warm": ("amb", "cabin"),
+    "cold": ("co", "chip"),
+}  # sources of each loading (if the breakdown of the chain is not given)
+
+
+# main functions
+def linear_response(**params: Any) -> "LinearResponse":
+    """Compile the optical chain into linear response coefficients.
+
+    Every stage of the optical chain (rad_trans() and window_trans())
+    is affine in the input PSDs. Therefore the PSD absorbed by the KID
+    is a weighted sum of the Johnson-Nyquist PSDs of the thermal sources:
+    CMB, atmosphere, ambient (telescope mirrors), cabin, cold optics and chip.
+    The weights (coefficients) are calculated by propagating unit vectors
+    of the sources through the same chain as spectrometer_sensitivity(),
+    as well as those of the breakdown of the loading (e.g., psd_KID_sky).
+
+    Parameters
+    ----------
+    params
+        Parameters of spectrometer_sensitivity() (e.g., F, pwv, EL and
+        the efficiencies). Temperatures are not used for the coefficients,
+        but they are kept as the defaults of LinearResponse.
+
+    Returns
+    -------
+    response
+        LinearResponse of the optical chain.
+
+    Example
+    --------
+        Sweep the cabin temperature without re-running the chain::
+
+            response = linear_response(F=F, pwv=0.5, EL=60.0)
+            psd_KID = response.psd_KID(Tp_cabin=np.linspace(280, 300, 21)[:, None])
+
+    """
+    inputs = get_inputs(**params)
+    ndim = max(np.ndim(value) for name, value in inputs.items() if name != "chain")
+
+    # unit vector of each source along a new first axis
+    basis = np.eye(len(SOURCES)).reshape((len(SOURCES),) * 2 + (1,) * ndim)
+
+    for source, unit in zip(SOURCES, basis):
+        inputs[f"psd_jn_{source}"] = unit
+
+    names = OpticalChain(inputs["chain"]).loadings
+    values = evaluate(inputs, ("psd_KID",) + names)
+    loadings = {name[len("psd_KID_") :]: values[name] for name in names}
+    temperatures = {name: inputs[name] for name in set(TEMPERATURES.values())}
+    return LinearResponse(inputs["F"], values["psd_KID"], temperatures, loadings)
+
+
+# helper classes
+class LinearResponse:
+    """Linear response of the optical chain to the thermal sources.
+
+    The PSD absorbed by the KID is calculated by
+    psd_KID = sum_i coeffs[i] * johnson_nyquist_psd(F, T_i),
+    where i is one of the sources (SOURCES) and T_i is its temperature.
+    Temperatures can be arrays which broadcast against F,
+    e.g., an array of the shape (n, 1) for a sweep of n temperatures.
+
+    Parameters
+    ----------
+    F
+        Frequency. Units: Hz.
+    coeffs
+        Coefficients of the sources with the shape of (len(SOURCES), ...).
+        Units: None.
+    temperatures
+        Default temperatures (Tb_cmb, Tp_amb, Tp_cabin, Tp_co, Tp_chip).
+        Units: K.
+    loadings
+        Dictionary of the names (e.g., sky, warm, cold) and coefficients
+        of the breakdown of the loading of the chain. If not specified,
+        the coefficients of the sources are grouped by LOADINGS.
+
+    """
+
+    def __init__(
+        self,
+        F: ArrayLike,
+        coeffs: np.ndarray,
+        temperatures: Dict[str, ArrayLike],
+        loadings: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        if loadings is None:
+            shape = (len(SOURCES),) + (1,) * (np.ndim(coeffs) - 1)
+            loadings = {
+                name: coeffs * np.isin(SOURCES, sources).reshape(shape)
+                for name, sources in LOADINGS.items()
+            }
+
+        self.F = F
+        self.coeffs = coeffs
+        self.temperatures = temperatures
+        self.loadings = loadings
+
+    def __getitem__(self, source: str) -> np.ndarray:
+        """Return the coefficient of a source."""
+        return self.coeffs[SOURCES.index(source)]
+
+    def psd_KID(
+        self, sources: Sequence[str] = SOURCES, **temperatures: ArrayLike
+    ) -> np.ndarray:
+        """Calculate the PSD absorbed by the KID.
+
+        Parameters
+        ----------
+        sources
+            Sources to be included. By default, all sources.
+        temperatures
+            Temperatures (Tb_cmb, Tp_amb, Tp_cabin, Tp_co, Tp_chip) to override
+            the defaults. Units: K.
+
+        Returns
+        -------
+        psd_KID
+            PSD absorbed by the KID. Units: W / Hz.
+
+        """
+        return self._combine(self.coeffs, sources, temperatures)
+
+    def loading(self, **temperatures: ArrayLike) -> Dict[str, np.ndarray]:
+        """Calculate the breakdown of the loading absorbed by the KID.
+
+        Each loading (e.g., sky, warm and cold) is calculated from
+        its own coefficients, so that they are the same as psd_KID_sky,
+        psd_KID_warm and psd_KID_cold of spectrometer_sensitivity().
+        For the chain of DESHIMA, they do not add up to psd_KID exactly
+        (see chain.DESHIMA_BREAKDOWN).
+
+        Parameters
+        ----------
+        temperatures
+            Temperatures to override the defaults. See LinearResponse.psd_KID().
+
+        Returns
+        -------
+        loading
+            Dictionary of the names and PSDs of the loadings. Units: W / Hz.
+
+        """
+        return {
+            name: self._combine(coeffs, SOURCES, temperatures)
+            for name, coeffs in self.loadings.items()
+        }
+
+    def _combine(
+        self,
+        coeffs: np.ndarray,
+        sources: Sequence[str],
+        temperatures: Dict[str, ArrayLike],
+    ) -> np.ndarray:
+        """Sum the PSDs of the sources weighted by the coefficients."""
+        for name in temperatures:
+            if name not in self.temperatures:
+                raise ValueError(f"{name} is not a valid temperature.")
+
+        temperatures = dict(self.temperatures, **temperatures)
+        psds = {}  # PSDs of temperatures (e.g., amb and atm) are shared
+
+        def psd(source):
+            name = TEMPERATURES[source]
+
+            if name not in psds:
+                psds[name] = johnson_nyquist_psd(self.F, temperatures[name])
+
+            return coeffs[SOURCES.index(source)] * psds[name]
+
+        return sum(psd(source) for source in sources)
@@ -0,0 +1,362 @@
+__all__ = ["DesignOptimizer", "pareto_front"]
+
+
+# standard library
+from itertools import product
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+
+# dependent packages
+import numpy as np
+from .atmosphere import (
+    atm_table,
+    channel_average,
+    channel_response,
+    eta_atm_func,
+    is_boxcar,
+)
+from .simulator import SensitivityResult, Workspace, evaluate, get_inputs
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+
+
+# constants
+DESIGN = ("R", "eta_IBF", "n_channels")  # parameters of a design
+OBJECTIVES = {
+    "MS_sum": "max",
+    "MDLF_median": "min",
+    "n_channels": "min",
+}  # objectives of a design and their directions
+
+
+# main classes
+class DesignOptimizer:
+    """Optimizer of the design of a filter bank over a band and a PWV distribution.
+
+    A design is a combination of the spectral resolution (R),
+    the in-band fraction (eta_IBF) and the number of channels (n_channels)
+    which are log-spaced over the band. Each design is evaluated for samples
+    of PWV (e.g., drawn from the distribution of a site) and scored by
+    the mapping speed summed over the channels (averaged over the samples),
+    and the median MDLF over the channels and the samples.
+
+    Designs are evaluated in vectorized batches: channels of the designs
+    are packed into a (designs, channels) array padded by NaN, and
+    the atmospheric transmission of them is averaged from high-resolution
+    spectra which are calculated only once per optimizer
+    by the response profile of the channels (profile of the fixed parameters).
+    A batch is then evaluated as rows of (PWV samples, designs) in a Workspace
+    of the simulator, sized for (samples x batch, max channels), which keeps
+    the packed frequencies, the transmission and the intermediate quantities
+    (e.g., PSDs and NEPs, see simulator.evaluate()) across the batches.
+
+    Parameters
+    ----------
+    band
+        Lower and upper frequency of the band. Units: Hz.
+    pwv
+        Samples of precipitable water vapour. Units: mm.
+    EL
+        Telescope elevation angle. Units: degrees.
+    params
+        Other (fixed) parameters of spectrometer_sensitivity().
+
+    Example
+    --------
+        Search the Pareto front of R and eta_IBF at the median PWV of a site::
+
+            optimizer = DesignOptimizer(band=(220e9, 440e9), pwv=[0.6, 1.0, 1.6])
+            result = optimizer.search(R=np.arange(100, 1001, 10), eta_IBF=[0.4, 0.5])
+            front = result.to_dataframe()[result["pareto"]]
+
+    """
+
+    def __init__(
+        self,
+        band: Tuple[float, float] = (220.0e9, 440.0e9),
+        pwv: ArrayLike = 0.5,
+        EL: float = 60.0,
+        **params: Any,
+    ) -> None:
+        for name in DESIGN + ("F", "pwv", "EL"):
+            if name in params:
+                raise ValueError(f"{name} must not be given as a fixed parameter.")
+
+        self.band = tuple(band)
+        self.pwv = np.atleast_1d(np.asarray(pwv, dtype=float))
+        self.inputs = get_inputs(pwv=self.pwv[:, None, None], EL=EL, **params)
+
+        # transmission of the samples in the high resolution
+        self.F_highres = atm_table().F
+        self.eta_highres = eta_atm_func(self.F_highres, self.pwv, EL)
+        self.workspace = Workspace(np.empty(0), 0)
+
+    def channels(self, n_channels: np.ndarray) -> np.ndarray:
+        """Return channel frequencies of designs padded by NaN.
+
+        Parameters
+        ----------
+        n_channels
+            Number of channels of each design (1D array).
+
+        Returns
+        -------
+        F
+            Frequencies with the shape of (designs, channels) in the first rows
+            of a buffer of the workspace, where channels are padded up to
+            the width of the workspace (at least max(n_channels)). Units: Hz.
+
+        """
+        n_channels = np.asarray(n_channels, dtype=int)
+        self.reserve(len(n_channels), int(np.max(n_channels)))
+        F = self.workspace.buffer("F", len(n_channels))
+
+        index = np.arange(F.shape[1])
+        F_min, F_max = self.band
+
+        np.divide(index, np.maximum(n_channels[:, None] - 1, 1), out=F)
+        np.power(F_max / F_min, F, out=F)
+        np.multiply(F_min, F, out=F)
+        F[index >= n_channels[:, None]] = np.nan
+        return F
+
+    def evaluate(
+        self,
+        R: ArrayLike,
+        eta_IBF: ArrayLike = 0.5,
+        n_channels: Optional[ArrayLike] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Evaluate the objectives of a batch of designs.
+
+        Parameters
+        ----------
+        R
+            Spectral resolving power of the designs. Units: None.
+        eta_IBF
+            In-band fraction of the designs. Units: None.
+        n_channels
+            Number of channels of the designs. If not specified,
+            channels are spaced by F/R over the band (Nyquist sampling
+            would need twice as many).
+
+        Returns
+        -------
+        objectives
+            Dictionary of design parameters and objectives (MS_sum and
+            MDLF_median) of the designs. Units: arcmin^2 mJy^-2 h^-1 and W m^-2.
+
+        """
+        if n_channels is None:
+            n_channels = self.n_channels(R)
+
+        R, eta_IBF, n_channels = [
+            np.ravel(value) for value in np.broadcast_arrays(R, eta_IBF, n_channels)
+        ]
+        F = self.channels(n_channels)
+
+        # rows of (pwv, designs) in the buffers of the workspace
+        n_rows = len(self.pwv) * len(R)
+        shape = (len(self.pwv), len(R), F.shape[1])
+        F_rows = self.workspace.buffer("F", n_rows)
+        F_rows.reshape(shape)[1:] = F
+        eta_atm = self.workspace.buffer("eta_atm", n_rows)
+        self.channel_average(F, R[:, None], out=eta_atm.reshape(shape))
+
+        inputs = dict(
+            self.inputs,
+            F=F_rows,
+            pwv=np.repeat(self.pwv, len(R))[:, None],
+            R=np.tile(R, len(self.pwv))[:, None],
+            eta_IBF=np.tile(eta_IBF, len(self.pwv))[:, None],
+            eta_atm=eta_atm,
+        )
+        values = evaluate(inputs, ["MS", "MDLF"], self.workspace)
+
+        # padded channels (NaN) are ignored
+        MS = np.nansum(values["MS"].reshape(shape), axis=-1).mean(axis=0)
+        MDLF = np.moveaxis(values["MDLF"].reshape(shape), 0, 1).reshape(len(R), -1)
+
+        return {
+            "R": R,
+            "eta_IBF": eta_IBF,
+            "n_channels": n_channels,
+            "MS_sum": MS,
+            "MDLF_median": np.nanmedian(MDLF, axis=-1),
+        }
+
+    def search(
+        self,
+        R: ArrayLike,
+        eta_IBF: ArrayLike = 0.5,
+        n_channels: Optional[ArrayLike] = None,
+        batch_size: int = 1000,
+        objectives: Sequence[str] = tuple(OBJECTIVES),
+    ) -> SensitivityResult:
+        """Evaluate all combinations of design parameters and find the Pareto front.
+
+        Parameters
+        ----------
+        R
+            Candidates of spectral resolving power.
+        eta_IBF
+            Candidates of in-band fraction.
+        n_channels
+            Candidates of the number of channels. If not specified,
+            it is determined by R for each design (see DesignOptimizer.evaluate()).
+        batch_size
+            Number of designs evaluated at once.
+        objectives
+            Names of the objectives of the Pareto front (see OBJECTIVES).
+
+        Returns
+        -------
+        result
+            SensitivityResult of design parameters, objectives and
+            whether each design is on the Pareto front (pareto) along the axis
+            of designs (design).
+
+        """
+        values = [np.atleast_1d(R), np.atleast_1d(eta_IBF)]
+
+        if n_channels is not None:
+            values.append(np.atleast_1d(n_channels))
+
+        designs = np.array(list(product(*values)), dtype=float)
+        batches = []
+
+        # buffers of the workspace for the largest batch
+        if n_channels is None:
+            n_channels = self.n_channels(designs[:, 0])
+
+        self.reserve(min(batch_size, len(designs)), int(np.max(n_channels)))
+
+        for start in range(0, len(designs), batch_size):
+            batch = designs[start : start + batch_size]
+            batches.append(self.evaluate(*batch.T))
+
+        columns = {
+            name: np.concatenate([batch[name] for batch in batches])
+            for name in batches[0]
+        }
+        columns["pareto"] = pareto_front(
+            np.stack([columns[name] for name in objectives], axis=-1),
+            [OBJECTIVES[name] == "max" for name in objectives],
+        )
+        coords = {"design": np.arange(len(designs))}
+        return SensitivityResult(columns, ("design",), coords)
+
+    def channel_average(
+        self, F: np.ndarray, R: np.ndarray, out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Average the transmission of the samples within channels of designs.
+
+        Channels are averaged by the response profile of the fixed parameters
+        (see atmosphere.eta_atm_func()), i.e., a boxcar by channel_average(),
+        or the other profiles by a sparse response of all the (not padded)
+        channels of the batch (see atmosphere.ChannelResponse).
+
+        Parameters
+        ----------
+        F
+            Frequencies with the shape of (designs, channels) padded by NaN.
+            Units: Hz.
+        R
+            Spectral resolving power broadcasted against F. Units: None.
+        out
+            Array of the shape of (pwv, designs, channels)
+            where the transmission is stored (e.g., a buffer of the workspace).
+
+        Returns
+        -------
+        eta_atm
+            Transmission with the shape of (pwv, designs, channels). Units: None.
+
+        """
+        profile = self.inputs["profile"]
+
+        if is_boxcar(profile):
+            return channel_average(
+                self.F_highres, self.eta_highres, F / 1e9, R, out=out
+            )
+
+        valid = ~np.isnan(F)
+        R = np.broadcast_to(R, F.shape)
+        response = channel_response(F[valid], R[valid], profile)
+
+        if out is None:
+            out = np.empty(self.pwv.shape + F.shape)
+
+        out[...] = np.nan
+        out[:, valid] = response.average(self.eta_highres[:, response.table_index])
+        return out
+
+    def n_channels(self, R: ArrayLike) -> np.ndarray:
+        """Return the number of channels spaced by F/R over the band."""
+        F_min, F_max = self.band
+        return np.ceil(np.asarray(R) * np.log(F_max / F_min)).astype(int) + 1
+
+    def reserve(self, n_designs: int, n_channels: int) -> None:
+        """Enlarge the workspace (if necessary) for a batch of designs.
+
+        Parameters
+        ----------
+        n_designs
+            Number of designs of the batch.
+        n_channels
+            Maximum number of channels of the designs.
+
+        """
+        size, width = self.workspace.shape
+
+        if size < len(self.pwv) * n_designs or width < n_channels:
+            size = max(size, len(self.pwv) * n_designs)
+            width = max(width, n_channels)
+            self.workspace = Workspace(np.empty(width), size)
+
+
+# helper functions
+def pareto_front(
+    objectives: np.ndarray, maximize: Optional[Sequence[bool]] = None
+) -> np.ndarray:
+    """Return whether each point is on the Pareto front (not dominated).
+
+    Points are culled by each remaining point on the front in turn,
+    so that the cost is proportional to the number of points times
+    the size of the front. Of duplicate points, only the first one is kept.
+
+    Parameters
+    ----------
+    objectives
+        Objectives of points with the shape of (points, objectives).
+        NaN is regarded as the worst value.
+    maximize
+        Whether each objective is maximized (True) or minimized (False).
+        By default, all objectives are minimized.
+
+    Returns
+    -------
+    pareto
+        Boolean array with the shape of (points,).
+
+    """
+    objectives = np.array(objectives, dtype=float)
+
+    if maximize is not None:
+        objectives[:, np.asarray(maximize, dtype=bool)] *= -1
+
+    objectives[np.isnan(objectives)] = np.inf
+    pareto = np.zeros(len(objectives), dtype=bool)
+    indices = np.arange(len(objectives))
+    i = 0
+
+    while i < len(objectives):
+        # keep points better than the i-th point in any objective (and itself)
+        keep = np.any(objectives < objectives[i], axis=-1)
+        keep[i] = True
+        indices, objectives = indices[keep], objectives[keep]
+        i = np.count_nonzero(keep[:i]) + 1
+
+    pareto[indices] = True
+    return pareto
@@ -1,5 +1,5 @@
 # standard library
-from typing import List, Union
+from typing import List, Optional, Union
 
 
 # dependent packages
@@ -18,7 +18,12 @@ c = 299792458.0  # velocity of light
 
 
 # main functions
-def rad_trans(rad_in: ArrayLike, medium: ArrayLike, eta: ArrayLike) -> ArrayLike:
+def rad_trans(
+    rad_in: ArrayLike,
+    medium: ArrayLike,
+    eta: ArrayLike,
+    out: Optional[np.ndarray] = None,
+) -> ArrayLike:
     """Calculates radiation transfer through a semi-transparent medium.
 
     One can also use the same function for Johnson-Nyquist PSD
@@ -32,6 +37,10 @@ def rad_trans(rad_in: ArrayLike, medium: ArrayLike, eta: ArrayLike) -> ArrayLike
         Brightness temperature (or PSD) of the lossy medium. Units: K (or W/Hz).
     eta
         Transmission of the lossy medium. Units: K (or W/Hz).
+    out
+        Array of the broadcasted shape where the result is stored
+        without allocating temporary arrays. It may be rad_in itself,
+        but must not share memory with medium or eta.
 
     Returns
     -------
@@ -39,10 +48,21 @@ def rad_trans(rad_in: ArrayLike, medium: ArrayLike, eta: ArrayLike) -> ArrayLike
         Brightness temperature (or PSD) of the output.
 
     """
-    return eta * rad_in + (1 - eta) * medium
+    if out is None:
+        return eta * rad_in + (1 - eta) * medium
 
+    # eta * rad_in + (1 - eta) * medium = medium + eta * (rad_in - medium)
+    np.subtract(rad_in, medium, out=out)
+    np.multiply(eta, out, out=out)
+    return np.add(out, medium, out=out)
 
-def T_from_psd(F: ArrayLike, psd: ArrayLike, method: str = "Planck") -> ArrayLike:
+
+def T_from_psd(
+    F: ArrayLike,
+    psd: ArrayLike,
+    method: str = "Planck",
+    out: Optional[np.ndarray] = None,
+) -> ArrayLike:
     """Calculate Planck temperature from the PSD frequency (frequencies).
 
     Parameters
@@ -53,6 +73,9 @@ def T_from_psd(F: ArrayLike, psd: ArrayLike, method: str = "Planck") -> ArrayLik
         Power Spectral Density. Units: W / Hz.
     method
         Default: 'Planck'. Option: 'Rayleigh-Jeans'.
+    out
+        Array of the broadcasted shape where the result is stored
+        without allocating temporary arrays. It may be psd itself.
 
     Returns
     --------
@@ -60,15 +83,28 @@ def T_from_psd(F: ArrayLike, psd: ArrayLike, method: str = "Planck") -> ArrayLik
         Planck temperature. Units: K.
 
     """
-    if method == "Planck":
-        return h * F / (k * np.log(h * F / psd + 1.0))
-    elif method == "Rayleigh-Jeans":
-        return psd / k
-    else:
+    if method not in ("Planck", "Rayleigh-Jeans"):
         raise ValueError("Method should be Planck or Rayleigh-Jeans.")
 
+    if out is None:
+        if method == "Planck":
+            return h * F / (k * np.log(h * F / psd + 1.0))
+        else:
+            return psd / k
+
+    if method == "Rayleigh-Jeans":
+        return np.divide(psd, k, out=out)
+
+    np.divide(F, psd, out=out)
+    np.multiply(out, h, out=out)
+    np.log1p(out, out=out)
+    np.divide(F, out, out=out)
+    return np.multiply(out, h / k, out=out)
 
-def johnson_nyquist_psd(F: ArrayLike, T: ArrayLike) -> ArrayLike:
+
+def johnson_nyquist_psd(
+    F: ArrayLike, T: ArrayLike, out: Optional[np.ndarray] = None
+) -> ArrayLike:
     """Johnson-Nyquist power spectral density.
 
     Don't forget to multiply with bandwidth to caculate the total power in W.
@@ -79,6 +115,9 @@ def johnson_nyquist_psd(F: ArrayLike, T: ArrayLike) -> ArrayLike:
         Frequency. Units: Hz.
     T
         Temperature. Units: K.
+    out
+        Array of the broadcasted shape where the result is stored
+        without allocating temporary arrays. It may be T itself.
 
     Returns
     --------
@@ -86,11 +125,16 @@ def johnson_nyquist_psd(F: ArrayLike, T: ArrayLike) -> ArrayLike:
         Power Spectral Density. Units: W / Hz.
 
     """
-    return h * F * nph(F, T)
+    if out is None:
+        return h * F * nph(F, T)
+
+    nph(F, T, out=out)
+    np.multiply(out, F, out=out)
+    return np.multiply(out, h, out=out)
 
 
 # helper functions
-def nph(F: ArrayLike, T: ArrayLike) -> ArrayLike:
+def nph(F: ArrayLike, T: ArrayLike, out: Optional[np.ndarray] = None) -> ArrayLike:
     """Photon occupation number of Bose-Einstein Statistics.
 
     If it is not single temperature, use nph = Pkid / (W_F * h * F).
@@ -101,6 +145,9 @@ def nph(F: ArrayLike, T: ArrayLike) -> ArrayLike:
         Frequency. Units: Hz.
     T
         Temperature. Units: K.
+    out
+        Array of the broadcasted shape where the result is stored
+        without allocating temporary arrays. It may be T itself.
 
     Returns
     --------
@@ -108,4 +155,10 @@ def nph(F: ArrayLike, T: ArrayLike) -> ArrayLike:
         Photon occupation number. Units: None.
 
     """
-    return 1.0 / (np.exp(h * F / (k * T)) - 1.0)
+    if out is None:
+        return 1.0 / (np.exp(h * F / (k * T)) - 1.0)
+
+    np.divide(F, T, out=out)
+    np.multiply(out, h / k, out=out)
+    np.expm1(out, out=out)
+    return np.reciprocal(out, out=out)
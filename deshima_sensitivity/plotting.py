@@ -11,8 +11,9 @@ import numpy as np
 import pandas as pd
 from jupyter_io import savetable_in_notebook
 from jupyter_io.output import HTML
+from .config import Detector, Observation, Telescope, to_params
 from .instruments import D2HPBW, eta_mb_ruze
-from .simulator import spectrometer_sensitivity
+from .sweep import evaluate_configs
 
 
 # type aliases
@@ -51,54 +52,50 @@ def MDLF_simple(
     # Main beam efficiency of ASTE (0.9 is from EM, ruze is from ASTE)
     eta_mb = eta_mb_ruze(F=F, LFlimit=0.805, sigma=37e-6) * 0.9
 
-    D2goal_input = {
-        "F": F,
-        "pwv": pwv,
-        "EL": EL,
-        "snr": snr,
-        "obs_hours": obs_hours,
-        "eta_mb": eta_mb,
-        "theta_maj": D2HPBW(F),  # Half power beam width (major axis)
-        "theta_min": D2HPBW(F),  # Half power beam width (minor axis)
-        "on_source_fraction": 0.4 * 0.9,  # ON-OFF 40%, calibration overhead of 10%
-    }
-
-    D2goal = spectrometer_sensitivity(**D2goal_input)
-
-    D2baseline_input = {
-        "F": F,
-        "pwv": pwv,
-        "EL": EL,
-        "snr": snr,
-        "obs_hours": obs_hours,
-        "eta_mb": eta_mb,
-        "theta_maj": D2HPBW(F),  # Half power beam width (major axis)
-        "theta_min": D2HPBW(F),  # Half power beam width (minor axis)
-        "on_source_fraction": 0.3 * 0.8,  # Goal 0.4*0.9
-        "eta_circuit": 0.32 * 0.5,  # eta_inst Goal 16%, Baseline 8%
-        "eta_IBF": 0.4,  # Goal 0.6
-        "KID_excess_noise_factor": 1.2,  # Goal 1.1
-    }
-
-    D2baseline = spectrometer_sensitivity(**D2baseline_input)
+    ASTE = Telescope(
+        eta_mb=eta_mb,
+        theta_maj=D2HPBW(F),  # Half power beam width (major axis)
+        theta_min=D2HPBW(F),  # Half power beam width (minor axis)
+    )
+
+    D2goal = Detector()
+    D2goal_obs = Observation(
+        pwv=pwv,
+        EL=EL,
+        snr=snr,
+        obs_hours=obs_hours,
+        on_source_fraction=0.4 * 0.9,  # ON-OFF 40%, calibration overhead of 10%
+    )
+
+    D2baseline = Detector(
+        eta_circuit=0.32 * 0.5,  # eta_inst Goal 16%, Baseline 8%
+        eta_IBF=0.4,  # Goal 0.6
+        KID_excess_noise_factor=1.2,  # Goal 1.1
+    )
+    D2baseline_obs = D2goal_obs._replace(on_source_fraction=0.3 * 0.8)  # Goal 0.4*0.9
+
+    # Goal and baseline are evaluated in one broadcasted call
+    result = evaluate_configs(
+        [(D2goal, D2goal_obs), (D2baseline, D2baseline_obs)],
+        ["MDLF", "R"],
+        **to_params(ASTE, F=F),
+    )
+    F = result.coords["F"]
+    D2goal_MDLF, D2baseline_MDLF = result["MDLF"]
 
     # Plotting
     fig, ax = plt.subplots(1, 1, figsize=(12, 6))
     ax.plot(
-        D2baseline["F"] / 1e9,
-        D2baseline["MDLF"],
+        F / 1e9,
+        D2baseline_MDLF,
         "--",
         linewidth=1,
         color="b",
         alpha=1,
         label="Baseline",
     )
-    ax.plot(
-        D2goal["F"] / 1e9, D2goal["MDLF"], linewidth=1, color="b", alpha=1, label="Goal"
-    )
-    ax.fill_between(
-        D2baseline["F"] / 1e9, D2baseline["MDLF"], D2goal["MDLF"], color="b", alpha=0.2
-    )
+    ax.plot(F / 1e9, D2goal_MDLF, linewidth=1, color="b", alpha=1, label="Goal")
+    ax.fill_between(F / 1e9, D2baseline_MDLF, D2goal_MDLF, color="b", alpha=0.2)
 
     ax.set_xlabel("Frequency (GHz)")
     ax.set_ylabel(r"Minimum Detectable Line Flux ($\mathrm{W\, m^{-2}}$)")
@@ -108,21 +105,20 @@ def MDLF_simple(
     ax.tick_params(direction="in", which="both")
     ax.grid(True)
     ax.set_title(
-        f"R = {int(D2goal['R'][0])}, "
-        f"snr = {int(D2goal['snr'][0])}, "
-        f"t_obs = {D2goal['obs_hours'][0]} h (incl. overhead), "
-        f"PWV = {D2goal['PWV'][0]} mm, "
-        f"EL = {int(D2goal['EL'][0])} deg",
+        f"R = {int(result['R'][0, 0])}, "
+        f"snr = {int(snr)}, "
+        f"t_obs = {obs_hours} h (incl. overhead), "
+        f"PWV = {pwv} mm, "
+        f"EL = {int(EL)} deg",
         fontsize=12,
     )
     ax.legend()
     fig.tight_layout()
 
     # Create download link
-    df_download = D2goal[["F", "MDLF"]]
-    df_download = df_download.rename(columns={"MDLF": "MDLF (goal)"})
-    df_download = df_download.join(D2baseline[["MDLF"]])
-    df_download = df_download.rename(columns={"MDLF": "MDLF (baseline)"})
+    df_download = pd.DataFrame(
+        {"F": F, "MDLF (goal)": D2goal_MDLF, "MDLF (baseline)": D2baseline_MDLF}
+    )
 
     return savetable_in_notebook(df_download, "MDLF.csv")
 
@@ -148,50 +144,35 @@ def MS_simple(F: ArrayLike, pwv: float = 0.5, EL: float = 60.0) -> HTML:
     # Main beam efficiency of ASTE (0.9 is from EM, ruze is from ASTE)
     eta_mb = eta_mb_ruze(F=F, LFlimit=0.805, sigma=37e-6) * 0.9
 
-    D2goal_input = {
-        "F": F,
-        "pwv": pwv,
-        "EL": EL,
-        "eta_mb": eta_mb,
-        "on_off": False,
-        "theta_maj": D2HPBW(F),  # Half power beam width (major axis)
-        "theta_min": D2HPBW(F),  # Half power beam width (minor axis)
-    }
-
-    D2goal = spectrometer_sensitivity(**D2goal_input)
-
-    D2baseline_input = {
-        "F": F,
-        "pwv": pwv,
-        "EL": EL,
-        "eta_mb": eta_mb,
-        "on_off": False,
-        "theta_maj": D2HPBW(F),  # Half power beam width (major axis)
-        "theta_min": D2HPBW(F),  # Half power beam width (minor axis)
-        "eta_circuit": 0.32 * 0.5,  # eta_inst Goal 16%, Baseline 8%
-        "eta_IBF": 0.4,  # Goal 0.6
-        "KID_excess_noise_factor": 1.2,  # Goal 1.1
-    }
-
-    D2baseline = spectrometer_sensitivity(**D2baseline_input)
+    ASTE = Telescope(
+        eta_mb=eta_mb,
+        theta_maj=D2HPBW(F),  # Half power beam width (major axis)
+        theta_min=D2HPBW(F),  # Half power beam width (minor axis)
+    )
+    observation = Observation(pwv=pwv, EL=EL, on_off=False)
+
+    D2goal = Detector()
+
+    D2baseline = Detector(
+        eta_circuit=0.32 * 0.5,  # eta_inst Goal 16%, Baseline 8%
+        eta_IBF=0.4,  # Goal 0.6
+        KID_excess_noise_factor=1.2,  # Goal 1.1
+    )
+
+    # Goal and baseline are evaluated in one broadcasted call
+    result = evaluate_configs(
+        [D2goal, D2baseline], ["MS", "R"], **to_params(ASTE, observation, F=F)
+    )
+    F = result.coords["F"]
+    D2goal_MS, D2baseline_MS = result["MS"]
 
     # Plotting
     fig, ax = plt.subplots(1, 1, figsize=(12, 6))
     ax.plot(
-        D2baseline["F"] / 1e9,
-        D2baseline["MS"],
-        "--",
-        linewidth=1,
-        color="b",
-        alpha=1,
-        label="Baseline",
-    )
-    ax.plot(
-        D2goal["F"] / 1e9, D2goal["MS"], linewidth=1, color="b", alpha=1, label="Goal"
-    )
-    ax.fill_between(
-        D2baseline["F"] / 1e9, D2baseline["MS"], D2goal["MS"], color="b", alpha=0.2
+        F / 1e9, D2baseline_MS, "--", linewidth=1, color="b", alpha=1, label="Baseline",
     )
+    ax.plot(F / 1e9, D2goal_MS, linewidth=1, color="b", alpha=1, label="Goal")
+    ax.fill_between(F / 1e9, D2baseline_MS, D2goal_MS, color="b", alpha=0.2)
 
     ax.set_xlabel("Frequency (GHz)")
     ax.set_ylabel(r"Mapping Speed ($\mathrm{arcmin^2\, mJy^{-2}\, h^{-1}}$)")
@@ -201,19 +182,16 @@ def MS_simple(F: ArrayLike, pwv: float = 0.5, EL: float = 60.0) -> HTML:
     ax.tick_params(direction="in", which="both")
     ax.grid(True)
     ax.set_title(
-        f"R = {int(D2goal['R'][0])}, "
-        f"PWV = {D2goal['PWV'][0]} mm, "
-        f"EL = {int(D2goal['EL'][0])} deg",
+        f"R = {int(result['R'][0, 0])}, PWV = {pwv} mm, EL = {int(EL)} deg",
         fontsize=12,
     )
     ax.legend()
     fig.tight_layout()
 
     # Create download link
-    df_download = D2goal[["F", "MS"]]
-    df_download = df_download.rename(columns={"MS": "MS (goal)"})
-    df_download = df_download.join(D2baseline[["MS"]])
-    df_download = df_download.rename(columns={"MS": "MS (baseline)"})
+    df_download = pd.DataFrame(
+        {"F": F, "MS (goal)": D2goal_MS, "MS (baseline)": D2baseline_MS}
+    )
 
     return savetable_in_notebook(df_download, "MS.csv")
 
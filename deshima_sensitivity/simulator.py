@@ -1,15 +1,28 @@
-__all__ = ["spectrometer_sensitivity"]
+__all__ = [
+    "spectrometer_sensitivity",
+    "InstrumentModel",
+    "SensitivityResult",
+    "Workspace",
+]
 
 
 # standard library
-from typing import List, Union
+from functools import lru_cache
+from inspect import signature
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional
+from typing import Sequence, Tuple
+from typing import Union
 
 
 # dependent packages
 import numpy as np
 import pandas as pd
-from .atmosphere import eta_atm_func
-from .instruments import eta_Al_ohmic_850, photon_NEP_kid, window_trans
+from .atmosphere import Profile, eta_atm_broadcast, eta_atm_func, eta_atm_lookup
+from .cache import active_cache, digest
+from .chain import DESHIMA_CHAIN, OpticalChain, Stage
+from .channels import ChannelGrid, DefaultR, resolve_channels, resolve_params
+from .instruments import eta_Al_ohmic_850, photon_NEP_kid
+from .instruments import window_eta_HDPE, window_refl
 from .physics import johnson_nyquist_psd, rad_trans, T_from_psd
 from .physics import c, h, k
 
@@ -18,12 +31,64 @@ from .physics import c, h, k
 ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
 
 
+# constants
+OUTPUTS = (
+    "F",
+    "PWV",
+    "EL",
+    "eta_atm",
+    "R",
+    "W_F_spec",
+    "W_F_cont",
+    "theta_maj",
+    "theta_min",
+    "eta_a",
+    "eta_mb",
+    "eta_forward",
+    "eta_sw",
+    "eta_window",
+    "eta_inst",
+    "eta_circuit",
+    "Tb_sky",
+    "Tb_M1",
+    "Tb_M2",
+    "Tb_wo",
+    "Tb_window",
+    "Tb_co",
+    "Tb_KID",
+    "psd_KID",
+    "Pkid",
+    "Pkid_sky",
+    "Pkid_warm",
+    "Pkid_cold",
+    "n_ph",
+    "NEPkid",
+    "NEPinst",
+    "NEFD_line",
+    "NEFD_continuum",
+    "NEF",
+    "MDLF",
+    "MS",
+    "snr",
+    "obs_hours",
+    "on_source_fraction",
+    "on_source_hours",
+    "equivalent_Trx",
+    "skycoup",
+    "eta_Al_ohmic",
+)  # default outputs of spectrometer_sensitivity()
+
+QUANTITIES: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}  # see quantity()
+
+WEATHER = ("pwv", "EL")  # inputs which change from sample to sample
+
+
 # main functions
 def spectrometer_sensitivity(
     F: ArrayLike = 350.0e9,
     pwv: float = 0.5,
     EL: float = 60.0,
-    R: float = 500.0,
+    R: float = DefaultR(500.0),
     eta_M1_spill: ArrayLike = 0.99,
     eta_M2_spill: ArrayLike = 0.90,
     eta_wo_spill: ArrayLike = 0.99,
@@ -47,16 +112,27 @@ def spectrometer_sensitivity(
     obs_hours: float = 10.0,
     on_source_fraction: float = 0.4 * 0.9,
     on_off: bool = True,
-):
+    chain: Sequence[Stage] = DESHIMA_CHAIN,
+    profile: Profile = "boxcar",
+    eta_pol: ArrayLike = 0.5,
+    outputs: Optional[Sequence[str]] = None,
+    grid: Optional[Dict[str, ArrayLike]] = None,
+    as_dataframe: bool = True,
+    workspace: Optional["Workspace"] = None,
+) -> Union[pd.DataFrame, "SensitivityResult"]:
     """Calculate the sensitivity of a spectrometer.
 
     Parameters which are functions of frequency can be a vector (see Parameters).
     Output is a pandas DataFrame which containts results of simulation (see Returns).
+    If as_dataframe is False, output is a lightweight SensitivityResult instead.
+    Any parameters can be the axes of an N-dimensional grid (see grid).
 
     Parameters
     ----------
     F
         Frequency of the astronomical signal. Units: Hz.
+        It can be a ChannelGrid, whose R (if specified) is used as R
+        and whose per-channel quantities are memoized across calls.
     pwv
         Precipitable water vapour. Units: mm.
     EL
@@ -132,6 +208,46 @@ def spectrometer_sensitivity(
     on_off
         If the observation involves on_off chopping, then the SNR degrades
         by sqrt(2) because the signal difference includes the noise twice.
+    chain
+        Optical chain as a sequence of stages from the sky to the KID
+        (see chain.Stage). By default, the chain of DESHIMA on ASTE:
+        atmosphere, M1, M2, M2 spillover, warm optics, window, cold optics, chip.
+        Each stage is evaluated only once, and the PSD after it is available
+        as psd_<name> (e.g., psd_M1). The sky, warm and cold loading of the KID
+        are calculated from the same chain (psd_KID_sky, etc.).
+    profile
+        Response profile of the channels by which the atmospheric transmission
+        is averaged: 'boxcar' (of width F/R, by default), 'lorentzian'
+        (of FWHM F/R) or a function of the detuning from F in units of F/R
+        (e.g., atmosphere.TabulatedProfile). See atmosphere.ChannelResponse.
+    eta_pol
+        Polarization efficiency of the coupling to a point source
+        (0.5 for a single-polarization instrument). Units: None.
+    outputs
+        Names of outputs to be calculated (see Returns). If not specified,
+        all of them are calculated. Only the intermediate quantities which
+        the outputs depend on are evaluated: e.g., outputs=["MDLF"] skips
+        the sky/warm/cold loading breakdown and the brightness temperatures.
+    grid
+        Dictionary of parameter names and 1D arrays which span the axes
+        of an N-dimensional grid, e.g., {"pwv": pwv, "EL": EL}.
+        The axes are ordered as the keys, followed by F as the last axis.
+        The values given to the same parameters as arguments are ignored.
+        All combinations are then calculated in one vectorized evaluation,
+        and each output is an N-dimensional array broadcastable to the grid.
+        The axes are labelled by SensitivityResult.dims and .coords.
+    as_dataframe
+        Whether to return the results as a pandas DataFrame (True)
+        or a SensitivityResult of NumPy arrays and scalars (False).
+        The latter skips the DataFrame assembly and does not broadcast
+        scalars (e.g., snr and obs_hours) to the length of F.
+        If grid is specified, the DataFrame has a MultiIndex of the axes.
+    workspace
+        Workspace whose buffers are reused by the quantities calculated
+        with the shape of (size, len(F)), e.g., repeated calls of batches
+        of samples (see Workspace). The outputs may then be views of
+        the buffers, which are overwritten by the next call with
+        the same workspace. The result cache is not used with a workspace.
 
     Returns
     ----------
@@ -226,265 +342,1123 @@ def spectrometer_sensitivity(
     The parameters to calculate the window transmission / reflection
     is hard-coded in the function window_trans().
 
+    The calculation itself is defined as a graph of quantities
+    (see the functions registered by quantity() below), which are
+    evaluated on demand by evaluate().
+
+    If the result cache is enabled by enable_cache(), results are stored
+    by a digest of all inputs (including array contents), outputs and grid,
+    and the same call is returned from the cache without any calculation.
+    Calls with inputs which cannot be digested by value (e.g., a function
+    in the chain or as the profile) are not cached.
+
     """
-    # Equivalent Bandwidth of 1 channel.
-    # Used for calculating loading and coupling to a continuum source
-    W_F_cont = F / R / eta_IBF
-    # Used for calculating coupling to a line source,
-    # with a linewidth not wider than the filter channel
-    W_F_spec = F / R
-
-    # #############################################################
-    # 1. Calculating loading power absorbed by the KID, and the NEP
-    # #############################################################
-
-    # .......................................................
-    # Efficiencies for calculating sky coupling
-    # .......................................................
-
-    # Ohmic loss as a function of frequency, from skin effect scaling
-    eta_Al_ohmic = 1.0 - (1.0 - eta_Al_ohmic_850) * np.sqrt(F / 850.0e9)
-    eta_M1_ohmic = eta_Al_ohmic
-    eta_M2_ohmic = eta_Al_ohmic
+    inputs = locals().copy()
+    del inputs["outputs"], inputs["grid"], inputs["as_dataframe"]
+    del inputs["workspace"]
 
-    # Collect efficiencies at the same temperature
-    eta_M1 = eta_M1_ohmic * eta_M1_spill
-    eta_wo = eta_Al_ohmic ** n_wo_mirrors * eta_wo_spill
-    eta_chip = eta_lens_antenna_rad * eta_circuit
+    inputs["F"], inputs["R"] = resolve_channels(F, R)
 
-    # Forward efficiency: does/should not include window loss
-    # because it is defined as how much power out of
-    # the crystat window couples to the cold sky.
-    eta_forward = (
-        eta_M1 * eta_M2_ohmic * eta_M2_spill * eta_wo + (1.0 - eta_M2_spill) * eta_wo
-    )
+    if outputs is None:
+        outputs = OUTPUTS
 
-    # Calcuate eta. scalar/vector depending on F.
-    eta_atm = eta_atm_func(F=F, pwv=pwv, EL=EL, R=R)
-
-    # Johnson-Nyquist Power Spectral Density (W/Hz)
-    # for the physical temperatures of each stage
-
-    psd_jn_cmb = johnson_nyquist_psd(F=F, T=Tb_cmb)
-    psd_jn_amb = johnson_nyquist_psd(F=F, T=Tp_amb)
-    psd_jn_cabin = johnson_nyquist_psd(F=F, T=Tp_cabin)
-    psd_jn_co = johnson_nyquist_psd(F=F, T=Tp_co)
-    psd_jn_chip = johnson_nyquist_psd(F=F, T=Tp_chip)
-
-    # Optical Chain
-    # Sequentially calculate the Power Spectral Density (W/Hz) at each stage.
-    # Uses only basic radiation transfer: rad_out = eta*rad_in + (1-eta)*medium
-
-    psd_sky = rad_trans(rad_in=psd_jn_cmb, medium=psd_jn_amb, eta=eta_atm)
-    psd_M1 = rad_trans(rad_in=psd_sky, medium=psd_jn_amb, eta=eta_M1)
-    psd_M2 = rad_trans(rad_in=psd_M1, medium=psd_jn_amb, eta=eta_M2_ohmic)
-    psd_M2_spill = rad_trans(rad_in=psd_M2, medium=psd_sky, eta=eta_M2_spill)
-    psd_wo = rad_trans(rad_in=psd_M2_spill, medium=psd_jn_cabin, eta=eta_wo)
-    [psd_window, eta_window] = window_trans(
-        F=F,
-        psd_in=psd_wo,
-        psd_cabin=psd_jn_cabin,
-        psd_co=psd_jn_co,
-        window_AR=window_AR,
-    )
-    psd_co = rad_trans(rad_in=psd_window, medium=psd_jn_co, eta=eta_co)
-    psd_KID = rad_trans(
-        rad_in=psd_co, medium=psd_jn_chip, eta=eta_chip
-    )  # PSD absorbed by KID
-
-    # Instrument optical efficiency as in JATIS 2019
-    # (eta_inst can be calculated only after calculating eta_window)
-    eta_inst = eta_chip * eta_co * eta_window
-
-    # Calculating Sky loading, Warm loading and Cold loading individually for reference
-    # (Not required for calculating Pkid, but serves as a consistency check.)
-    # .................................................................................
-
-    # Sky loading
-    psd_KID_sky_1 = psd_sky * eta_M1 * eta_M2_spill * eta_M2_ohmic * eta_wo * eta_inst
-    psd_KID_sky_2 = (
-        rad_trans(0, psd_sky, eta_M2_spill) * eta_M2_ohmic * eta_wo * eta_inst
-    )
-    psd_KID_sky = psd_KID_sky_1 + psd_KID_sky_2
-
-    skycoup = psd_KID_sky / psd_sky  # To compare with Jochem
-
-    # Warm loading
-    psd_KID_warm = (
-        window_trans(
-            F=F,
-            psd_in=rad_trans(
-                rad_trans(
-                    rad_trans(
-                        rad_trans(0, psd_jn_amb, eta_M1), 0, eta_M2_spill
-                    ),  # sky spillover does not count for warm loading
-                    psd_jn_amb,
-                    eta_M2_ohmic,
-                ),
-                psd_jn_cabin,
-                eta_wo,
-            ),
-            psd_cabin=psd_jn_cabin,
-            psd_co=0,
-            window_AR=window_AR,
-        )[0]
-        * eta_co
-        * eta_chip
-    )
+    # results are reused without calculation if the cache is enabled
+    # (except those in the buffers of a workspace)
+    cache = active_cache() if workspace is None else None
+
+    if cache is not None:
+        try:
+            key = cache.key(inputs=inputs, outputs=list(outputs), grid=grid or {})
+        except TypeError:  # inputs which cannot be digested by value
+            cache = None
+
+    if cache is not None:
+        entry = cache.get(key)
+
+        if entry is not None:
+            result = SensitivityResult(*entry)
+            return result.to_dataframe() if as_dataframe else result
+
+    if grid is None:
+        dims = coords = None
+    else:
+        inputs, dims, coords = make_grid(inputs, grid)
+
+    if isinstance(F, ChannelGrid):
+        inputs.update(memoized_quantities(F, inputs))
+
+    result = SensitivityResult(evaluate(inputs, outputs, workspace), dims, coords)
+
+    if cache is not None:
+        cache.put(key, (result.columns, result.dims, result.coords))
+
+    if as_dataframe:
+        return result.to_dataframe()
+
+    return result
+
+
+# helper classes
+class InstrumentModel:
+    """Instrument model precomputed for time series of the weather.
+
+    The quantities of spectrometer_sensitivity() which do not depend on
+    the weather (pwv and EL) are calculated once for a channel grid
+    (e.g., eta_forward, eta_inst, eta_window, eta_a, omega_mb).
+    Because the optical chain is linear in the atmospheric transmission,
+    the PSDs of the sky and the KID are reduced to radiation transfer
+    between their values through a clear (eta_atm = 1) and an opaque
+    (eta_atm = 0) atmosphere, which are precomputed.
+    Then the model is evaluated against long arrays of (pwv, EL) samples,
+    where the atmospheric transmission is interpolated by EtaAtmLookup.
+    Samples out of its grid (e.g., pwv > 2 mm) are calculated at once
+    by the full model of the transmission, which is slower but vectorized.
+
+    The samples are evaluated in chunks, where the PSDs, the power
+    absorbed by the KID, its NEP and the quantities down to MDLF
+    are calculated in place in the buffers of a Workspace
+    which is kept by the model (see evaluate()).
+    Therefore repeated calls of the same chunk size do not allocate them again.
+
+    Parameters
+    ----------
+    params
+        Parameters of spectrometer_sensitivity() except pwv and EL.
+        F must be a 1D array (or a scalar) or a ChannelGrid of the channels.
+
+    Example
+    --------
+        Evaluate MDLF of weather logs (1D arrays of pwv and EL)::
+
+            model = InstrumentModel(F=F)
+            result = model(pwv, EL, outputs=["MDLF"])
+            mdlf = result["MDLF"]  # shape of (len(pwv), len(F))
+
+    """
+
+    def __init__(self, **params: Any) -> None:
+        for name in WEATHER:
+            if name in params:
+                raise ValueError(f"{name} must be given to InstrumentModel().")
+
+        inputs = get_inputs(**params)
+        inputs["F"] = np.atleast_1d(np.asarray(inputs["F"], dtype=float))
+
+        for name, value in inputs.items():
+            if name in WEATHER or name in ("chain", "profile"):
+                continue
+
+            if np.ndim(value) > 1 or np.size(value) not in (1, inputs["F"].size):
+                raise ValueError(f"{name} must be a scalar or a value per channel.")
+
+        for name in WEATHER:
+            del inputs[name]
+
+        # quantities which do not depend on the weather
+        quantities = graph(inputs)
+        names = [
+            name for name in quantities if not depends_on(name, WEATHER, quantities)
+        ]
+        self.values = evaluate(inputs, names)
+        self.values.update(inputs)
+
+        # psd_sky and psd_KID are linear in eta_atm (see also optics.py)
+        # and the window transmission does not depend on the input PSD
+        names = ["psd_sky", "psd_KID", "eta_window", "eta_inst"]
+        self.clear = evaluate(dict(self.values, eta_atm=1.0), names)
+        self.opaque = evaluate(dict(self.values, eta_atm=0.0), names[:2])
+        self.values.update((name, self.clear.pop(name)) for name in names[2:])
+        self.quantities = quantities
+        self.lookup = eta_atm_lookup(
+            inputs["F"], inputs["R"], profile=inputs["profile"]
+        )
+        self.workspace = Workspace(inputs["F"], 0)
+
+    @property
+    def F(self) -> np.ndarray:
+        """Frequency of the channels. Units: Hz."""
+        return self.values["F"]
+
+    def __call__(
+        self,
+        pwv: ArrayLike,
+        EL: ArrayLike = 60.0,
+        outputs: Sequence[str] = ("MDLF",),
+        chunk_size: int = 10000,
+    ) -> "SensitivityResult":
+        """Evaluate the model against samples of the weather.
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour of the samples. Units: mm.
+        EL
+            Telescope elevation angle of the samples
+            (broadcasted against pwv). Units: degrees.
+        outputs
+            Names of the outputs of spectrometer_sensitivity().
+        chunk_size
+            Number of samples evaluated at once to limit the memory usage.
+
+        Returns
+        -------
+        result
+            SensitivityResult with the axes of samples and frequency.
+            Outputs which do not depend on the weather are not
+            broadcasted to the samples.
+
+        """
+        pwv, EL = np.broadcast_arrays(
+            np.asarray(pwv, dtype=float).ravel(), np.asarray(EL, dtype=float).ravel()
+        )
+        weather = [name for name in outputs if name not in self.values]
+        columns = {name: self.values[name] for name in outputs if name in self.values}
+
+        for name in weather:
+            columns[name] = np.empty(pwv.shape + self.F.shape)
+
+        if self.workspace.shape[0] < min(chunk_size, len(pwv)):
+            self.workspace = Workspace(self.F, min(chunk_size, len(pwv)))
+
+        for start in range(0, len(pwv), chunk_size):
+            index = slice(start, start + chunk_size)
+            eta_atm = self.lookup(pwv[index], EL[index], outer=False)
+            values = self._evaluate(
+                pwv[index, np.newaxis],
+                EL[index, np.newaxis],
+                eta_atm,
+                weather,
+                self.workspace,
+            )
+
+            for name in weather:
+                columns[name][index] = values[name]
+
+        columns = {name: columns[name] for name in outputs}
+        coords = {"sample": np.arange(len(pwv)), "F": self.F}
+        return SensitivityResult(columns, ("sample", "F"), coords)
+
+    def channelwise(
+        self, pwv: ArrayLike, EL: ArrayLike = 60.0, outputs: Sequence[str] = ("MDLF",)
+    ) -> Dict[str, Any]:
+        """Evaluate the model of each channel at its own (pwv, EL).
+
+        Unlike InstrumentModel.__call__(), pwv and EL are broadcasted
+        against F (the last axis), e.g., arrays of the shape (n, len(F))
+        for n conditions per channel. Conditions out of the grid of
+        the lookup table of the atmospheric transmission (InstrumentModel.lookup)
+        are calculated by the full model (see EtaAtmLookup.channelwise()).
+
+        Parameters
+        ----------
+        pwv
+            Precipitable water vapour. Units: mm.
+        EL
+            Telescope elevation angle. Units: degrees.
+        outputs
+            Names of the outputs of spectrometer_sensitivity().
+
+        Returns
+        -------
+        values
+            Dictionary of output names and values.
+
+        """
+        eta_atm = self.lookup.channelwise(pwv, EL)
+        return self._evaluate(pwv, EL, eta_atm, outputs)
+
+    def _evaluate(
+        self,
+        pwv: ArrayLike,
+        EL: ArrayLike,
+        eta_atm: np.ndarray,
+        outputs: Sequence[str],
+        workspace: Optional["Workspace"] = None,
+    ) -> Dict[str, Any]:
+        """Evaluate outputs of given weather and atmospheric transmission.
+
+        If a workspace is given, eta_atm must have the shape of (samples, F)
+        and the outputs may be views of its buffers (overwritten by the next call).
+
+        """
+        values = dict(self.values, pwv=pwv, EL=EL, eta_atm=eta_atm)
+
+        def out(name: str) -> Optional[np.ndarray]:
+            return None if workspace is None else workspace.buffer(name, len(eta_atm))
+
+        for name in ["psd_sky", "psd_KID"]:
+            values[name] = rad_trans(
+                self.clear[name], self.opaque[name], eta_atm, out=out(name)
+            )
+
+        return evaluate(values, outputs, workspace)
+
+
+class Workspace:
+    """Reusable buffers for repeated evaluations on a fixed channel grid.
+
+    Each buffer has the shape of (size, len(F)) and is allocated
+    at the first use of its name. Then the same buffer is returned
+    (as a view of the first rows for a smaller batch), so that functions
+    with out= arguments (e.g., rad_trans(), johnson_nyquist_psd(),
+    T_from_psd() and photon_NEP_kid()) can be evaluated repeatedly
+    without allocating arrays.
+
+    A workspace can also be given to evaluate() (and spectrometer_sensitivity()),
+    where the quantities with out= arguments are calculated in its buffers
+    if their shape is (size, len(F)) (see Workspace.buffer_for()).
+
+    Parameters
+    ----------
+    F
+        Frequency of the channels. Units: Hz.
+    size
+        Maximum number of rows (e.g., samples) evaluated at once.
+
+    Example
+    --------
+        Brightness temperature of PSDs without allocation::
+
+            workspace = Workspace(F, 1000)
+            Tb = T_from_psd(F, psd, out=workspace.buffer("Tb", len(psd)))
+
+    """
+
+    def __init__(self, F: ArrayLike, size: int = 1) -> None:
+        self.shape = (int(size), int(np.size(F)))
+        self.buffers: Dict[str, np.ndarray] = {}
+
+    def buffer(self, name: str, size: Optional[int] = None) -> np.ndarray:
+        """Return a buffer of a name (allocated only at the first use).
+
+        Parameters
+        ----------
+        name
+            Name of the buffer.
+        size
+            Number of rows of the returned view. If not specified, all rows.
+
+        Returns
+        -------
+        buffer
+            Uninitialized array with the shape of (size, len(F)).
+
+        """
+        if size is not None and size > self.shape[0]:
+            raise ValueError(f"size must be <= {self.shape[0]}.")
+
+        if name not in self.buffers:
+            self.buffers[name] = np.empty(self.shape)
+
+        return self.buffers[name][:size]
+
+    def buffer_for(self, name: str, *arrays: Any) -> Optional[np.ndarray]:
+        """Return a buffer of a name for the broadcasted shape of arrays.
+
+        Parameters
+        ----------
+        name
+            Name of the buffer.
+        arrays
+            Arrays (or scalars) from which a quantity is calculated.
+
+        Returns
+        -------
+        buffer
+            Uninitialized array of the broadcasted shape, or None
+            if the shape is not (size, len(F)) with size of at most
+            the rows of the workspace (e.g., a quantity of F only).
+
+        """
+        shape = np.broadcast(*arrays).shape
+
+        if len(shape) != 2 or shape[1] != self.shape[1] or shape[0] > self.shape[0]:
+            return None
+
+        return self.buffer(name, shape[0])
+
+
+class SensitivityResult:
+    """Struct-of-arrays result of spectrometer_sensitivity().
+
+    It works as a read-only mapping of output names to NumPy arrays
+    (quantities which are functions of frequency) or scalars (the others).
+    Scalars are not broadcasted to the length of frequency.
+
+    If it is a result on an N-dimensional grid, each array is broadcastable
+    to the shape of the grid, whose axes are labelled by dims and coords.
+
+    Parameters
+    ----------
+    columns
+        Dictionary of output names and values.
+    dims
+        Names of the axes of a grid (if any).
+    coords
+        Dictionary of the names and values of the axes of a grid (if any).
+
+    Example
+    --------
+        Get MDLF without a DataFrame::
+
+            result = spectrometer_sensitivity(F, as_dataframe=False)
+            mdlf = result["MDLF"]
+
+    """
+
+    __slots__ = ("columns", "dims", "coords")
+
+    def __init__(
+        self,
+        columns: Dict[str, ArrayLike],
+        dims: Optional[Tuple[str, ...]] = None,
+        coords: Optional[Dict[str, np.ndarray]] = None,
+    ) -> None:
+        self.columns = {
+            name: value if np.ndim(value) == 0 else np.asarray(value)
+            for name, value in columns.items()
+        }
+        self.dims = dims
+        self.coords = coords
+
+    def __getitem__(self, name: str) -> ArrayLike:
+        return self.columns[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.columns
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+    def __repr__(self) -> str:
+        return f"SensitivityResult({', '.join(self.columns)})"
+
+    def keys(self) -> List[str]:
+        """Return the output names."""
+        return list(self.columns)
+
+    @property
+    def size(self) -> int:
+        """Number of rows when converted to a DataFrame."""
+        if self.dims is not None:
+            return int(np.prod(self.shape))
+
+        sizes = [len(value) for value in self.columns.values() if np.ndim(value)]
+        return max(sizes, default=1)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of the grid (or the length of frequency)."""
+        if self.dims is None:
+            return (self.size,)
+
+        return tuple(len(self.coords[dim]) for dim in self.dims)
+
+    def broadcast(self, name: str) -> np.ndarray:
+        """Return an output broadcasted to the shape of the grid (read-only).
+
+        Parameters
+        ----------
+        name
+            Name of the output.
+
+        Returns
+        -------
+        value
+            Broadcasted view of the output.
+
+        """
+        return np.broadcast_to(self.columns[name], self.shape)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Convert the result to a pandas DataFrame.
+
+        Scalars are broadcasted to the length of frequency
+        as the output of spectrometer_sensitivity(as_dataframe=True).
+        If it is a result on a grid, outputs are flattened
+        with a MultiIndex of the axes.
+
+        Returns
+        -------
+        result
+            DataFrame of the result.
+
+        """
+        if self.dims is not None:
+            index = pd.MultiIndex.from_product(
+                [self.coords[dim] for dim in self.dims], names=self.dims
+            )
+            data = {name: self.broadcast(name).ravel() for name in self.columns}
+            return pd.DataFrame(data, index=index, columns=list(data))
+
+        size = self.size
+        data = {}
+
+        for name, value in self.columns.items():
+            if np.ndim(value) == 0:
+                # same dtype as a forward-filled scalar (float if size > 1)
+                data[name] = np.full(size, value, float if size > 1 else None)
+            elif len(value) == size:
+                data[name] = value
+            else:
+                data[name] = pd.Series(value)
+
+        result = pd.DataFrame(data, columns=list(data))
+
+        # Turn Scalar values into vectors
+        return result.fillna(method="ffill")
+
+
+# helper functions
+def depends_on(
+    name: str,
+    inputs: Sequence[str],
+    quantities: Dict[str, Tuple[Callable, Tuple[str, ...]]] = QUANTITIES,
+) -> bool:
+    """Return whether a quantity depends on any of given inputs.
+
+    Parameters
+    ----------
+    name
+        Name of a quantity (or an input).
+    inputs
+        Names of inputs.
+    quantities
+        Graph of quantities. See graph().
+
+    Returns
+    -------
+    depends
+        True if the quantity is one of the inputs
+        or any of its dependencies depends on them.
+
+    """
+    if name in inputs:
+        return True
+
+    if name not in quantities:
+        return False
+
+    return any(depends_on(arg, inputs, quantities) for arg in quantities[name][1])
+
+
+def evaluate(
+    inputs: Dict[str, Any],
+    outputs: Sequence[str],
+    workspace: Optional[Workspace] = None,
+) -> Dict[str, Any]:
+    """Evaluate quantities on demand from the graph of quantities.
+
+    Only the quantities which the outputs depend on are evaluated
+    (each of them only once), following the arguments of the functions
+    registered by quantity().
+
+    Parameters
+    ----------
+    inputs
+        Dictionary of input names and values.
+    outputs
+        Names of quantities to be evaluated.
+    workspace
+        Workspace whose buffers are given to the functions with an out=
+        argument (e.g., the brightness temperatures, the stages of the
+        optical chain and NEPinst to MDLF) as their results, if they have
+        the shape of its buffers (see Workspace.buffer_for()).
+        The outputs may then be views of the buffers.
+
+    Returns
+    -------
+    values
+        Dictionary of output names and values.
+
+    """
+    values = dict(inputs)
+    quantities = graph(values)
+
+    def get(name: str) -> Any:
+        if name not in values:
+            if name not in quantities:
+                raise ValueError(f"{name} is not a valid output.")
+
+            func, args = quantities[name]
+            args = [get(arg) for arg in args]
+
+            if workspace is None or "out" not in signature(func).parameters:
+                values[name] = func(*args)
+            else:
+                values[name] = func(*args, out=workspace.buffer_for(name, *args))
+
+        return values[name]
+
+    return {name: get(name) for name in outputs}
+
+
+def memoized_quantities(
+    channels: ChannelGrid, inputs: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return per-channel quantities which do not depend on the weather.
+
+    Each quantity of F (e.g., eta_Al_ohmic, eta_HDPE, W_F_cont) is memoized
+    by the channel grid with a key of its name and a digest of the other inputs
+    on which it depends, so that it is calculated only once per grid and inputs.
+    Quantities of the optical chain (see chain.py) are not memoized.
+
+    Parameters
+    ----------
+    channels
+        Channel grid (F of inputs).
+    inputs
+        Dictionary of input names and values.
+
+    Returns
+    -------
+    values
+        Dictionary of the names and (read-only) values of the quantities.
+
+    """
+    values = {}
+    keys = {}  # scalars (including 0-d arrays) by value, arrays by digest
+
+    for name, names in memoizable(frozenset(inputs)):
+        for arg in names:
+            if arg not in keys:
+                value = inputs[arg]
 
-    # Cold loading
-    psd_KID_cold = rad_trans(
-        rad_trans(
-            window_trans(
-                F=F, psd_in=0.0, psd_cabin=0.0, psd_co=psd_jn_co, window_AR=window_AR
-            )[0],
-            psd_jn_co,
-            eta_co,
-        ),
-        psd_jn_chip,
-        eta_chip,
+                if np.ndim(value) == 0:
+                    keys[arg] = np.asarray(value).item()
+                else:
+                    keys[arg] = digest({arg: value})
+
+        key = (name,) + tuple(keys[arg] for arg in names)
+        values[name] = channels.memoize(
+            key, lambda: evaluate(dict(inputs, **values), [name])[name]
+        )
+
+    return values
+
+
+@lru_cache(maxsize=None)
+def memoizable(inputs: FrozenSet[str]) -> Tuple[Tuple[str, Tuple[str, ...]], ...]:
+    """Return quantities of F which do not depend on the weather.
+
+    Parameters
+    ----------
+    inputs
+        Names of inputs.
+
+    Returns
+    -------
+    quantities
+        Tuple of the names of the quantities and (sorted) names
+        of the inputs on which they depend except F.
+
+    """
+    quantities = []
+
+    for name in QUANTITIES:
+        names = input_names(name, inputs)
+
+        if names is None or "F" not in names or not names.isdisjoint(WEATHER):
+            continue
+
+        quantities.append((name, tuple(sorted(names - {"F"}))))
+
+    return tuple(quantities)
+
+
+@lru_cache(maxsize=None)
+def input_names(name: str, inputs: FrozenSet[str]) -> Optional[FrozenSet[str]]:
+    """Return the names of inputs on which a quantity depends.
+
+    Parameters
+    ----------
+    name
+        Name of a quantity (or an input).
+    inputs
+        Names of inputs.
+
+    Returns
+    -------
+    names
+        Names of the inputs, or None if it depends on
+        a quantity not in QUANTITIES (e.g., the optical chain).
+
+    """
+    if name in inputs:
+        return frozenset([name])
+
+    if name not in QUANTITIES:
+        return None
+
+    names = frozenset()
+
+    for arg in QUANTITIES[name][1]:
+        names_arg = input_names(arg, inputs)
+
+        if names_arg is None:
+            return None
+
+        names |= names_arg
+
+    return names
+
+
+def graph(inputs: Dict[str, Any]) -> Dict[str, Tuple[Callable, Tuple[str, ...]]]:
+    """Return the graph of quantities including the optical chain of inputs.
+
+    Parameters
+    ----------
+    inputs
+        Dictionary of input names and values.
+
+    Returns
+    -------
+    quantities
+        Dictionary of quantity names, functions and names of their arguments.
+
+    """
+    if "chain" not in inputs:
+        return QUANTITIES
+
+    return dict(QUANTITIES, **OpticalChain(inputs["chain"]).quantities)
+
+
+def get_inputs(**params: Any) -> Dict[str, Any]:
+    """Return the inputs of spectrometer_sensitivity() with default values.
+
+    Parameters
+    ----------
+    params
+        Parameters of spectrometer_sensitivity() to override the defaults.
+        F given as a ChannelGrid is resolved to its frequencies and R
+        in the same way as spectrometer_sensitivity().
+
+    Returns
+    -------
+    inputs
+        Dictionary of input names and values.
+
+    """
+    inputs = dict(default_inputs())
+
+    for name in params:
+        if name not in inputs:
+            raise ValueError(f"{name} is not a valid parameter.")
+
+    inputs.update(resolve_params(params))
+    return inputs
+
+
+@lru_cache(maxsize=None)
+def default_inputs() -> Tuple[Tuple[str, Any], ...]:
+    """Return the names and default values of the inputs (see get_inputs())."""
+    return tuple(
+        (name, parameter.default)
+        for name, parameter in signature(spectrometer_sensitivity).parameters.items()
+        if name not in ("outputs", "grid", "as_dataframe", "workspace")
     )
 
-    # Loadig power absorbed by the KID
-    # .............................................
 
-    Pkid = psd_KID * W_F_cont
-    Pkid_sky = psd_KID_sky * W_F_cont
-    Pkid_warm = psd_KID_warm * W_F_cont
-    Pkid_cold = psd_KID_cold * W_F_cont
+def make_grid(
+    inputs: Dict[str, Any], grid: Dict[str, ArrayLike]
+) -> Tuple[Dict[str, Any], Tuple[str, ...], Dict[str, np.ndarray]]:
+    """Reshape inputs so that they span the axes of an N-dimensional grid.
+
+    Parameters
+    ----------
+    inputs
+        Dictionary of input names and values.
+    grid
+        Dictionary of input names and 1D arrays of the axes.
+        Frequency (F) is always added as the last axis.
+
+    Returns
+    -------
+    inputs
+        Dictionary of input names and values reshaped for broadcasting.
+    dims
+        Names of the axes.
+    coords
+        Dictionary of the names and values of the axes.
+
+    """
+    if "F" in grid:
+        raise ValueError("F is always the last axis of a grid.")
+
+    for name in grid:
+        if name not in inputs:
+            raise ValueError(f"{name} is not a valid parameter.")
+
+    inputs = dict(inputs)
+    inputs["F"] = np.atleast_1d(np.asarray(inputs["F"]))
+
+    dims = tuple(grid) + ("F",)
+    coords = {}
+
+    for i, name in enumerate(grid):
+        coords[name] = np.asarray(grid[name])
+
+        if coords[name].ndim != 1:
+            raise ValueError(f"Values of {name} must be 1D.")
+
+        inputs[name] = coords[name].reshape((-1,) + (1,) * (len(dims) - i - 1))
+
+    coords["F"] = inputs["F"]
+    return inputs, dims, coords
+
+
+def quantity(func: Callable) -> Callable:
+    """Register a function as a quantity of the graph.
+
+    The name of the quantity is the name of the function without
+    the leading underscore, and its dependencies are the names
+    of the arguments of the function (inputs or other quantities).
+    An optional out= argument is not a dependency: it is an array
+    of a workspace where the result is stored (or None). See evaluate().
+
+    """
+    name = func.__name__.lstrip("_")
+    args = tuple(arg for arg in signature(func).parameters if arg != "out")
+    QUANTITIES[name] = func, args
+    return func
+
+
+# quantities
+# ##########
+# Each quantity depends on the quantities (or inputs) of its arguments.
+# They are evaluated lazily by evaluate(). See spectrometer_sensitivity().
+
+# Equivalent Bandwidth of 1 channel.
+# Used for calculating loading and coupling to a continuum source
+@quantity
+def _W_F_cont(F, R, eta_IBF):
+    return F / R / eta_IBF
+
+
+# Used for calculating coupling to a line source,
+# with a linewidth not wider than the filter channel
+@quantity
+def _W_F_spec(F, R):
+    return F / R
+
 
-    # if np.all(Pkid != Pkid_sky + Pkid_warm + Pkid_cold):
-    #     print("WARNING: Pkid != Pkid_sky + Pkid_warm + Pkid_cold")
+# #############################################################
+# 1. Calculating loading power absorbed by the KID, and the NEP
+# #############################################################
 
-    # Photon + R(ecombination) NEP of the KID
-    # .............................................
+# .......................................................
+# Efficiencies for calculating sky coupling
+# .......................................................
 
-    NEPkid = photon_NEP_kid(F, Pkid, W_F_cont) * KID_excess_noise_factor
+# Ohmic loss as a function of frequency, from skin effect scaling
+@quantity
+def _eta_Al_ohmic(F):
+    return 1.0 - (1.0 - eta_Al_ohmic_850) * np.sqrt(F / 850.0e9)
 
-    # Instrument NEP as in JATIS 2019
-    # .............................................
 
-    NEPinst = NEPkid / eta_inst  # Instrument NEP
+# Collect efficiencies at the same temperature
+@quantity
+def _eta_M1(eta_Al_ohmic, eta_M1_spill):
+    return eta_Al_ohmic * eta_M1_spill
 
-    # ##############################################################
-    # 2. Calculating source coupling and sensitivtiy (MDLF and NEFD)
-    # ##############################################################
 
-    # Efficiencies
-    # .........................................................
+@quantity
+def _eta_wo(eta_Al_ohmic, n_wo_mirrors, eta_wo_spill):
+    return eta_Al_ohmic ** n_wo_mirrors * eta_wo_spill
 
-    Ag = np.pi * (telescope_diameter / 2.0) ** 2.0  # Geometric area of the telescope
-    omega_mb = np.pi * theta_maj * theta_min / np.log(2) / 4  # Main beam solid angle
+
+@quantity
+def _eta_chip(eta_lens_antenna_rad, eta_circuit):
+    return eta_lens_antenna_rad * eta_circuit
+
+
+# Forward efficiency: does/should not include window loss
+# because it is defined as how much power out of
+# the crystat window couples to the cold sky.
+@quantity
+def _eta_forward(eta_M1, eta_Al_ohmic, eta_M2_spill, eta_wo):
+    eta_M2_ohmic = eta_Al_ohmic
+    return eta_M1 * eta_M2_ohmic * eta_M2_spill * eta_wo + (1.0 - eta_M2_spill) * eta_wo
+
+
+# Calcuate eta. scalar/vector depending on F.
+# (N-dimensional array if pwv, EL or R is on the axes of a grid)
+@quantity
+def _eta_atm(F, pwv, EL, R, profile):
+    if np.ndim(pwv) == np.ndim(EL) == 0 and np.ndim(R) <= 1 and np.ndim(F) <= 1:
+        return eta_atm_func(F=F, pwv=pwv, EL=EL, R=R, profile=profile)
+
+    return eta_atm_broadcast(F=F, pwv=pwv, EL=EL, R=R, profile=profile)
+
+
+# Johnson-Nyquist Power Spectral Density (W/Hz)
+# for the physical temperatures of each stage
+@quantity
+def _psd_jn_cmb(F, Tb_cmb, out=None):
+    return johnson_nyquist_psd(F=F, T=Tb_cmb, out=out)
+
+
+@quantity
+def _psd_jn_amb(F, Tp_amb, out=None):
+    return johnson_nyquist_psd(F=F, T=Tp_amb, out=out)
+
+
+# The atmosphere is at the ambient temperature, but it is distinguished
+# from the ambient environment around the telescope (e.g., for optics.py)
+@quantity
+def _psd_jn_atm(psd_jn_amb):
+    return psd_jn_amb
+
+
+@quantity
+def _psd_jn_cabin(F, Tp_cabin, out=None):
+    return johnson_nyquist_psd(F=F, T=Tp_cabin, out=out)
+
+
+@quantity
+def _psd_jn_co(F, Tp_co, out=None):
+    return johnson_nyquist_psd(F=F, T=Tp_co, out=out)
+
+
+@quantity
+def _psd_jn_chip(F, Tp_chip, out=None):
+    return johnson_nyquist_psd(F=F, T=Tp_chip, out=out)
+
+
+# Optical Chain
+# The Power Spectral Density (W/Hz) at each stage (psd_sky, psd_M1, ..., psd_KID)
+# is calculated by the stages of the optical chain (see chain.py).
+# Uses only basic radiation transfer: rad_out = eta*rad_in + (1-eta)*medium
+
+# Window: the reflected power at both surfaces sees the cold optics
+@quantity
+def _eta_window_refl(window_AR):
+    return 1.0 - window_refl(window_AR=window_AR)
+
+
+@quantity
+def _eta_HDPE(F):
+    return window_eta_HDPE(F=F)
+
+
+@quantity
+def _eta_window(eta_window_refl, eta_HDPE):
+    return eta_window_refl ** 2 * eta_HDPE
+
+
+# Instrument optical efficiency as in JATIS 2019
+# (eta_inst can be calculated only after calculating eta_window)
+@quantity
+def _eta_inst(eta_chip, eta_co, eta_window):
+    return eta_chip * eta_co * eta_window
+
+
+# Sky loading, Warm loading and Cold loading (psd_KID_sky, psd_KID_warm and
+# psd_KID_cold) are calculated individually from the optical chain.
+# .................................................................................
+
+
+@quantity
+def _skycoup(psd_KID_sky, psd_sky):
+    return psd_KID_sky / psd_sky  # To compare with Jochem
+
+
+# Loadig power absorbed by the KID
+# .............................................
+@quantity
+def _Pkid(psd_KID, W_F_cont, out=None):
+    return np.multiply(psd_KID, W_F_cont, out=out)
+
+
+@quantity
+def _Pkid_sky(psd_KID_sky, W_F_cont):
+    return psd_KID_sky * W_F_cont
+
+
+@quantity
+def _Pkid_warm(psd_KID_warm, W_F_cont):
+    return psd_KID_warm * W_F_cont
+
+
+@quantity
+def _Pkid_cold(psd_KID_cold, W_F_cont):
+    return psd_KID_cold * W_F_cont
+
+
+# if np.all(Pkid != Pkid_sky + Pkid_warm + Pkid_cold):
+#     print("WARNING: Pkid != Pkid_sky + Pkid_warm + Pkid_cold")
+
+
+@quantity
+def _n_ph(Pkid, W_F_cont, F):
+    return Pkid / (W_F_cont * h * F)
+
+
+# Photon + R(ecombination) NEP of the KID
+# .............................................
+@quantity
+def _NEPkid(F, Pkid, W_F_cont, KID_excess_noise_factor, out=None):
+    NEPkid = photon_NEP_kid(F, Pkid, W_F_cont, out=out)
+    return np.multiply(NEPkid, KID_excess_noise_factor, out=out)
+
+
+# Instrument NEP as in JATIS 2019
+# .............................................
+@quantity
+def _NEPinst(NEPkid, eta_inst, out=None):
+    return np.divide(NEPkid, eta_inst, out=out)  # Instrument NEP
+
+
+# ##############################################################
+# 2. Calculating source coupling and sensitivtiy (MDLF and NEFD)
+# ##############################################################
+
+# Efficiencies
+# .........................................................
+@quantity
+def _Ag(telescope_diameter):
+    return np.pi * (telescope_diameter / 2.0) ** 2.0  # Geometric area of the telescope
+
+
+@quantity
+def _omega_mb(theta_maj, theta_min):
+    return np.pi * theta_maj * theta_min / np.log(2) / 4  # Main beam solid angle
+
+
+@quantity
+def _eta_a(F, omega_mb, eta_mb, Ag):
     omega_a = omega_mb / eta_mb  # beam solid angle
     Ae = (c / F) ** 2 / omega_a  # Effective Aperture (m^2): lambda^2 / omega_a
-    eta_a = Ae / Ag  # Aperture efficiency
+    return Ae / Ag  # Aperture efficiency
+
 
-    # Coupling from the "S"ource to outside of "W"indow
-    eta_pol = 0.5  # Instrument is single polarization
-    eta_sw = eta_pol * eta_atm * eta_a * eta_forward  # Source-Window coupling
+# Coupling from the "S"ource to outside of "W"indow
+@quantity
+def _eta_sw(eta_atm, eta_a, eta_forward, eta_pol, out=None):
+    eta_sw = np.multiply(eta_pol, eta_atm, out=out)
+    eta_sw = np.multiply(eta_sw, eta_a, out=out)
+    return np.multiply(eta_sw, eta_forward, out=out)  # Source-Window coupling
 
-    # NESP: Noise Equivalent Source Power (an intermediate quantitiy)
-    # .........................................................
 
-    NESP = NEPinst / eta_sw  # Noise equivalnet source power
+# NESP: Noise Equivalent Source Power (an intermediate quantitiy)
+# .........................................................
+@quantity
+def _NESP(NEPinst, eta_sw, out=None):
+    return np.divide(NEPinst, eta_sw, out=out)  # Noise equivalnet source power
 
-    # NEF: Noise Equivalent Flux (an intermediate quantitiy)
-    # .........................................................
 
+# NEF: Noise Equivalent Flux (an intermediate quantitiy)
+# .........................................................
+@quantity
+def _NEF(NESP, Ag, on_off, out=None):
     # From this point, units change from Hz^-0.5 to t^0.5
     # sqrt(2) is because NEP is defined for 0.5 s integration.
 
-    NEF = NESP / Ag / np.sqrt(2)  # Noise equivalent flux
+    NEF = np.divide(NESP, Ag, out=out)
+    NEF = np.divide(NEF, np.sqrt(2), out=out)  # Noise equivalent flux
 
     # If the observation is involves ON-OFF sky subtraction,
     # Subtraction of two noisy sources results in sqrt(2) increase in noise.
 
-    if on_off:
-        NEF = np.sqrt(2) * NEF
+    if np.ndim(on_off) == 0:
+        if on_off:
+            NEF = np.multiply(NEF, np.sqrt(2), out=out)
+    else:
+        NEF = np.multiply(NEF, np.where(on_off, np.sqrt(2), 1.0), out=out)
+
+    return NEF
+
+
+# MDLF (Minimum Detectable Line Flux)
+# .........................................................
 
-    # MDLF (Minimum Detectable Line Flux)
-    # .........................................................
+# Note that eta_IBF does not matter for MDLF because it is flux.
+@quantity
+def _MDLF(NEF, snr, obs_hours, on_source_fraction, out=None):
+    MDLF = np.multiply(NEF, snr, out=out)
+    on_source_seconds = obs_hours * on_source_fraction * 60.0 * 60.0
+    return np.divide(MDLF, np.sqrt(on_source_seconds), out=out)
 
-    # Note that eta_IBF does not matter for MDLF because it is flux.
 
-    MDLF = NEF * snr / np.sqrt(obs_hours * on_source_fraction * 60.0 * 60.0)
+# NEFD (Noise Equivalent Flux Density)
+# .........................................................
+@quantity
+def _NEFD_line(NEF, W_F_spec):
+    return NEF / W_F_spec
 
-    # NEFD (Noise Equivalent Flux Density)
-    # .........................................................
 
-    spectral_NEFD = NEF / W_F_spec
-    continuum_NEFD = NEF / W_F_cont  # = spectral_NEFD * eta_IBF < spectral_NEFD
+@quantity
+def _NEFD_continuum(NEF, W_F_cont):
+    return NEF / W_F_cont  # = spectral_NEFD * eta_IBF < spectral_NEFD
 
-    # Mapping Speed (line, 1 channel) (arcmin^2 mJy^-2 h^-1)
-    # .........................................................
 
-    MS = (
+# Mapping Speed (line, 1 channel) (arcmin^2 mJy^-2 h^-1)
+# .........................................................
+@quantity
+def _MS(omega_mb, NEFD_line):
+    return (
         60.0
         * 60.0
         * 1.0
         * omega_mb
         * (180.0 / np.pi * 60.0) ** 2.0
-        / (np.sqrt(2) * spectral_NEFD * 1e29) ** 2.0
+        / (np.sqrt(2) * NEFD_line * 1e29) ** 2.0
     )
 
-    # Equivalent Trx
-    # .........................................................
-
-    Trx = NEPinst / k / np.sqrt(2 * W_F_cont) - T_from_psd(F, psd_wo)  # assumes RJ!
-
-    # ############################################
-    # 3. Output results as Pandas DataFrame
-    # ############################################
-
-    result = pd.concat(
-        [
-            pd.Series(F, name="F"),
-            pd.Series(pwv, name="PWV"),
-            pd.Series(EL, name="EL"),
-            pd.Series(eta_atm, name="eta_atm"),
-            pd.Series(R, name="R"),
-            pd.Series(W_F_spec, name="W_F_spec"),
-            pd.Series(W_F_cont, name="W_F_cont"),
-            pd.Series(theta_maj, name="theta_maj"),
-            pd.Series(theta_min, name="theta_min"),
-            pd.Series(eta_a, name="eta_a"),
-            pd.Series(eta_mb, name="eta_mb"),
-            pd.Series(eta_forward, name="eta_forward"),
-            pd.Series(eta_sw, name="eta_sw"),
-            pd.Series(eta_window, name="eta_window"),
-            pd.Series(eta_inst, name="eta_inst"),
-            pd.Series(eta_circuit, name="eta_circuit"),
-            pd.Series(T_from_psd(F, psd_sky), name="Tb_sky"),
-            pd.Series(T_from_psd(F, psd_M1), name="Tb_M1"),
-            pd.Series(T_from_psd(F, psd_M2), name="Tb_M2"),
-            pd.Series(T_from_psd(F, psd_wo), name="Tb_wo"),
-            pd.Series(T_from_psd(F, psd_window), name="Tb_window"),
-            pd.Series(T_from_psd(F, psd_co), name="Tb_co"),
-            pd.Series(T_from_psd(F, psd_KID), name="Tb_KID"),
-            pd.Series(psd_KID, name="psd_KID"),
-            pd.Series(Pkid, name="Pkid"),
-            pd.Series(Pkid_sky, name="Pkid_sky"),
-            pd.Series(Pkid_warm, name="Pkid_warm"),
-            pd.Series(Pkid_cold, name="Pkid_cold"),
-            pd.Series(Pkid / (W_F_cont * h * F), name="n_ph"),
-            pd.Series(NEPkid, name="NEPkid"),
-            pd.Series(NEPinst, name="NEPinst"),
-            pd.Series(spectral_NEFD, name="NEFD_line"),
-            pd.Series(continuum_NEFD, name="NEFD_continuum"),
-            pd.Series(NEF, name="NEF"),
-            pd.Series(MDLF, name="MDLF"),
-            pd.Series(MS, name="MS"),
-            pd.Series(snr, name="snr"),
-            pd.Series(obs_hours, name="obs_hours"),
-            pd.Series(on_source_fraction, name="on_source_fraction"),
-            pd.Series(obs_hours * on_source_fraction, name="on_source_hours"),
-            pd.Series(Trx, name="equivalent_Trx"),
-            pd.Series(skycoup, name="skycoup"),
-            pd.Series(eta_Al_ohmic, name="eta_Al_ohmic"),
-            # pd.Series(Pkid_warm_jochem, name='Pkid_warm_jochem')
-        ],
-        axis=1,
-    )
 
-    # Turn Scalar values into vectors
-    return result.fillna(method="ffill")
+# Equivalent Trx
+# .........................................................
+@quantity
+def _equivalent_Trx(NEPinst, W_F_cont, F, psd_wo):
+    return NEPinst / k / np.sqrt(2 * W_F_cont) - T_from_psd(F, psd_wo)  # assumes RJ!
+
+
+# ############################################
+# 3. Other outputs
+# ############################################
+@quantity
+def _PWV(pwv):
+    return pwv
+
+
+@quantity
+def _Tb_sky(F, psd_sky, out=None):
+    return T_from_psd(F, psd_sky, out=out)
+
+
+@quantity
+def _Tb_M1(F, psd_M1, out=None):
+    return T_from_psd(F, psd_M1, out=out)
+
+
+@quantity
+def _Tb_M2(F, psd_M2, out=None):
+    return T_from_psd(F, psd_M2, out=out)
+
+
+@quantity
+def _Tb_wo(F, psd_wo, out=None):
+    return T_from_psd(F, psd_wo, out=out)
+
+
+@quantity
+def _Tb_window(F, psd_window, out=None):
+    return T_from_psd(F, psd_window, out=out)
+
+
+@quantity
+def _Tb_co(F, psd_co, out=None):
+    return T_from_psd(F, psd_co, out=out)
+
+
+@quantity
+def _Tb_KID(F, psd_KID, out=None):
+    return T_from_psd(F, psd_KID, out=out)
+
+
+@quantity
+def _on_source_hours(obs_hours, on_source_fraction):
+    return obs_hours * on_source_fraction
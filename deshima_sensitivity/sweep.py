@@ -0,0 +1,1008 @@
+__all__ = ["run_sweep", "evaluate_configs", "SweepStore"]
+
+
+# standard library
+import errno
+import json
+import os
+import socket
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import reduce
+from itertools import islice
+from pathlib import Path
+from tempfile import mkstemp
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from typing import Union
+from uuid import uuid4
+
+
+# dependent packages
+import numpy as np
+import pandas as pd
+from . import __version__
+from .atmosphere import atm_table, replace_atomic
+from .cache import digest
+from .channels import resolve_params
+from .config import to_inputs, to_params
+from .simulator import SensitivityResult, Workspace, evaluate, get_inputs
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+Configs = Union[Sequence[Any], pd.DataFrame]
+
+
+# constants
+INPUTS = get_inputs()  # inputs of spectrometer_sensitivity() and their defaults
+OBJECTS = ("chain", "profile")  # inputs which are objects rather than arrays
+CONSOLIDATED = ".consolidated"  # marker file of a consolidated store
+CONSOLIDATING = ".consolidating"  # claim file of the consolidation of a store
+CLAIM_TIMEOUT = 3600.0  # seconds after which a claim of consolidation is stale
+NO_LINK = (
+    errno.EPERM,
+    errno.EACCES,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.ENOSYS,
+)  # errors of os.link() on filesystems without hard links (e.g., SMB, FUSE)
+
+
+# main functions
+def run_sweep(
+    grid: Optional[Dict[str, ArrayLike]] = None,
+    configs: Optional[Configs] = None,
+    outputs: Sequence[str] = ("MDLF",),
+    n_workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    store: Optional[Union[Path, str]] = None,
+    resume: bool = False,
+    shard: Tuple[int, int] = (0, 1),
+    **params: Any,
+) -> Optional[SensitivityResult]:
+    """Run spectrometer_sensitivity() over many configurations in parallel.
+
+    Configurations are given as a grid of parameters or a list of them.
+    They are split into chunks, each of which is evaluated in one vectorized
+    call on a process pool, and the results are written into preallocated
+    arrays as the chunks complete. Worker processes share the atmosphere
+    table by memory-mapping its binary sidecar (see AtmosphereTable),
+    which is created before the pool starts, instead of receiving it per task.
+
+    If store is specified, the results are written chunk by chunk to
+    an on-disk columnar store (see SweepStore) instead of memory,
+    so that the memory usage is bounded by the chunk size.
+    Each chunk is saved atomically as it completes, which makes the store
+    a checkpoint: a sweep restarted with resume=True evaluates only
+    the missing chunks. A sweep can also be split into shards which are run
+    by independent processes (or machines) sharing the store.
+
+    Parameters
+    ----------
+    grid
+        Dictionary of parameter names and 1D arrays.
+        All combinations of them are evaluated (see spectrometer_sensitivity()).
+    configs
+        List of dictionaries of parameter names and values (one per configuration)
+        or a DataFrame of them (one row per configuration, labelled by the index).
+        A configuration can also be a configuration object (e.g., Detector)
+        or a tuple of them (see config.py).
+        Values must be scalars or vectors of the same length as F.
+        Parameters not in a dictionary are taken from params (or the defaults).
+    outputs
+        Names of outputs to be calculated. See spectrometer_sensitivity().
+    n_workers
+        Number of worker processes. If not specified, the number of CPUs is used.
+        If it is 1, all chunks are evaluated in the current process.
+    chunk_size
+        Number of configurations in one chunk.
+    store
+        Path of a directory where the results are stored (see SweepStore).
+    resume
+        Whether to skip the chunks already completed in the store (True)
+        or to evaluate all chunks again (False). Requires store.
+    shard
+        (index, count) of the shard to be evaluated by this call.
+        Chunks are assigned to shards deterministically (round robin),
+        so that the same sweep can be run with each index in parallel.
+        Requires store.
+    params
+        Other parameters of spectrometer_sensitivity() common to all configurations
+        (e.g., F). Parameters in grid or configs override them.
+
+    Returns
+    -------
+    result
+        SensitivityResult whose outputs have the shape of (configurations, F).
+        If grid is given, the configuration axis is reshaped to the axes of it.
+        If store is given, the outputs are read-only memory-mapped arrays,
+        or None if the chunks of the other shards are not completed yet
+        (or another shard is consolidating the store, which is warned).
+
+    Example
+    --------
+        Run MDLF over a PWV x EL x eta_circuit grid with 4 processes::
+
+            result = run_sweep(
+                grid={"pwv": pwv, "EL": EL, "eta_circuit": eta_circuit},
+                F=F,
+                n_workers=4,
+            )
+            mdlf = result["MDLF"]
+
+        Run the same sweep on two machines (shard=(1, 2) on the other one)::
+
+            run_sweep(grid=grid, F=F, store="sweep", resume=True, shard=(0, 2))
+
+    """
+    get_inputs(**params)  # check the names of parameters
+    params = resolve_params(params)
+
+    if store is None and (resume or shard != (0, 1)):
+        raise ValueError("Store must be specified to resume or shard a sweep.")
+
+    columns, dims, coords = make_configs(grid, configs, params)
+    n_configs = len(next(iter(columns.values()))) if columns else 1
+    F = np.atleast_1d(np.asarray(params.get("F", INPUTS["F"])))
+
+    coords["F"] = F
+    shape = tuple(len(coords[dim]) for dim in dims)
+    chunks = [
+        (start, min(start + chunk_size, n_configs))
+        for start in range(0, n_configs, chunk_size)
+    ]
+
+    if store is None:
+        # values of all outputs, to be filled as the chunks complete
+        values = {name: np.empty((n_configs,) + F.shape) for name in outputs}
+
+        for start, stop, chunk in iter_chunks(
+            columns, params, outputs, chunks, n_workers
+        ):
+            for name in outputs:
+                values[name][start:stop] = chunk[name]
+
+        values = {name: value.reshape(shape) for name, value in values.items()}
+        return SensitivityResult(values, dims, coords)
+
+    # the key is shared with other processes (e.g., shards)
+    try:
+        key = digest(dict(params, **columns))
+    except TypeError as error:
+        raise ValueError(
+            "Inputs of a stored sweep must be digested by value."
+        ) from error
+    store = SweepStore.create(store, outputs, dims, coords, chunks, key, resume)
+
+    index, count = shard
+    todo = set(range(index, len(chunks), count))
+
+    if resume:
+        todo -= store.completed()
+
+    indices = {chunk: i for i, chunk in enumerate(chunks)}
+
+    for start, stop, chunk in iter_chunks(
+        columns, params, outputs, [chunks[i] for i in sorted(todo)], n_workers
+    ):
+        store.write_chunk(indices[start, stop], chunk)
+
+    # only one shard (which completes the last chunk) consolidates the store
+    if len(store.completed()) < len(chunks):
+        return None
+
+    if not store.consolidate():
+        warnings.warn(
+            f"{store.path} is being consolidated by another process "
+            f"({store.claim()}). Load it later by SweepStore.load()."
+        )
+        return None
+
+    return store.load()
+
+
+def evaluate_configs(
+    configs: Configs, outputs: Sequence[str] = ("MDLF",), **params: Any,
+) -> SensitivityResult:
+    """Evaluate a table of configurations in one broadcasted call.
+
+    Unlike run_sweep(), all configurations are evaluated at once
+    in the current process: each parameter of the table becomes
+    a column vector (configurations, 1) broadcasted against F,
+    so that the quantities are calculated without a loop over
+    the configurations. It is suitable for comparisons of up to
+    several thousands of variants (e.g., goal and baseline instruments).
+
+    Parameters
+    ----------
+    configs
+        List of dictionaries of parameter names and values (one per configuration)
+        or a DataFrame of them (one row per configuration, labelled by the index).
+        A configuration can also be a configuration object (e.g., Detector)
+        or a tuple of them (see config.py), whose derived quantities
+        (e.g., Ag and omega_mb, see config.to_inputs()) are given as
+        precomputed inputs if all configurations have them.
+        Values must be scalars or vectors of the same length as F.
+        Parameters not in a configuration are taken from params (or the defaults).
+    outputs
+        Names of outputs to be calculated. See spectrometer_sensitivity().
+    params
+        Other parameters of spectrometer_sensitivity() common to all configurations
+        (e.g., F).
+
+    Returns
+    -------
+    result
+        SensitivityResult whose outputs have the shape of (configurations, F).
+
+    Example
+    --------
+        Compare variants of an instrument on two telescopes::
+
+            configs = pd.DataFrame(
+                {
+                    "eta_circuit": [0.32, 0.16, 0.32, 0.16],
+                    "telescope_diameter": [10.0, 10.0, 50.0, 50.0],
+                },
+                index=["goal/ASTE", "baseline/ASTE", "goal/LST", "baseline/LST"],
+            )
+            result = evaluate_configs(configs, ["MDLF", "MS"], F=F)
+            mdlf = result["MDLF"]  # shape of (4, len(F))
+
+    """
+    get_inputs(**params)  # check the names of parameters
+    params = resolve_params(params)
+
+    columns, dims, coords = make_configs(None, configs, params)
+    coords["F"] = np.atleast_1d(np.asarray(params.get("F", INPUTS["F"])))
+
+    values = evaluate_chunk(columns, params, outputs)
+    return SensitivityResult(values, dims, coords)
+
+
+# helper classes
+class SweepStore:
+    """Columnar on-disk store of the results of a sweep.
+
+    A store is a directory which has one NumPy file (.npy) per output,
+    whose shape is (configurations, F), and a JSON manifest (manifest.json)
+    of the axes and the chunks of the sweep. Each output can be memory-mapped
+    without loading the others.
+
+    While a sweep is running, each chunk is saved atomically to its own file
+    (chunks/<index>.npz), whose existence marks the chunk as completed.
+    The chunk files are consolidated into the outputs after all chunks
+    are completed, which is marked by a marker file (.consolidated).
+    The chunk files are kept as a checkpoint
+    unless they are removed by SweepStore.consolidate(remove_chunks=True).
+
+    Parameters
+    ----------
+    path
+        Path of the directory of the store.
+
+    Example
+    --------
+        Memory-map MDLF of a sweep::
+
+            mdlf = SweepStore("sweep").column("MDLF")
+
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.token: Optional[str] = None  # token of a claim of this object
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        """Contents of the manifest of the store."""
+        with open(self.path / "manifest.json") as f:
+            return json.load(f)
+
+    @property
+    def outputs(self) -> List[str]:
+        """Names of the outputs in the store."""
+        return self.manifest["outputs"]
+
+    @classmethod
+    def create(
+        cls,
+        path: Union[Path, str],
+        outputs: Sequence[str],
+        dims: Tuple[str, ...],
+        coords: Dict[str, np.ndarray],
+        chunks: Sequence[Tuple[int, int]],
+        key: str = "",
+        resume: bool = False,
+    ) -> "SweepStore":
+        """Create a store (or open the store of the same sweep).
+
+        Parameters
+        ----------
+        path
+            Path of the directory of the store.
+        outputs
+            Names of the outputs.
+        dims
+            Names of the axes of the results (the last one is F).
+        coords
+            Dictionary of the names and values of the axes.
+        chunks
+            (start, stop) of the chunks of the sweep.
+        key
+            Digest of the inputs of the sweep (see digest()).
+        resume
+            If True, the store must have the same manifest when it exists.
+            If False, an existing store of a different sweep is overwritten.
+
+        Returns
+        -------
+        store
+            Created store.
+
+        """
+        store = cls(path)
+
+        manifest = {
+            "version": __version__,
+            "key": key,
+            "outputs": list(outputs),
+            "dims": list(dims),
+            "coords": {dim: np.asarray(coords[dim]).tolist() for dim in dims},
+            "chunks": [list(chunk) for chunk in chunks],
+        }
+
+        if (store.path / "manifest.json").exists():
+            if store.manifest == manifest:
+                return store
+
+            if resume:
+                raise ValueError(f"{store.path} is a store of a different sweep.")
+
+            store.clear()
+
+        (store.path / "chunks").mkdir(parents=True, exist_ok=True)
+
+        def save(f):
+            f.write(json.dumps(manifest, indent=4).encode())
+
+        # all shards write the same manifest, so the last one wins safely
+        replace_atomic(store.path / "manifest.json", save)
+        return store
+
+    def clear(self) -> None:
+        """Remove the manifest, outputs and chunks of the store."""
+        names = [f"{name}.npy" for name in self.outputs]
+
+        for name in names + [CONSOLIDATED, CONSOLIDATING]:
+            if (self.path / name).exists():
+                (self.path / name).unlink()
+
+        for path in (self.path / "chunks").glob("*.npz"):
+            path.unlink()
+
+        (self.path / "manifest.json").unlink()
+
+    def completed(self) -> Set[int]:
+        """Return the indices of completed chunks (all if consolidated)."""
+        if (self.path / CONSOLIDATED).exists():
+            return set(range(len(self.manifest["chunks"])))
+
+        return {int(path.stem) for path in (self.path / "chunks").glob("*.npz")}
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Return the owner of the claim of the consolidation.
+
+        Returns
+        -------
+        owner
+            Dictionary of the host, the PID and the token of the claim
+            and the time of its last refresh (the modification time
+            of the claim file in seconds since the epoch),
+            or None if it is not claimed. The host, the PID and the token
+            are None if the claim is not readable (e.g., being written).
+
+        """
+        return read_claim(self.path / CONSOLIDATING)
+
+    def is_stale(self, owner: Optional[Dict[str, Any]]) -> bool:
+        """Return whether a claim of the consolidation is stale.
+
+        A claim is stale if it has not been refreshed for CLAIM_TIMEOUT
+        (it is refreshed for each output written by the consolidation)
+        or if its process on the same host is not running
+        (e.g., killed or preempted during the consolidation).
+
+        Parameters
+        ----------
+        owner
+            Owner of the claim (see SweepStore.claim()).
+
+        Returns
+        -------
+        stale
+            Whether the claim is stale (False if it is not claimed).
+
+        """
+        if owner is None:
+            return False
+
+        if time.time() - owner["time"] > CLAIM_TIMEOUT:
+            return True
+
+        if owner["host"] != socket.gethostname() or os.name != "posix":
+            return False
+
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+
+        return False
+
+    def write_chunk(self, index: int, values: Dict[str, np.ndarray]) -> None:
+        """Save the outputs of a chunk atomically.
+
+        Parameters
+        ----------
+        index
+            Index of the chunk in the manifest.
+        values
+            Dictionary of output names and arrays with the shape of (chunk, F).
+
+        """
+        path = self.path / "chunks" / f"{index}.npz"
+        replace_atomic(path, lambda f: np.savez(f, **values))
+
+    def consolidate(self, remove_chunks: bool = False) -> bool:
+        """Consolidate the chunks into one NumPy file per output (only once).
+
+        The consolidation is claimed by creating a file exclusively,
+        which records the host, the PID and a unique token of the claim,
+        so that only one of concurrent processes (e.g., shards which complete
+        at the same time) consolidates the store. The claim is refreshed
+        (its modification time) for each output written, and a stale claim
+        (see SweepStore.is_stale()) is taken over. A claim is removed
+        only after it is moved aside and confirmed to be the same owner,
+        so that a process never removes a claim which another process
+        has taken over in between. A marker file is written
+        after all outputs are written, and later calls do nothing.
+        The chunk files are removed only after the marker file is written.
+
+        Parameters
+        ----------
+        remove_chunks
+            Whether to remove the chunk files after consolidation.
+
+        Returns
+        -------
+        consolidated
+            Whether the store is consolidated (False if another process
+            is consolidating it).
+
+        """
+        manifest = self.manifest
+        chunks = manifest["chunks"]
+        coords = manifest["coords"]
+        shape = (chunks[-1][1], len(coords[manifest["dims"][-1]]))
+
+        if len(self.completed()) < len(chunks):
+            raise ValueError("All chunks must be completed to consolidate.")
+
+        if not (self.path / CONSOLIDATED).exists():
+            if not self._claim():
+                owner = self.claim()
+
+                if not self.is_stale(owner):
+                    return (self.path / CONSOLIDATED).exists()
+
+                # outputs are written atomically from the same chunks,
+                # so a late owner of the stale claim never corrupts them
+                self._unclaim(owner)
+
+                if not self._claim():
+                    return (self.path / CONSOLIDATED).exists()
+
+            try:
+                self._consolidate(manifest, shape)
+            except BaseException:
+                self._unclaim({"token": self.token})
+                raise
+
+        if remove_chunks:
+            for path in (self.path / "chunks").glob("*.npz"):
+                path.unlink()
+
+        return True
+
+    def _claim(self) -> bool:
+        """Create the claim file exclusively (False if it exists)."""
+        token = uuid4().hex
+        owner = {"host": socket.gethostname(), "pid": os.getpid(), "token": token}
+        fd, tmp = mkstemp(suffix=".tmp", prefix=f"{CONSOLIDATING}.", dir=self.path)
+
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(owner, f)
+
+            link_exclusive(tmp, self.path / CONSOLIDATING)
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(tmp)
+
+        self.token = token
+        return True
+
+    def _refresh(self) -> None:
+        """Refresh the modification time of the claim if it is still ours."""
+        owner = self.claim()
+
+        if owner is None or owner["token"] != self.token:
+            return
+
+        try:
+            os.utime(self.path / CONSOLIDATING)
+        except FileNotFoundError:
+            pass
+
+    def _unclaim(self, owner: Dict[str, Any]) -> bool:
+        """Remove the claim only if it is still of an owner (False otherwise).
+
+        The claim is moved aside to a unique name before it is read,
+        so that it is compared with the owner (the token, and the time
+        if given) and removed without a race with the other processes.
+        A claim of another owner is put back unless the store is claimed again.
+
+        """
+        path = self.path / CONSOLIDATING
+        moved = self.path / f"{CONSOLIDATING}.{uuid4().hex}.tmp"
+
+        try:
+            os.rename(path, moved)
+        except FileNotFoundError:
+            return False
+
+        try:
+            claim = read_claim(moved)
+            same = claim is not None and claim["token"] == owner["token"]
+
+            if "time" in owner:
+                same = same and claim["time"] == owner["time"]
+
+            if not same:
+                link_exclusive(moved, path)
+
+            return same
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(moved)
+
+    def _consolidate(self, manifest: Dict[str, Any], shape: Tuple[int, int]) -> None:
+        """Write the outputs from the chunks and then the marker file."""
+        chunks = manifest["chunks"]
+
+        for name in manifest["outputs"]:
+
+            def save(f):
+                header = {"descr": "<f8", "fortran_order": False, "shape": shape}
+                np.lib.format.write_array_header_1_0(f, header)
+
+                for index in range(len(chunks)):
+                    with np.load(self.path / "chunks" / f"{index}.npz") as npz:
+                        f.write(np.ascontiguousarray(npz[name], "<f8").tobytes())
+
+            replace_atomic(self.path / f"{name}.npy", save)
+            self._refresh()
+
+        replace_atomic(self.path / CONSOLIDATED, lambda f: None)
+
+    def column(self, name: str, mode: str = "r") -> np.memmap:
+        """Memory-map an output with the shape of (configurations, F).
+
+        Parameters
+        ----------
+        name
+            Name of the output.
+        mode
+            Mode of the memory map ('r' or 'r+').
+
+        Returns
+        -------
+        value
+            Memory-mapped output.
+
+        """
+        if name not in self.outputs:
+            raise ValueError(f"{name} is not in the store.")
+
+        return np.load(self.path / f"{name}.npy", mmap_mode=mode)
+
+    def load(self) -> SensitivityResult:
+        """Memory-map all outputs as a SensitivityResult on the axes."""
+        manifest = self.manifest
+        dims = tuple(manifest["dims"])
+        coords = {dim: np.asarray(manifest["coords"][dim]) for dim in dims}
+        shape = tuple(len(coords[dim]) for dim in dims)
+
+        values = {
+            name: self.column(name).reshape(shape) for name in manifest["outputs"]
+        }
+        return SensitivityResult(values, dims, coords)
+
+
+# helper functions
+def evaluate_chunk(
+    columns: Dict[str, np.ndarray],
+    params: Dict[str, Any],
+    outputs: Sequence[str],
+    workspace: Optional[Workspace] = None,
+) -> Dict[str, np.ndarray]:
+    """Evaluate a chunk of configurations in one vectorized call.
+
+    Parameters
+    ----------
+    columns
+        Dictionary of parameter names and arrays of the configurations,
+        whose first axis is the configuration axis.
+    params
+        Other parameters common to all configurations.
+    outputs
+        Names of outputs to be calculated.
+    workspace
+        Workspace whose buffers are reused by the intermediate quantities
+        (see simulator.evaluate()). The values may then be views of the buffers.
+
+    Returns
+    -------
+    values
+        Dictionary of output names and arrays with the shape of (chunk, F).
+
+    """
+    inputs = dict(INPUTS, **params)
+    inputs["F"] = np.atleast_1d(np.asarray(inputs["F"]))
+    n_configs = len(next(iter(columns.values()))) if columns else 1
+
+    for name, column in columns.items():
+        if name in OBJECTS:
+            inputs[name] = common_value(name, column)
+            continue
+
+        # (chunk,) -> (chunk, 1) to broadcast against F
+        inputs[name] = column.reshape(column.shape + (1,) * (column.ndim == 1))
+
+    values = evaluate(inputs, outputs, workspace)
+    shape = (n_configs,) + inputs["F"].shape
+    return {name: np.broadcast_to(values[name], shape) for name in outputs}
+
+
+def read_claim(path: Path) -> Optional[Dict[str, Any]]:
+    """Read a claim file of consolidation (see SweepStore.claim()).
+
+    Parameters
+    ----------
+    path
+        Path of the claim file.
+
+    Returns
+    -------
+    owner
+        Dictionary of the host, the PID, the token and the modification time
+        of the claim, or None if the file does not exist.
+
+    """
+    try:
+        with open(path) as f:
+            mtime = os.fstat(f.fileno()).st_mtime
+
+            try:
+                owner = json.load(f)
+            except ValueError:
+                owner = {}
+    except FileNotFoundError:
+        return None
+
+    return {
+        "host": owner.get("host"),
+        "pid": owner.get("pid"),
+        "token": owner.get("token"),
+        "time": mtime,
+    }
+
+
+def link_exclusive(src: Union[Path, str], dst: Union[Path, str]) -> None:
+    """Create a file of the same contents as another only if it does not exist.
+
+    The file is created as a hard link, which never exposes
+    a partially written file. On filesystems without hard links
+    (e.g., SMB or FUSE), it is created exclusively and written in place
+    with the times of the existing file, so that it may be empty
+    (unreadable) for a moment.
+
+    Parameters
+    ----------
+    src
+        Path of the existing file.
+    dst
+        Path of the file to be created.
+
+    Raises
+    ------
+    FileExistsError
+        If the file already exists.
+
+    """
+    try:
+        os.link(src, dst)
+        return
+    except FileExistsError:
+        raise
+    except OSError as error:
+        if error.errno not in NO_LINK:
+            raise
+
+    fd = os.open(dst, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+
+    with os.fdopen(fd, "wb") as f, open(src, "rb") as g:
+        f.write(g.read())
+
+    stat = os.stat(src)
+    os.utime(dst, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def common_value(name: str, column: np.ndarray) -> Any:
+    """Return the value of an object input common to a chunk of configurations.
+
+    Parameters
+    ----------
+    name
+        Name of the input (see OBJECTS).
+    column
+        Array of the values of the configurations.
+
+    Returns
+    -------
+    value
+        Value of the first configuration.
+
+    Raises
+    ------
+    ValueError
+        If the values differ between the configurations.
+
+    """
+    if len({digest({name: value}, identity=True) for value in column}) > 1:
+        raise ValueError(f"{name} must be the same for all configurations.")
+
+    return column[0]
+
+
+def iter_chunks(
+    columns: Union[Dict[str, np.ndarray], Callable[[int, int], Dict[str, np.ndarray]]],
+    params: Dict[str, Any],
+    outputs: Sequence[str],
+    chunks: Sequence[Tuple[int, int]],
+    n_workers: Optional[int] = None,
+    workspace: Optional[Workspace] = None,
+):
+    """Evaluate chunks of configurations and yield them as they complete.
+
+    Parameters
+    ----------
+    columns
+        Dictionary of parameter names and arrays of all configurations,
+        or a function of (start, stop) which returns them of a chunk
+        (e.g., to draw samples on demand).
+    params
+        Other parameters common to all configurations.
+    outputs
+        Names of outputs to be calculated.
+    chunks
+        (start, stop) of the chunks to be evaluated.
+    n_workers
+        Number of worker processes. If it is 1, chunks are evaluated in series.
+    workspace
+        Workspace reused by the chunks evaluated in series (see evaluate_chunk()),
+        whose values are then overwritten by the next chunk.
+        It is not used by worker processes.
+
+    Yields
+    ------
+    start
+        Index of the first configuration of a chunk.
+    stop
+        Index of the last configuration of a chunk plus one.
+    values
+        Dictionary of output names and arrays with the shape of (chunk, F).
+
+    """
+
+    def subset(start, stop):
+        if callable(columns):
+            return columns(start, stop)
+
+        return {name: column[start:stop] for name, column in columns.items()}
+
+    if n_workers == 1 or len(chunks) <= 1:
+        for start, stop in chunks:
+            values = evaluate_chunk(subset(start, stop), params, outputs, workspace)
+            yield start, stop, values
+
+        return
+
+    # create the sidecar of the atmosphere table before workers start
+    # so that all of them memory-map the same file
+    atm_table().data
+
+    # limit the number of chunks in flight so that
+    # finished results do not pile up in memory
+    chunks = iter(chunks)
+    max_pending = 2 * (n_workers or os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(n_workers) as executor:
+        pending = {}
+
+        while True:
+            for start, stop in islice(chunks, max_pending - len(pending)):
+                args = subset(start, stop), params, outputs
+                pending[executor.submit(evaluate_chunk, *args)] = start, stop
+
+            if not pending:
+                return
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                start, stop = pending.pop(future)
+                yield start, stop, future.result()
+
+
+def make_configs(
+    grid: Optional[Dict[str, ArrayLike]],
+    configs: Optional[Configs],
+    params: Dict[str, Any],
+) -> Tuple[Dict[str, np.ndarray], Tuple[str, ...], Dict[str, np.ndarray]]:
+    """Make a table (struct of arrays) of configurations from a grid or a list.
+
+    Parameters
+    ----------
+    grid
+        Dictionary of parameter names and 1D arrays.
+    configs
+        List of dictionaries of parameter names and values
+        or a DataFrame of them (one row per configuration).
+    params
+        Other parameters common to all configurations.
+
+    Returns
+    -------
+    columns
+        Dictionary of parameter names and arrays of the configurations,
+        whose first axis is the configuration axis.
+    dims
+        Names of the axes of the result (the last one is F).
+    coords
+        Dictionary of the names and values of the axes except F.
+
+    """
+    if (grid is None) == (configs is None):
+        raise ValueError("Either grid or configs must be specified.")
+
+    if grid is not None:
+        names = list(grid)
+
+        for name in names:
+            if name not in INPUTS or name == "F" or name in OBJECTS:
+                raise ValueError(f"{name} is not a valid parameter of grid.")
+
+        coords = {name: np.asarray(grid[name]) for name in names}
+        mesh = np.meshgrid(*coords.values(), indexing="ij")
+        columns = {name: value.ravel() for name, value in zip(names, mesh)}
+        return columns, tuple(names) + ("F",), coords
+
+    if isinstance(configs, pd.DataFrame):
+        for name in configs:
+            if name not in INPUTS:
+                raise ValueError(f"{name} is not a valid parameter.")
+
+        # columns of vectors (of F) are stacked along the configuration axis
+        columns = {
+            name: np.array(configs[name].tolist())
+            if configs[name].dtype == object
+            else configs[name].to_numpy()
+            for name in configs
+        }
+        return columns, ("config", "F"), {"config": configs.index.to_numpy()}
+
+    # quantities derived from configuration objects (common to all of them)
+    derived = [row_derived(config, params) for config in configs]
+    common = set.intersection(*map(set, derived)) if derived else set()
+    configs = [
+        dict(row_params(config), **{name: values[name] for name in common})
+        for config, values in zip(configs, derived)
+    ]
+    names = sorted(set().union(*configs))
+    columns = {}
+
+    for name in names:
+        if name not in INPUTS and name not in common:
+            raise ValueError(f"{name} is not a valid parameter.")
+
+        default = params.get(name, INPUTS.get(name))
+        values = [config.get(name, default) for config in configs]
+
+        if name in OBJECTS:
+            columns[name] = np.empty(len(values), dtype=object)
+
+            for i, value in enumerate(values):
+                columns[name][i] = value
+
+            continue
+
+        # scalars and vectors (of F) are mixed in general
+        # (pairwise as np.broadcast() accepts at most 32 arrays)
+        shape = reduce(
+            lambda shape, value: np.broadcast(np.broadcast_to(0.0, shape), value).shape,
+            values,
+            (),
+        )
+        columns[name] = np.array([np.broadcast_to(v, shape) for v in values])
+
+    return columns, ("config", "F"), {"config": np.arange(len(configs))}
+
+
+def row_params(config: Any) -> Dict[str, Any]:
+    """Return parameters of a configuration in a list of configurations.
+
+    Parameters
+    ----------
+    config
+        Dictionary of parameter names and values, a configuration object
+        (e.g., Detector, see config.py) or a tuple of them.
+
+    Returns
+    -------
+    params
+        Dictionary of parameter names and values.
+
+    """
+    if isinstance(config, dict):
+        return config
+
+    if hasattr(config, "_asdict"):
+        return to_params(config)
+
+    return to_params(*config)
+
+
+def row_derived(config: Any, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Return quantities derived from a configuration in a list of configurations.
+
+    Parameters
+    ----------
+    config
+        Dictionary of parameter names and values, a configuration object
+        (e.g., Detector, see config.py) or a tuple of them.
+    params
+        Other parameters common to all configurations.
+        Fields of the configuration override them.
+
+    Returns
+    -------
+    derived
+        Dictionary of the names and values of the derived quantities
+        (see config.to_inputs()). Empty if config is a dictionary.
+
+    """
+    if isinstance(config, dict):
+        return {}
+
+    configs = (config,) if hasattr(config, "_asdict") else tuple(config)
+    fields = set().union(*(c._fields for c in configs))
+    common = {name: value for name, value in params.items() if name not in fields}
+    inputs = to_inputs(*configs, **common)
+    return {name: value for name, value in inputs.items() if name not in INPUTS}
@@ -0,0 +1,349 @@
+__all__ = ["propagate_uncertainty"]
+
+
+# standard library
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+
+# dependent packages
+import numpy as np
+from .channels import resolve_params
+from .simulator import SensitivityResult, Workspace, get_inputs
+from .sweep import INPUTS, iter_chunks
+
+
+# type aliases
+ArrayLike = Union[np.ndarray, List[float], List[int], float, int]
+Distribution = Union[Tuple[Any, ...], Callable[[np.random.Generator, Tuple], Any]]
+
+
+# constants
+PERCENTILES = (2.5, 16.0, 50.0, 84.0, 97.5)  # median and 1 and 2 sigma
+N_BINS = 1024  # number of histogram bins per channel for the percentiles
+BLOCK_SIZE = 1000  # number of samples drawn from one random generator
+
+
+# main functions
+def propagate_uncertainty(
+    distributions: Dict[str, Distribution],
+    n_samples: int = 10000,
+    outputs: Sequence[str] = ("MDLF", "NEFD_line", "MS"),
+    percentiles: Sequence[float] = PERCENTILES,
+    seed: Optional[int] = 0,
+    n_workers: Optional[int] = 1,
+    chunk_size: int = 10000,
+    n_bins: int = N_BINS,
+    **params: Any,
+) -> SensitivityResult:
+    """Propagate uncertainties of parameters by Monte Carlo sampling.
+
+    Samples of the parameters are drawn chunk by chunk from their distributions
+    and evaluated in vectorized calls of the chunks (see run_sweep()).
+    Each chunk of the outputs is then reduced into streaming statistics
+    (see StreamingStatistics): per-channel moments and a histogram
+    from which the percentiles are estimated. Therefore the memory usage
+    is bounded by chunk_size (the samples and the intermediate quantities
+    of a chunk) and n_bins (len(outputs) * len(F) * n_bins counts),
+    and it does not grow with n_samples. Chunks evaluated in series
+    reuse the buffers of one Workspace for their intermediate quantities.
+
+    The samples are drawn in blocks of BLOCK_SIZE samples, each of which
+    has its own random generator derived from seed. Therefore the results
+    are reproducible regardless of the chunk size and the number of workers.
+
+    Parameters
+    ----------
+    distributions
+        Dictionary of parameter names and their distributions. A distribution
+        is either a tuple of the name of a method of numpy.random.Generator
+        and its arguments, e.g., ("normal", 0.32, 0.03) or ("uniform", 0.5, 0.7),
+        or a function of a generator and the shape of samples.
+        The arguments can be vectors of the same length as F.
+    n_samples
+        Number of samples.
+    outputs
+        Names of outputs to be calculated. See spectrometer_sensitivity().
+    percentiles
+        Percentiles to be calculated (between 0 and 100).
+    seed
+        Seed of the random generator. If None, a random seed is used.
+    n_workers
+        Number of worker processes. See run_sweep().
+    chunk_size
+        Number of samples in one chunk.
+    n_bins
+        Number of histogram bins per channel. The percentiles are accurate
+        to about 1 / n_bins of the range of the samples.
+    params
+        Other (fixed) parameters of spectrometer_sensitivity() (e.g., F).
+
+    Returns
+    -------
+    result
+        SensitivityResult whose outputs have the shape of (percentiles, F).
+        The mean and the standard deviation of each output over the samples
+        are also included as <name>_mean and <name>_std (shape of F).
+        They are NaN in the channels with any non-finite sample.
+
+    Example
+    --------
+        Percentiles of MDLF with uncertain efficiencies::
+
+            distributions = {
+                "eta_circuit": ("normal", 0.32, 0.03),
+                "eta_IBF": ("uniform", 0.4, 0.6),
+            }
+            result = propagate_uncertainty(distributions, n_samples=100000, F=F)
+            mdlf_median = result["MDLF"][2]
+
+    """
+    get_inputs(**params)  # check the names of parameters
+    params = resolve_params(params)
+
+    for name in distributions:
+        if name not in INPUTS or name == "F":
+            raise ValueError(f"{name} is not a valid parameter of distributions.")
+
+    if n_samples < 1 or chunk_size < 1 or n_bins < 2:
+        raise ValueError("n_samples, chunk_size and n_bins must be positive.")
+
+    F = np.atleast_1d(np.asarray(params.get("F", INPUTS["F"])))
+    entropy = np.random.SeedSequence(seed).entropy
+    chunks = [
+        (start, min(start + chunk_size, n_samples))
+        for start in range(0, n_samples, chunk_size)
+    ]
+
+    def columns(start, stop):
+        return draw_samples(distributions, entropy, start, stop)
+
+    # statistics of all outputs, to be updated as the chunks complete
+    statistics = {name: StreamingStatistics(F.shape, n_bins) for name in outputs}
+    workspace = Workspace(F, min(chunk_size, n_samples))
+    chunks = iter_chunks(columns, params, outputs, chunks, n_workers, workspace)
+
+    for _, _, chunk in chunks:
+        for name in outputs:
+            statistics[name].update(chunk[name])
+
+    percentiles = np.asarray(percentiles, dtype=float)
+    columns = {}
+
+    for name, stats in statistics.items():
+        columns[name] = stats.percentile(percentiles)
+        columns[f"{name}_mean"] = stats.mean
+        columns[f"{name}_std"] = stats.std
+
+    coords = {"percentile": percentiles, "F": F}
+    return SensitivityResult(columns, ("percentile", "F"), coords)
+
+
+# helper classes
+class StreamingStatistics:
+    """Per-channel statistics of samples which are given chunk by chunk.
+
+    The mean and the variance are merged chunk by chunk (Chan et al.),
+    and the percentiles are estimated from a histogram of n_bins bins
+    per channel. The bins are of width 2**exponent aligned to multiples
+    of the width, where the exponent is the smallest one for which
+    the range of the samples so far fits in the bins. When the range grows,
+    the counts are merged into the wider bins exactly. Therefore the final
+    histogram depends only on the samples, not on their order or chunks.
+
+    Parameters
+    ----------
+    shape
+        Shape of the samples of one channel axis (e.g., the shape of F).
+    n_bins
+        Number of bins per channel.
+
+    """
+
+    def __init__(self, shape: Tuple[int, ...], n_bins: int = N_BINS) -> None:
+        size = int(np.prod(shape))
+        self.shape = shape
+        self.n_bins = n_bins
+        self.count = np.zeros(size, dtype=np.int64)
+        self.average = np.zeros(size)
+        self.m2 = np.zeros(size)
+        self.invalid = np.zeros(size, dtype=bool)
+        self.minimum = np.full(size, np.inf)
+        self.maximum = np.full(size, -np.inf)
+        self.exponent = np.zeros(size, dtype=np.int64)
+        self.offset = np.zeros(size, dtype=np.int64)
+        self.counts = np.zeros((size, n_bins), dtype=np.int64)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Mean of the samples of each channel."""
+        return self.reshape(self.average)
+
+    @property
+    def std(self) -> np.ndarray:
+        """Standard deviation of the samples of each channel."""
+        return self.reshape(np.sqrt(self.m2 / np.maximum(self.count, 1)))
+
+    def update(self, samples: np.ndarray) -> None:
+        """Add samples with the shape of (n, *shape) to the statistics."""
+        samples = np.broadcast_to(samples, samples.shape[:1] + self.shape)
+        samples = samples.reshape(len(samples), -1)
+        finite = np.isfinite(samples)
+        self.invalid |= ~finite.all(0)
+
+        # moments of the chunk merged into the moments so far
+        count = finite.sum(0)
+        mean = np.where(finite, samples, 0.0).sum(0) / np.maximum(count, 1)
+        m2 = (np.where(finite, samples - mean, 0.0) ** 2).sum(0)
+        total = self.count + count
+        delta = mean - self.average
+        self.average += delta * count / np.maximum(total, 1)
+        self.m2 += m2 + delta ** 2 * self.count * count / np.maximum(total, 1)
+        self.count = total
+
+        # bins are widened (if necessary) before the samples are counted
+        self.minimum = np.minimum(
+            self.minimum, np.where(finite, samples, np.inf).min(0)
+        )
+        self.maximum = np.maximum(
+            self.maximum, np.where(finite, samples, -np.inf).max(0)
+        )
+        self.rebin(*self.lattice())
+
+        channel, sample = np.nonzero(finite.T)
+        index = self.bin_index(samples[sample, channel], channel)
+        self.counts += self.bincount(channel, index, 1.0)
+
+    def percentile(self, q: np.ndarray) -> np.ndarray:
+        """Estimate percentiles (shape of (len(q), *shape)) from the histogram."""
+        cumsum = self.counts.cumsum(1)
+        rank = np.asarray(q)[:, np.newaxis] / 100.0 * (self.count - 1)
+        bins = (cumsum > rank[..., np.newaxis]).argmax(2)
+        channels = np.arange(len(self.count))
+        counts = self.counts[channels, bins]
+        before = cumsum[channels, bins] - counts
+
+        # samples are assumed to be uniform within a bin
+        position = self.offset + bins + (rank - before + 0.5) / np.maximum(counts, 1)
+        values = np.clip(np.ldexp(position, self.exponent), self.minimum, self.maximum)
+        values[:, self.invalid | (self.count == 0)] = np.nan
+        return values.reshape((len(values),) + self.shape)
+
+    def lattice(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the exponent and the offset of the bins for the current range."""
+        valid = self.count > 0
+        lower = np.where(valid, self.minimum, 0.0)
+        upper = np.where(valid, self.maximum, 0.0)
+        spread = np.maximum(upper - lower, np.maximum(-lower, upper) * 2.0 ** -40)
+        spread = np.where(spread > 0, spread, 1.0)
+        exponent = np.ceil(np.log2(spread / self.n_bins)).astype(np.int64)
+
+        while True:
+            offset = np.floor(np.ldexp(lower, -exponent)).astype(np.int64)
+            last = np.floor(np.ldexp(upper, -exponent)).astype(np.int64)
+            fits = last - offset < self.n_bins
+
+            if fits.all():
+                return exponent, offset
+
+            exponent += ~fits
+
+    def rebin(self, exponent: np.ndarray, offset: np.ndarray) -> None:
+        """Merge the counts into bins of a (wider or equal) exponent and offset."""
+        if np.array_equal(exponent, self.exponent) and np.array_equal(
+            offset, self.offset
+        ):
+            return
+
+        shift = (exponent - self.exponent)[:, np.newaxis]
+        bins = self.offset[:, np.newaxis] + np.arange(self.n_bins)
+        index = np.clip((bins >> shift) - offset[:, np.newaxis], 0, self.n_bins - 1)
+        channel = np.broadcast_to(
+            np.arange(len(self.count))[:, np.newaxis], index.shape
+        )
+        counts = self.counts.ravel()
+        self.counts = self.bincount(channel.ravel(), index.ravel(), counts)
+        self.exponent, self.offset = exponent, offset
+
+    def bin_index(self, values: np.ndarray, channel: np.ndarray) -> np.ndarray:
+        """Return the indices of the bins of values of given channels."""
+        scaled = np.floor(np.ldexp(values, -self.exponent[channel]))
+        return scaled.astype(np.int64) - self.offset[channel]
+
+    def bincount(
+        self, channel: np.ndarray, index: np.ndarray, weights: Any
+    ) -> np.ndarray:
+        """Return counts of (channel, bin) pairs with the shape of the histogram."""
+        flat = channel * self.n_bins + index
+        weights = np.broadcast_to(weights, flat.shape)
+        counts = np.bincount(flat, weights, minlength=self.counts.size)
+        return counts.astype(np.int64).reshape(self.counts.shape)
+
+    def reshape(self, values: np.ndarray) -> np.ndarray:
+        """Return per-channel values in the shape, NaN if any sample is invalid."""
+        values = np.where(self.invalid | (self.count == 0), np.nan, values)
+        return values.reshape(self.shape)
+
+
+# helper functions
+def draw_samples(
+    distributions: Dict[str, Distribution], entropy: int, start: int, stop: int
+) -> Dict[str, np.ndarray]:
+    """Draw samples of a chunk from the random generators of their blocks.
+
+    Parameters
+    ----------
+    distributions
+        Dictionary of parameter names and their distributions.
+    entropy
+        Entropy of the seed sequence (see numpy.random.SeedSequence).
+    start
+        Index of the first sample of the chunk.
+    stop
+        Index of the last sample of the chunk plus one.
+
+    Returns
+    -------
+    columns
+        Dictionary of parameter names and samples with the shape of
+        (stop - start,) or (stop - start, F).
+
+    """
+    first, last = start // BLOCK_SIZE, (stop - 1) // BLOCK_SIZE + 1
+    blocks = {name: [] for name in distributions}
+
+    for block in range(first, last):
+        sequence = np.random.SeedSequence(entropy, spawn_key=(block,))
+        rng = np.random.default_rng(sequence)
+
+        for name, distribution in distributions.items():
+            blocks[name].append(draw(distribution, rng, BLOCK_SIZE))
+
+    index = slice(start - first * BLOCK_SIZE, stop - first * BLOCK_SIZE)
+    return {name: np.concatenate(blocks[name])[index] for name in distributions}
+
+
+def draw(distribution: Distribution, rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draw samples from a distribution along the first axis.
+
+    Parameters
+    ----------
+    distribution
+        Tuple of the name of a method of numpy.random.Generator
+        and its arguments, or a function of a generator and the shape.
+    rng
+        Random generator.
+    size
+        Number of samples.
+
+    Returns
+    -------
+    samples
+        Samples with the shape of (size,) or (size, F).
+
+    """
+    if callable(distribution):
+        return np.asarray(distribution(rng, (size,)))
+
+    method, *args = distribution
+    shape = np.broadcast(*args).shape if args else ()
+    return getattr(rng, method)(*args, size=(size,) + shape)
@@ -0,0 +1,156 @@
+import tracemalloc
+from math import isclose
+import numpy as np
+from deshima_sensitivity import atmosphere
+
+
+def test_atm_table():
+    table = atmosphere.atm_table()
+    assert table is atmosphere.atm_table()
+    assert table.eta.shape == (len(table.F), len(table.pwv))
+    assert isclose(table.F[0], 10.0)
+    assert isclose(table.pwv[-1], 2.0)
+
+
+def test_atm_table_sidecar(tmp_path):
+    path = tmp_path / "atm.csv"
+    path.write_text(atmosphere.ATM_CSV.read_text())
+    cache_dir = tmp_path / "cache"
+    table = atmosphere.AtmosphereTable(path, cache_dir=cache_dir)
+    expected = atmosphere.read_atm_csv(path)
+    assert np.array_equal(table.data, expected, equal_nan=True)
+    assert table.sidecar.parent == cache_dir and table.sidecar.exists()
+    assert not path.with_suffix(".npy").exists()
+    cached = atmosphere.AtmosphereTable(path, cache_dir=cache_dir)
+    assert isinstance(cached.data, np.memmap)
+
+    # the table is kept in memory if the cache directory is not writable
+    table = atmosphere.AtmosphereTable(path, cache_dir=path / "cache")
+    assert np.array_equal(table.data, expected, equal_nan=True)
+    assert not isinstance(table.data, np.memmap)
+
+
+def test_eta_atm_func():
+    expected = 0.99654  # value in the table at 10 GHz
+    output = atmosphere.eta_atm_func(10.0, 0.5, EL=90.0)
+    assert isclose(output[0], expected, rel_tol=1e-4)
+
+
+def test_channel_average():
+    F_highres = np.arange(100.0, 200.0, 0.1)
+    values = np.sin(F_highres)
+    F, R = np.array([120.0, 150.0, 180.0]), 100.0
+    expected = [
+        values[(F_highres > f * (1 - 0.5 / R)) & (F_highres < f * (1 + 0.5 / R))].mean()
+        for f in F
+    ]
+    output = atmosphere.channel_average(F_highres, values, F, R)
+    assert np.allclose(output, expected, rtol=0, atol=1e-12)
+
+
+def test_channel_average_opaque():
+    # near-opaque channels at pwv = 2 mm as in the original loop over channels
+    F, R, EL = np.logspace(np.log10(220), np.log10(440), 349), 500.0, 60.0
+    table = atmosphere.atm_table()
+    eta_zenith = np.abs(table.interp(2.0, table.F)[:, 0])
+    eta_highres = eta_zenith ** (1.0 / np.sin(EL * np.pi / 180.0))
+    in_channel = [
+        (table.F > f * (1 - 0.5 / R)) & (table.F < f * (1 + 0.5 / R)) for f in F
+    ]
+    expected = [eta_highres[where].mean() for where in in_channel]
+    output = atmosphere.eta_atm_func(F * 1e9, 2.0, EL, R=R)
+    assert np.min(expected) < 1e-20
+    assert np.allclose(output, expected, rtol=1e-12, atol=0)
+
+
+def test_eta_atm_func_broadcast():
+    F = np.linspace(220e9, 440e9, 11)
+    pwv, EL = np.array([0.5, 1.0]), np.array([30.0, 60.0, 90.0])
+    output = atmosphere.eta_atm_func(F, pwv, EL, R=500.0)
+    assert output.shape == (2, 3, 11)
+    expected = atmosphere.eta_atm_func(F, pwv[1], EL[0], R=500.0)
+    assert np.allclose(output[1, 0], expected)
+
+
+def test_eta_atm_broadcast_paired():
+    F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+    pwv = np.linspace(0.1, 2.0, 400)[:, np.newaxis]
+    EL = np.linspace(20.0, 90.0, 400)[:, np.newaxis]
+
+    # only the 400 pairs (not 400 x 400 combinations) are evaluated
+    tracemalloc.start()
+    output = atmosphere.eta_atm_broadcast(F, pwv, EL, R=500.0)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert output.shape == (400, 349)
+    assert peak < 100e6
+
+    for i in [0, 123, 399]:
+        expected = atmosphere.eta_atm_func(F, pwv[i, 0], EL[i, 0], R=500.0)
+        assert np.allclose(output[i], expected, rtol=1e-12, atol=0)
+
+
+def test_eta_atm_func_opacity():
+    F = np.linspace(220e9, 440e9, 101)
+    pwv, EL = np.linspace(0.1, 2.0, 5), np.array([30.0, 60.0, 90.0])
+    expected = atmosphere.eta_atm_func(F, pwv, EL, R=500.0)
+    output = atmosphere.eta_atm_func(F, pwv, EL, R=500.0, method="opacity")
+    assert np.allclose(output, expected, rtol=0, atol=0.025)
+
+
+def test_eta_atm_cached(tmp_path):
+    F = np.linspace(220e9, 440e9, 11)
+    pwv, EL = np.array([0.5, 1.0, 3.0]), np.array([30.0, 60.0])
+    expected = atmosphere.eta_atm_func(F, pwv, EL, R=500.0)
+    output = atmosphere.eta_atm_cached(F, pwv, EL, R=500.0, cache_dir=tmp_path)
+    assert np.allclose(output, expected, rtol=0, atol=1e-3)
+    assert atmosphere.eta_atm_lookup(F, 500.0) is atmosphere.eta_atm_lookup(F, 500.0)
+    assert len(list(tmp_path.glob("eta_atm_*.npz"))) == 1
+
+
+def test_eta_atm_lookup_nodes():
+    F = np.linspace(220e9, 440e9, 11)
+    lookup = atmosphere.EtaAtmLookup(F, 500.0)
+
+    # opaque channels (zero transmission) never give NaN at grid nodes
+    eta_atm = lookup.eta_atm.copy()
+    eta_atm[..., 0] = 0.0
+    opaque = atmosphere.EtaAtmLookup(F, 500.0, eta_atm=eta_atm)
+    pwv, EL = np.array([1.0, 1.5, 2.0]), np.array([90.0, 30.0])
+    output = opaque(pwv, EL)
+    assert np.all(np.isfinite(output))
+    assert np.allclose(output[..., 0], 0.0, rtol=0, atol=1e-300)
+    assert np.allclose(output[..., 1:], lookup(pwv, EL)[..., 1:])
+
+
+def test_eta_atm_lookup_out_of_grid():
+    F = np.linspace(220e9, 440e9, 11)
+    lookup = atmosphere.EtaAtmLookup(F, 500.0)
+    pwv, EL = np.array([0.5, 2.5, 3.0, 1.0]), np.array([60.0, 60.0, 10.0, 10.0])
+    output = lookup(pwv, EL, outer=False)
+    assert output.shape == (4, 11)
+
+    for i in range(4):
+        expected = atmosphere.eta_atm_func(F, pwv[i], EL[i], R=500.0)
+        assert np.allclose(output[i], expected, rtol=0, atol=1e-3)
+
+
+def test_channel_response():
+    F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+    response = atmosphere.channel_response(F, 500, "boxcar")
+    assert response is atmosphere.channel_response(F, 500, "boxcar")
+    assert response.matrix.shape == (349, len(response.F_highres))
+
+    # boxcar response is the same as the cumulative-sum average
+    expected = atmosphere.eta_atm_func(F, [0.5, 1.0], [30.0, 60.0], R=500)
+    assert np.allclose(response.eta_atm([0.5, 1.0], [30.0, 60.0]), expected)
+
+    # tabulated boxcar is the same as the boxcar
+    profile = atmosphere.TabulatedProfile([-0.5, -0.5, 0.5, 0.5], [0, 1, 1, 0])
+    assert profile == atmosphere.TabulatedProfile(profile.x, profile.y)
+    eta_atm = atmosphere.eta_atm_func(F, 0.5, 60.0, R=500, profile=profile)
+    assert np.allclose(eta_atm, expected[0, 1], atol=1e-3)
+
+    lorentzian = atmosphere.eta_atm_func(F, 0.5, 60.0, R=500, profile="lorentzian")
+    assert lorentzian.shape == (349,)
+    assert not np.allclose(lorentzian, expected[0, 1])
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from deshima_sensitivity import atmosphere, cache, simulator
+from deshima_sensitivity.chain import Stage
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_cache_memory():
+    store = cache.enable_cache()
+
+    try:
+        expected = simulator.spectrometer_sensitivity(F=F, pwv=0.7)
+        result = simulator.spectrometer_sensitivity(F=F, pwv=0.7)
+        assert (store.hits, store.misses) == (1, 1)
+        assert result.equals(expected)
+
+        # array contents are part of the key
+        simulator.spectrometer_sensitivity(F=F * 1.01, pwv=0.7)
+        assert (store.hits, store.misses) == (1, 2)
+    finally:
+        cache.disable_cache()
+
+
+def test_cache_disk(tmp_path):
+    grid = {"pwv": [0.5, 1.0]}
+    cache.enable_cache(tmp_path)
+
+    try:
+        expected = simulator.spectrometer_sensitivity(F=F, grid=grid)
+        store = cache.enable_cache(tmp_path)  # e.g., another session
+        result = simulator.spectrometer_sensitivity(F=F, grid=grid)
+        assert (store.hits, store.misses) == (1, 0)
+        assert result.equals(expected)
+    finally:
+        cache.disable_cache()
+
+
+def test_cache_eviction(tmp_path):
+    store = cache.ResultCache(tmp_path, max_memory=1, max_disk=1)
+    entry = {"MDLF": np.ones(1000)}, None, None
+
+    for key in ["a", "b", "c"]:
+        store.put(key, entry)
+
+    assert [file.stem for file in tmp_path.glob("*.npz")] == ["c"]
+    assert list(store.memory) == ["c"]
+    assert np.array_equal(store.get("c")[0]["MDLF"], entry[0]["MDLF"])
+    assert store.get("a") is None
+
+
+def test_digest_objects():
+    def f(x):
+        return np.ones_like(x)
+
+    def g(x):
+        return np.ones_like(x)
+
+    # functions cannot be digested by value (only by identity)
+    with pytest.raises(TypeError):
+        cache.digest({"profile": f})
+
+    assert cache.digest({"profile": f}, True) != cache.digest({"profile": g}, True)
+
+    # chains and tabulated profiles are digested by value
+    chain = [Stage("M1", np.full(349, 0.99), "psd_jn_amb")]
+    same = [Stage("M1", np.full(349, 0.99), "psd_jn_amb")]
+    assert cache.digest({"chain": chain}) == cache.digest({"chain": same})
+
+    profile = atmosphere.TabulatedProfile([-1.0, 0.0, 1.0], [0.0, 1.0, 0.0])
+    same = atmosphere.TabulatedProfile([-1.0, 0.0, 1.0], [0.0, 1.0, 0.0])
+    assert cache.digest({"profile": profile}) == cache.digest({"profile": same})
+
+    # calls with functions are not cached
+    store = cache.enable_cache()
+
+    try:
+        simulator.spectrometer_sensitivity(F=F, profile=f)
+        assert (store.hits, store.misses) == (0, 0)
+    finally:
+        cache.disable_cache()
@@ -0,0 +1,45 @@
+import numpy as np
+from deshima_sensitivity import simulator
+from deshima_sensitivity.chain import DESHIMA_CHAIN, OpticalChain, Stage
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_deshima_chain():
+    outputs = ["psd_sky", "psd_KID_sky", "eta_M1", "eta_M2_spill", "eta_Al_ohmic"]
+    outputs += ["eta_wo", "eta_inst", "psd_KID", "psd_KID_warm", "psd_KID_cold"]
+    result = simulator.spectrometer_sensitivity(F=F, outputs=outputs)
+
+    # original breakdown: the M2 spillover is mixed before the M2 ohmic loss
+    eta_sky = result["eta_M1"] * result["eta_M2_spill"] + 1 - result["eta_M2_spill"]
+    expected = (
+        result["psd_sky"]
+        * eta_sky
+        * result["eta_Al_ohmic"]
+        * result["eta_wo"]
+        * result["eta_inst"]
+    )
+    assert np.allclose(result["psd_KID_sky"], expected, rtol=1e-12, atol=0)
+
+    # the breakdown in the order of the chain sums to the total
+    chain = OpticalChain(DESHIMA_CHAIN, order=[stage.name for stage in DESHIMA_CHAIN])
+    func, args = chain.quantities["psd_KID_loadings"]
+    values = simulator.evaluate(simulator.get_inputs(F=F), args)
+    total = sum(func(*[values[name] for name in args]).values())
+    assert np.allclose(total, result["psd_KID"], rtol=1e-12, atol=0)
+
+
+def test_custom_chain():
+    # same chain as DESHIMA_CHAIN, but the window is given by values
+    refl = 1.0 - ((1 - 1.52) / (1 + 1.52)) ** 2
+    chain = list(DESHIMA_CHAIN)
+    chain[5] = Stage("window_refl_in", refl, 4.0, "cold")
+    chain[7] = Stage("window", refl, 4.0, "cold")
+    chain.insert(5, Stage("dummy", 1.0, 300.0))
+
+    expected = simulator.spectrometer_sensitivity(F=F, window_AR=False)
+    output = simulator.spectrometer_sensitivity(F=F, window_AR=False, chain=chain)
+    assert np.allclose(output["psd_KID"], expected["psd_KID"])
+    assert np.allclose(output["Pkid_cold"], expected["Pkid_cold"])
+    assert np.allclose(output["MDLF"], expected["MDLF"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from deshima_sensitivity import atmosphere, channels, optics, simulator
+
+
+def test_channel_grid():
+    grid = channels.ChannelGrid.logspace(220e9, 440e9, R=500)
+    assert len(grid) == 348
+    assert np.array_equal(np.asarray(grid), grid.F)
+    assert grid.D2HPBW() is grid.D2HPBW()
+
+    expected = simulator.spectrometer_sensitivity(F=grid.F, R=500, pwv=0.7)
+    result = simulator.spectrometer_sensitivity(F=grid, pwv=0.7)
+    assert np.allclose(result["MDLF"], expected["MDLF"])
+    assert len(grid.memo) > 1
+
+    # memoized quantities are reused by the next call
+    memo = dict(grid.memo)
+    result = simulator.spectrometer_sensitivity(F=grid, pwv=1.0, R=500)
+    assert all(grid.memo[key] is value for key, value in memo.items())
+
+    # 0-d arrays are memoized by value
+    expected = simulator.spectrometer_sensitivity(F=grid.F, R=500, eta_IBF=0.4)
+    result = simulator.spectrometer_sensitivity(F=grid, eta_IBF=np.array(0.4))
+    assert np.allclose(result["MDLF"], expected["MDLF"])
+
+    with pytest.raises(ValueError):
+        simulator.spectrometer_sensitivity(F=grid, R=300)
+
+
+def test_channel_grid_atmosphere():
+    grid = channels.ChannelGrid.logspace(220e9, 440e9, R=500)
+    expected = atmosphere.eta_atm_func(grid.F, 0.7, 60.0, R=500)
+    assert np.allclose(atmosphere.eta_atm_func(grid, 0.7, 60.0), expected)
+    assert atmosphere.eta_atm_lookup(grid) is atmosphere.eta_atm_lookup(grid.F, 500)
+
+
+def test_channel_grid_entry_points():
+    grid = channels.ChannelGrid.logspace(220e9, 440e9, R=1000)
+
+    # R of the grid is used unless R is given explicitly
+    inputs = simulator.get_inputs(F=grid)
+    assert np.array_equal(inputs["F"], grid.F) and inputs["R"] == 1000
+
+    with pytest.raises(ValueError):
+        simulator.spectrometer_sensitivity(F=grid, R=500.0)
+
+    with pytest.raises(ValueError):
+        simulator.get_inputs(F=grid, R=500.0)
+
+    expected = optics.linear_response(F=grid.F, R=1000, pwv=0.7)
+    response = optics.linear_response(F=grid, pwv=0.7)
+    assert np.allclose(response.psd_KID(), expected.psd_KID())
+
+    expected = simulator.InstrumentModel(F=grid.F, R=1000)(0.7)
+    result = simulator.InstrumentModel(F=grid)(0.7)
+    assert np.array_equal(result["MDLF"], expected["MDLF"], equal_nan=True)
@@ -0,0 +1,65 @@
+import pickle
+import numpy as np
+from deshima_sensitivity import config, simulator, sweep
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_hash_by_value():
+    telescope = config.Telescope(eta_mb=np.full(349, 0.6))
+    same = config.Telescope(eta_mb=np.full(349, 0.6))
+    assert telescope == same and hash(telescope) == hash(same)
+    assert telescope != config.Telescope(eta_mb=np.full(349, 0.5))
+    assert {telescope: 1}[same] == 1
+    assert pickle.loads(pickle.dumps(telescope)) == telescope
+
+    derived = telescope.derived
+    assert np.isclose(derived["Ag"], np.pi * 5.0 ** 2)
+    assert telescope.derived == derived
+
+
+def test_to_params():
+    detector = config.Detector(eta_circuit=0.16)
+    observation = config.Observation(pwv=1.0)
+    params = config.to_params(detector, observation, F=F)
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=1.0, eta_circuit=0.16)
+    result = simulator.spectrometer_sensitivity(**params)
+    assert np.allclose(result["MDLF"], expected["MDLF"])
+
+    result = sweep.evaluate_configs([detector, (config.Detector(), observation)], F=F)
+    assert np.allclose(
+        result["MDLF"][0],
+        simulator.spectrometer_sensitivity(F=F, eta_circuit=0.16)["MDLF"],
+    )
+
+
+def test_to_inputs():
+    telescope = config.Telescope(telescope_diameter=12.0)
+    detector = config.Detector(eta_pol=1.0)
+    inputs = config.to_inputs(telescope, detector, F=F)
+    assert inputs["Ag"] is telescope.derived["Ag"]
+
+    values = simulator.evaluate(inputs, ["MDLF"])
+    expected = simulator.spectrometer_sensitivity(
+        F=F, telescope_diameter=12.0, eta_pol=1.0
+    )
+    assert np.allclose(values["MDLF"], expected["MDLF"])
+
+    # derived quantities of overridden fields are calculated again
+    inputs = config.to_inputs(telescope, telescope_diameter=10.0)
+    assert "Ag" not in inputs and "omega_mb" in inputs
+
+
+def test_evaluate_configs_derived():
+    telescopes = [config.Telescope(telescope_diameter=d) for d in [10.0, 50.0]]
+    columns = sweep.make_configs(None, telescopes, {"F": F})[0]
+    assert np.allclose(columns["Ag"], [t.derived["Ag"] for t in telescopes])
+
+    result = sweep.evaluate_configs(telescopes, F=F)
+    expected = simulator.spectrometer_sensitivity(F=F, telescope_diameter=50.0)
+    assert np.allclose(result["MDLF"][1], expected["MDLF"])
+
+    # derived quantities are not given if a configuration is a dictionary
+    columns = sweep.make_configs(None, telescopes + [{"eta_mb": 0.5}], {"F": F})[0]
+    assert "Ag" not in columns
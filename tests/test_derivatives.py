@@ -0,0 +1,22 @@
+import numpy as np
+from deshima_sensitivity import derivatives, simulator
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_log_derivatives():
+    result = derivatives.log_derivatives("MDLF", F=F, pwv=0.7)
+    assert "F" not in result and "window_AR" not in result
+    assert np.allclose(result["obs_hours"], -0.5)
+    assert np.allclose(result["snr"], 1.0)
+
+    # compare with finite differences
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=0.7)
+    eps = 1e-6
+
+    for name, value in [("eta_circuit", 0.32), ("Tp_cabin", 290.0), ("pwv", 0.7)]:
+        params = {"F": F, "pwv": 0.7, name: value * (1 + eps)}
+        output = simulator.spectrometer_sensitivity(**params)
+        diff = np.log(output["MDLF"] / expected["MDLF"]) / np.log1p(eps)
+        assert np.allclose(result[name], diff, atol=1e-3)
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from deshima_sensitivity import atmosphere, filterbank, simulator
+
+
+# constants
+DATA = Path(__file__).parents[1] / "data" / "plot_data_recal.csv"
+
+
+def test_read_filterbank():
+    fb = filterbank.read_filterbank(DATA)
+    assert len(fb.F) == 49
+    assert np.all((fb.F > 300e9) & (fb.F < 400e9))
+    assert np.array_equal(fb.R, fb.Q)
+    assert fb.kid_id.dtype.kind == "i"
+
+
+def test_read_filterbank_columns(tmp_path):
+    lines = DATA.read_text().splitlines()
+    path = tmp_path / "filterbank.csv"
+    path.write_text(
+        "\n".join([lines[0] + ",comment"] + [line + ",0" for line in lines[1:]])
+    )
+    fb = filterbank.read_filterbank(path)
+    assert np.array_equal(fb.NEP, filterbank.read_filterbank(DATA).NEP)
+
+    path.write_text("\n".join(line.rsplit(",", 2)[0] for line in lines))
+
+    with pytest.raises(ValueError, match="NEP, NEPerr"):
+        filterbank.read_filterbank(path)
+
+
+def test_filterbank_evaluate():
+    fb = filterbank.read_filterbank(DATA)
+    result = fb.evaluate(["MDLF", "eta_atm", "NEPkid"], pwv=0.7)
+    assert result.dims == ("KIDID",)
+    assert np.array_equal(result.coords["KIDID"], fb.kid_id)
+
+    # each channel is averaged over its own bandwidth
+    expected = atmosphere.eta_atm_func(fb.F, 0.7, 60.0, R=fb.R)
+    assert np.allclose(result["eta_atm"], expected)
+
+    expected = simulator.spectrometer_sensitivity(**fb.params(pwv=0.7))
+    assert np.allclose(result["MDLF"], expected["MDLF"])
+    assert fb.params(eta_circuit=0.32)["eta_circuit"] == 0.32
+
+    result = fb.evaluate(["NEPkid"], measured_nep=True)
+    assert np.array_equal(result["NEPkid"], fb.NEP)
+
+    with pytest.raises(ValueError):
+        fb.evaluate(R=500)
@@ -0,0 +1,52 @@
+import numpy as np
+from deshima_sensitivity import inverse, simulator
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_required_obs_hours():
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=0.7, obs_hours=3.0)
+    output = inverse.required_obs_hours(expected["MDLF"].values, pwv=0.7, F=F)
+    assert np.allclose(output, 3.0, rtol=3e-3)
+
+
+def test_required_obs_hours_off_grid():
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=2.5, EL=15.0, obs_hours=3.0)
+    transparent = expected["eta_atm"].values > 1e-6
+    output = inverse.required_obs_hours(expected["MDLF"].values, 2.5, 15.0, F=F)
+    assert np.allclose(output[transparent], 3.0, rtol=1e-6)
+
+
+def test_max_pwv_min_EL():
+    model = simulator.InstrumentModel(F=F)
+    MDLF = model.channelwise(1.2, 45.0)["MDLF"]
+
+    pwv = inverse.max_pwv(MDLF, EL=45.0, model=model)
+    assert np.allclose(model.channelwise(pwv, 45.0)["MDLF"], MDLF, rtol=1e-4)
+
+    EL = inverse.min_EL(MDLF, pwv=1.2, model=model)
+    assert np.allclose(model.channelwise(1.2, EL)["MDLF"], MDLF, rtol=1e-4)
+
+    # conditions out of the grid of the lookup table
+    MDLF = model.channelwise(2.5, 45.0)["MDLF"]
+    transparent = MDLF < 1e-17
+    EL = inverse.min_EL(MDLF, pwv=2.5, model=model)
+    assert np.allclose(EL[transparent], 45.0, rtol=0, atol=1e-2)
+    MDLF = model.channelwise(1.2, 15.0)["MDLF"]
+    pwv = inverse.max_pwv(MDLF, EL=15.0, model=model)
+    assert np.allclose(pwv[transparent], 1.2, rtol=0, atol=1e-3)
+
+    # multiple targets
+    pwv = inverse.max_pwv(np.array([[1e-30], [1.0]]), model=model)
+    assert pwv.shape == (2, 349)
+    detectable = model.channelwise(2.0)["MDLF"] <= 1.0
+    assert np.all(np.isnan(pwv[0]))
+    assert np.all(np.isinf(pwv[1][detectable])) and np.all(pwv[1][~detectable] < 2.0)
+
+    # solutions beyond the grid of the lookup table
+    MDLF = model.channelwise(1.2, 15.0)["MDLF"]
+    EL = inverse.min_EL(MDLF, pwv=1.2, model=model)
+    assert np.allclose(EL[MDLF < 1e-17], 15.0, rtol=0, atol=1e-2)
+    EL = inverse.min_EL(1.0, pwv=1.2, model=model)
+    assert np.all(np.isneginf(EL[model.channelwise(1.2, 1.0)["MDLF"] <= 1.0]))
@@ -0,0 +1,34 @@
+import numpy as np
+from deshima_sensitivity import optics, simulator
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_linear_response():
+    response = optics.linear_response(F=F, pwv=1.0)
+    Tp_cabin = np.array([280.0, 290.0, 300.0])[:, np.newaxis]
+    output = response.psd_KID(Tp_cabin=Tp_cabin)
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=1.0, Tp_cabin=300.0)
+    assert output.shape == (3, 349)
+    assert np.allclose(output[2], expected["psd_KID"])
+
+    loading = response.loading()
+    total = loading["sky"] + loading["warm"] + loading["cold"]
+    assert np.allclose(total, response.psd_KID(), rtol=1e-3)
+
+
+def test_linear_response_loading():
+    response = optics.linear_response(F=F, pwv=1.0)
+    loading = response.loading(Tp_cabin=290.0)
+    inputs = simulator.get_inputs(F=F, pwv=1.0, Tp_cabin=290.0)
+    names = ["psd_KID_sky", "psd_KID_warm", "psd_KID_cold"]
+    expected = simulator.evaluate(inputs, names)
+
+    for name in ["sky", "warm", "cold"]:
+        assert np.allclose(loading[name], expected[f"psd_KID_{name}"], rtol=1e-12)
+
+    # sources grouped by LOADINGS add up to psd_KID exactly
+    grouped = optics.LinearResponse(F, response.coeffs, response.temperatures)
+    total = sum(grouped.loading().values())
+    assert np.allclose(total, response.psd_KID(), rtol=1e-12)
@@ -0,0 +1,62 @@
+import numpy as np
+from deshima_sensitivity import optimize, simulator
+
+
+def test_pareto_front():
+    objectives = [[1.0, 4.0], [2.0, 2.0], [3.0, 3.0], [4.0, 1.0], [2.0, 2.0]]
+    pareto = optimize.pareto_front(objectives)
+    assert list(pareto) == [True, True, False, True, False]
+
+    pareto = optimize.pareto_front(objectives, maximize=[True, False])
+    assert list(pareto) == [False, False, False, True, False]
+
+
+def test_design_optimizer():
+    optimizer = optimize.DesignOptimizer(band=(220e9, 440e9), pwv=[0.5, 1.0])
+    result = optimizer.search(R=[300, 500], eta_IBF=[0.4, 0.5], n_channels=[100, 200])
+    assert result["MS_sum"].shape == (8,)
+    assert np.any(result["pareto"])
+
+    F = np.logspace(np.log10(220e9), np.log10(440e9), 100)
+    MS = [
+        simulator.spectrometer_sensitivity(F=F, pwv=pwv, R=500, eta_IBF=0.4)["MS"]
+        for pwv in [0.5, 1.0]
+    ]
+    index = 4  # R=500, eta_IBF=0.4, n_channels=100
+    assert np.isclose(result["MS_sum"][index], np.mean(np.sum(MS, axis=-1)))
+
+    # buffers of the workspace (pwv x batch, max channels) are reused
+    assert optimizer.workspace.shape == (2 * 8, 200)
+    assert {"F", "eta_atm", "psd_KID", "MDLF"} <= set(optimizer.workspace.buffers)
+    buffer = optimizer.workspace.buffer("MDLF")
+    objectives = optimizer.evaluate(R=500, eta_IBF=0.4, n_channels=100)
+    assert np.isclose(objectives["MS_sum"][0], result["MS_sum"][index])
+    assert np.shares_memory(optimizer.workspace.buffer("MDLF"), buffer)
+
+
+def test_design_optimizer_profile():
+    kwargs = dict(R=[300, 500], n_channels=[100])
+    boxcar = optimize.DesignOptimizer(pwv=[0.5, 1.0]).search(**kwargs)
+    optimizer = optimize.DesignOptimizer(pwv=[0.5, 1.0], profile="lorentzian")
+    result = optimizer.search(**kwargs)
+    assert not np.allclose(result["MS_sum"], boxcar["MS_sum"])
+
+    F = np.logspace(np.log10(220e9), np.log10(440e9), 100)
+    MS = [
+        simulator.spectrometer_sensitivity(
+            F=F, pwv=pwv, R=500, eta_IBF=0.5, profile="lorentzian"
+        )["MS"]
+        for pwv in [0.5, 1.0]
+    ]
+    assert np.isclose(result["MS_sum"][1], np.mean(np.sum(MS, axis=-1)))
+
+
+def test_design_optimizer_opaque():
+    # near-opaque channels at high PWV give finite objectives without warnings
+    optimizer = optimize.DesignOptimizer(pwv=[1.5, 2.0])
+
+    with np.errstate(divide="raise", invalid="raise"):
+        result = optimizer.search(R=[300, 500], n_channels=[100, 200])
+
+    assert np.all(np.isfinite(result["MS_sum"]))
+    assert np.all(np.isfinite(result["MDLF_median"]))
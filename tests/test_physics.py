@@ -1,5 +1,6 @@
 from math import isclose
-from deshima_sensitivity import physics
+import numpy as np
+from deshima_sensitivity import instruments, physics
 
 
 def test_johnson_nyquist_psd():
@@ -24,3 +25,24 @@ def test_rad_trans():
     expected = 1.2
     output = physics.rad_trans(2.0, 1.0, 0.2)
     assert isclose(expected, output)
+
+
+def test_out():
+    F = np.linspace(1e11, 4e11, 5)
+    T = np.array([[3.0], [30.0], [300.0]])
+    out = np.empty((3, 5))
+
+    psd = physics.johnson_nyquist_psd(F, T)
+    assert physics.johnson_nyquist_psd(F, T, out=out) is out
+    assert np.allclose(out, psd)
+
+    for method in ["Planck", "Rayleigh-Jeans"]:
+        physics.T_from_psd(F, psd, method, out=out)
+        assert np.allclose(out, physics.T_from_psd(F, psd, method))
+
+    physics.rad_trans(psd, psd[::-1], 0.3, out=out)
+    assert np.allclose(out, physics.rad_trans(psd, psd[::-1], 0.3))
+
+    Pkid = psd * 1e9
+    instruments.photon_NEP_kid(F, Pkid, 1e9, out=out)
+    assert np.allclose(out, instruments.photon_NEP_kid(F, Pkid, 1e9))
@@ -0,0 +1,100 @@
+import numpy as np
+from deshima_sensitivity import simulator
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_spectrometer_sensitivity_result():
+    df = simulator.spectrometer_sensitivity(F=F)
+    result = simulator.spectrometer_sensitivity(F=F, as_dataframe=False)
+    assert list(result) == list(df.columns)
+    assert result["snr"] == 5.0
+    assert np.allclose(result["MDLF"], df["MDLF"])
+    assert result.to_dataframe().equals(df)
+
+
+def test_spectrometer_sensitivity_outputs():
+    df = simulator.spectrometer_sensitivity(F=F)
+    output = simulator.spectrometer_sensitivity(F=F, outputs=["MDLF", "MS"])
+    assert list(output.columns) == ["MDLF", "MS"]
+    assert output.equals(df[["MDLF", "MS"]])
+
+
+def test_spectrometer_sensitivity_grid():
+    pwv, EL, eta_circuit = [0.5, 1.0], [30.0, 60.0, 90.0], [0.16, 0.32]
+    grid = {"pwv": pwv, "EL": EL, "eta_circuit": eta_circuit}
+    result = simulator.spectrometer_sensitivity(
+        F=F, grid=grid, outputs=["MDLF", "MS"], as_dataframe=False
+    )
+    assert result.dims == ("pwv", "EL", "eta_circuit", "F")
+    assert result.broadcast("MDLF").shape == (2, 3, 2, 349)
+    expected = simulator.spectrometer_sensitivity(
+        F=F, pwv=pwv[1], EL=EL[0], eta_circuit=eta_circuit[1]
+    )
+    assert np.allclose(result["MDLF"][1, 0, 1], expected["MDLF"])
+    assert np.allclose(result["MS"][1, 0, 1], expected["MS"])
+
+
+def test_spectrometer_sensitivity_workspace():
+    outputs = ["MDLF", "NEPinst", "Tb_sky", "psd_KID"]
+    workspace = simulator.Workspace(F, 2)
+    result = simulator.spectrometer_sensitivity(
+        F=F, grid={"pwv": [0.5, 1.0]}, outputs=outputs, as_dataframe=False
+    )
+
+    for _ in range(2):
+        buffered = simulator.spectrometer_sensitivity(
+            F=F,
+            grid={"pwv": [0.5, 1.0]},
+            outputs=outputs,
+            as_dataframe=False,
+            workspace=workspace,
+        )
+
+        for name in outputs:
+            assert np.allclose(buffered[name], result[name], rtol=1e-12, atol=0)
+            assert np.shares_memory(buffered[name], workspace.buffers[name])
+
+
+def test_instrument_model():
+    pwv, EL = np.array([0.3, 0.7, 1.5]), np.array([30.0, 60.0, 80.0])
+    model = simulator.InstrumentModel(F=F)
+    result = model(pwv, EL, outputs=["MDLF", "eta_inst"])
+    assert result.dims == ("sample", "F")
+    assert result["MDLF"].shape == (3, 349)
+    assert result["eta_inst"].shape == (349,)
+
+    for i in range(3):
+        expected = simulator.spectrometer_sensitivity(F=F, pwv=pwv[i], EL=EL[i])
+        # the lookup is accurate in absolute (not relative) transmission
+        transparent = expected["eta_atm"] > 1e-6
+        assert np.allclose(result["eta_inst"], expected["eta_inst"])
+        assert np.allclose(
+            result["MDLF"][i][transparent], expected["MDLF"][transparent], rtol=1e-3
+        )
+        assert np.all(np.isfinite(result["MDLF"][i]))
+
+    # buffers of the workspace are reused by the next call
+    buffer = model.workspace.buffer("NEPkid")
+    assert np.array_equal(model(pwv, EL, ["MDLF"])["MDLF"], result["MDLF"])
+    assert np.shares_memory(model.workspace.buffer("NEPkid"), buffer)
+
+
+def test_instrument_model_off_grid():
+    # samples at the nodes and out of the grid of the lookup table
+    pwv = np.array([1.0, 1.5, 2.0, 2.5, 3.0])
+    EL = np.array([90.0, 90.0, 90.0, 60.0, 15.0])
+    model = simulator.InstrumentModel(F=F)
+    result = model(pwv, EL, outputs=["MDLF", "MS"])
+    assert np.all(np.isfinite(result["MDLF"])) and np.all(np.isfinite(result["MS"]))
+
+    for i in range(5):
+        expected = simulator.spectrometer_sensitivity(F=F, pwv=pwv[i], EL=EL[i])
+        transparent = expected["eta_atm"] > 1e-6
+        assert np.allclose(
+            result["MDLF"][i][transparent], expected["MDLF"][transparent], rtol=1e-3
+        )
+        assert np.allclose(
+            result["MS"][i][transparent], expected["MS"][transparent], rtol=1e-3
+        )
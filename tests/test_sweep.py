@@ -0,0 +1,166 @@
+import errno
+import json
+import os
+import socket
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from deshima_sensitivity import simulator, sweep
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_run_sweep():
+    grid = {"pwv": [0.5, 1.0, 1.5], "EL": [30.0, 60.0]}
+    result = sweep.run_sweep(grid, F=F, outputs=["MDLF"], n_workers=2, chunk_size=2)
+    assert result.dims == ("pwv", "EL", "F")
+    assert result["MDLF"].shape == (3, 2, 349)
+    expected = simulator.spectrometer_sensitivity(F=F, pwv=1.5, EL=30.0)
+    assert np.allclose(result["MDLF"][2, 0], expected["MDLF"])
+
+
+def test_run_sweep_configs():
+    configs = [{"eta_circuit": 0.16, "eta_IBF": 0.4}, {"pwv": 1.0}]
+    result = sweep.run_sweep(configs=configs, F=F, n_workers=1)
+    assert result.dims == ("config", "F")
+    expected = simulator.spectrometer_sensitivity(F=F, eta_circuit=0.16, eta_IBF=0.4)
+    assert np.allclose(result["MDLF"][0], expected["MDLF"])
+
+
+def test_run_sweep_many_configs():
+    eta_circuit = np.linspace(0.1, 0.4, 40)
+    configs = [{"eta_circuit": value} for value in eta_circuit]
+    configs[-1]["eta_IBF"] = np.full(349, 0.4)
+    result = sweep.run_sweep(configs=configs, F=F, n_workers=1)
+    assert result["MDLF"].shape == (40, 349)
+    expected = simulator.spectrometer_sensitivity(
+        F=F, eta_circuit=eta_circuit[-1], eta_IBF=0.4
+    )
+    assert np.allclose(result["MDLF"][-1], expected["MDLF"])
+    result = sweep.evaluate_configs(configs, F=F)
+    assert np.allclose(result["MDLF"][-1], expected["MDLF"])
+
+
+def test_run_sweep_store(tmp_path):
+    grid = {"pwv": [0.5, 1.0, 1.5], "EL": [30.0, 60.0]}
+    expected = sweep.run_sweep(grid, F=F, outputs=["MDLF", "MS"], n_workers=1)
+    result = sweep.run_sweep(
+        grid, F=F, outputs=["MDLF", "MS"], n_workers=1, chunk_size=4, store=tmp_path
+    )
+    assert np.array_equal(result["MDLF"], expected["MDLF"])
+    column = sweep.SweepStore(tmp_path).column("MS")
+    assert isinstance(column, np.memmap)
+    assert np.array_equal(column, expected["MS"].reshape(6, 349))
+
+
+def test_run_sweep_resume(tmp_path):
+    grid = {"pwv": [0.5, 1.0, 1.5], "EL": [30.0, 60.0]}
+    kwargs = dict(F=F, n_workers=1, chunk_size=2, store=tmp_path, resume=True)
+    expected = sweep.run_sweep(grid, F=F, n_workers=1)
+    assert sweep.run_sweep(grid, shard=(0, 2), **kwargs) is None
+    assert sweep.SweepStore(tmp_path).completed() == {0, 2}
+    result = sweep.run_sweep(grid, shard=(1, 2), **kwargs)
+    assert np.array_equal(result["MDLF"], expected["MDLF"])
+
+    (tmp_path / "chunks" / "1.npz").unlink()
+    result = sweep.run_sweep(grid, **kwargs)
+    assert np.array_equal(result["MDLF"], expected["MDLF"])
+
+
+def test_run_sweep_consolidate_once(tmp_path):
+    grid = {"pwv": [0.5, 1.0, 1.5], "EL": [30.0, 60.0]}
+    kwargs = dict(F=F, n_workers=1, chunk_size=2, store=tmp_path, resume=True)
+    assert sweep.run_sweep(grid, shard=(0, 2), **kwargs) is None
+
+    # another shard is consolidating the store
+    (tmp_path / sweep.CONSOLIDATING).touch()
+
+    with pytest.warns(UserWarning):
+        assert sweep.run_sweep(grid, shard=(1, 2), **kwargs) is None
+
+    assert not (tmp_path / "MDLF.npy").exists()
+
+    (tmp_path / sweep.CONSOLIDATING).unlink()
+    assert sweep.run_sweep(grid, shard=(1, 2), **kwargs) is not None
+    assert sweep.SweepStore(tmp_path).consolidate()
+    assert not list(tmp_path.glob("**/*.tmp"))
+
+
+def test_sweep_store_claim(tmp_path, monkeypatch):
+    def link(src, dst):
+        raise OSError(errno.EPERM, "hard links are not supported")
+
+    # the claim is written in place without hard links
+    monkeypatch.setattr(os, "link", link)
+    store, other = sweep.SweepStore(tmp_path), sweep.SweepStore(tmp_path)
+    assert store._claim() and not other._claim()
+    owner = store.claim()
+    assert owner["token"] == store.token and owner["pid"] == os.getpid()
+
+    # only the same owner (of the same refresh if given) removes the claim
+    assert not other._unclaim({"token": other.token})
+    assert not other._unclaim(dict(owner, time=owner["time"] - 1.0))
+    assert store.claim() == owner
+    assert store._unclaim({"token": store.token})
+    assert store.claim() is None
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_evaluate_configs():
+    configs = pd.DataFrame(
+        {"eta_circuit": [0.32, 0.16], "eta_mb": [np.full(349, 0.6), 0.5 * F / F]},
+        index=["goal", "baseline"],
+    )
+    result = sweep.evaluate_configs(configs, ["MDLF", "MS"], F=F, pwv=0.7)
+    assert result.dims == ("config", "F")
+    assert list(result.coords["config"]) == ["goal", "baseline"]
+    assert result["MS"].shape == (2, 349)
+    expected = simulator.spectrometer_sensitivity(
+        F=F, pwv=0.7, eta_circuit=0.16, eta_mb=0.5
+    )
+    assert np.allclose(result["MDLF"][1], expected["MDLF"])
+
+
+def test_evaluate_configs_profile():
+    configs = [{"eta_circuit": 0.32}, {"eta_circuit": 0.16}]
+    result = sweep.evaluate_configs(configs, F=F, profile="lorentzian")
+    expected = simulator.spectrometer_sensitivity(
+        F=F, eta_circuit=0.16, profile="lorentzian"
+    )
+    assert np.allclose(result["MDLF"][1], expected["MDLF"])
+
+    with pytest.raises(ValueError):
+        sweep.evaluate_configs([{"profile": "boxcar"}, {"profile": "lorentzian"}])
+
+
+def test_run_sweep_stale_claim(tmp_path):
+    grid = {"pwv": [0.5, 1.0, 1.5], "EL": [30.0, 60.0]}
+    kwargs = dict(F=F, n_workers=1, chunk_size=2, store=tmp_path, resume=True)
+    expected = sweep.run_sweep(grid, F=F, n_workers=1)
+    assert sweep.run_sweep(grid, shard=(0, 2), **kwargs) is None
+
+    # the owner of the claim on another host has not refreshed it
+    path = tmp_path / sweep.CONSOLIDATING
+    path.write_text(json.dumps({"host": "other", "pid": 1, "token": "other"}))
+    store = sweep.SweepStore(tmp_path)
+    assert not store.is_stale(store.claim())
+    os.utime(path, (time.time() - 2 * sweep.CLAIM_TIMEOUT,) * 2)
+    assert store.is_stale(store.claim())
+
+    # the owner of the claim was killed during the consolidation
+    owner = {"host": socket.gethostname(), "pid": 2 ** 22 + 1, "token": "killed"}
+    path.write_text(json.dumps(owner))
+    assert store.is_stale(store.claim())
+    result = sweep.run_sweep(grid, shard=(1, 2), **kwargs)
+    assert np.array_equal(result["MDLF"], expected["MDLF"])
+    assert store.claim()["pid"] == os.getpid()
+    assert time.time() - store.claim()["time"] < sweep.CLAIM_TIMEOUT
+
+    # chunks removed after the marker are not evaluated again
+    assert store.consolidate(remove_chunks=True)
+    assert store.completed() == {0, 1, 2}
+    result = sweep.run_sweep(grid, **kwargs)
+    assert not list((tmp_path / "chunks").glob("*.npz"))
+    assert np.array_equal(result["MDLF"], expected["MDLF"])
@@ -0,0 +1,56 @@
+import numpy as np
+from deshima_sensitivity import simulator, uncertainty
+
+
+F = np.logspace(np.log10(220), np.log10(440), 349) * 1e9
+
+
+def test_propagate_uncertainty():
+    distributions = {
+        "eta_circuit": ("normal", 0.32, 0.01),
+        "eta_co": ("uniform", np.full(349, 0.6), 0.7),
+    }
+    result = uncertainty.propagate_uncertainty(
+        distributions, n_samples=1000, F=F, chunk_size=300
+    )
+    assert result.dims == ("percentile", "F")
+    assert result["MDLF"].shape == (5, 349)
+    assert np.all(np.diff(result["MDLF"], axis=0) >= 0)
+
+    # reproducible regardless of the chunk size and the number of workers
+    expected = uncertainty.propagate_uncertainty(
+        distributions, n_samples=1000, F=F, n_workers=2, chunk_size=500
+    )
+    assert np.allclose(result["MDLF"], expected["MDLF"])
+
+    # no uncertainty
+    result = uncertainty.propagate_uncertainty(
+        {"eta_circuit": ("uniform", 0.32, 0.32)}, n_samples=10, F=F
+    )
+    expected = simulator.spectrometer_sensitivity(F=F)
+    assert np.allclose(result["MS"][2], expected["MS"])
+
+
+def test_streaming_statistics():
+    rng = np.random.default_rng(1)
+    samples = np.stack([rng.normal(1.0, 0.1, 5000), rng.lognormal(0, 1, 5000)], 1)
+    q = np.array([0.0, 2.5, 50.0, 97.5, 100.0])
+
+    stats = uncertainty.StreamingStatistics((2,))
+
+    for chunk in np.array_split(samples, 7):
+        stats.update(chunk)
+
+    expected = np.percentile(samples, q, axis=0)
+    spread = np.ptp(samples, axis=0)
+    assert np.all(np.abs(stats.percentile(q) - expected) < 2e-3 * spread)
+    assert np.allclose(stats.mean, samples.mean(0))
+    assert np.allclose(stats.std, samples.std(0))
+
+    # the histogram does not depend on the order of the chunks
+    reverse = uncertainty.StreamingStatistics((2,))
+
+    for chunk in np.array_split(samples[::-1], 3):
+        reverse.update(chunk)
+
+    assert np.array_equal(reverse.percentile(q), stats.percentile(q))